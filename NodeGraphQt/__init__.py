@@ -78,6 +78,8 @@ from .pkg_info import __license__ as LICENSE
 # node graph
 from .base.graph import NodeGraph, SubGraph
 from .base.menu import NodesMenu, NodeGraphMenu, NodeGraphCommand
+from .base.executor import GraphExecutor
+from .base.factory import NodeDescriptor
 
 # nodes & ports
 from .base.port import Port
@@ -97,9 +99,11 @@ __version__ = VERSION
 __all__ = [
     'BackdropNode',
     'BaseNode',
+    'GraphExecutor',
     'GroupNode',
     'LICENSE',
     'NodeBaseWidget',
+    'NodeDescriptor',
     'NodeGraph',
     'NodeGraphCommand',
     'NodeGraphMenu',
@@ -1,10 +1,99 @@
 #!/usr/bin/python
+import functools
+import time
+
 from Qt import QtWidgets
 
 from NodeGraphQt.constants import PortTypeEnum
 
+# seconds between pushes for continuous edits to be merged into one command.
+MERGE_INTERVAL = 1.0
+
+
+def _set_obsolete(command, obsolete=True):
+    """
+    Flag a command to be removed from the undo stack.
+    (requires Qt 5.9+ ignored on older versions)
+
+    Args:
+        command (EvictableCmd): undo command.
+        obsolete (bool): true if obsolete.
+    """
+    if hasattr(command, 'setObsolete'):
+        command.setObsolete(obsolete)
+
+
+def _skip_evicted(func):
+    """
+    Decorator for the undo and redo functions of a :class:`EvictableCmd`
+    that does nothing once the command is evicted.
+    """
+    @functools.wraps(func)
+    def wrapper(self):
+        if not self.evicted:
+            func(self)
+    return wrapper
+
+
+class EvictableCmd(QtWidgets.QUndoCommand):
+    """
+    Base class for the node graph undo commands that can be evicted from
+    the undo history by the undo budget.
+    (see: :class:`NodeGraphQt.base.undo_budget.UndoBudget`)
+
+    An evicted command releases the data it holds, its undo and redo do
+    nothing and it's removed from the undo stack once it's undone.
+    """
+
+    #: true once the command data has been released.
+    evicted = False
+    #: estimated size in bytes set by the undo budget.
+    size_estimate = None
+
+    def evict(self):
+        """
+        Release the data held by the command.
+        """
+        size = self.size_estimate
+        self.__dict__.clear()
+        self.evicted = True
+        self.size_estimate = size
+        self.setText('(evicted) {}'.format(self.text()))
+        _set_obsolete(self)
+
+
+def _set_node_property(node, name, value):
+    """
+    updates the node view and model.
 
-class PropertyChangedCmd(QtWidgets.QUndoCommand):
+    Args:
+        node (NodeGraphQt.NodeObject): node.
+        name (str): node property name.
+        value (object): node property value.
+    """
+    # set model data.
+    model = node.model
+    model.set_property(name, value)
+
+    # set view data.
+    view = node.view
+
+    # view widgets.
+    if hasattr(view, 'widgets') and name in view.widgets.keys():
+        # check if previous value is identical to current value,
+        # prevent signals from causing a infinite loop.
+        if view.widgets[name].get_value() != value:
+            view.widgets[name].set_value(value)
+
+    # view properties.
+    if name in view.properties.keys():
+        # remap "pos" to "xy_pos" node view has pre-existing pos method.
+        if name == 'pos':
+            name = 'xy_pos'
+        setattr(view, name, value)
+
+
+class PropertyChangedCmd(EvictableCmd):
     """
     Node property changed command.
 
@@ -24,32 +113,44 @@ class PropertyChangedCmd(QtWidgets.QUndoCommand):
         self.name = name
         self.old_val = node.get_property(name)
         self.new_val = value
+        self.timestamp = time.time()
+
+    def id(self):
+        return 1
+
+    def mergeWith(self, other):
+        """
+        Merge continuous edits of the same node property (eg. slider drags)
+        into a single command.
+
+        Args:
+            other (PropertyChangedCmd): newer command.
+
+        Returns:
+            bool: true if merged.
+        """
+        if self.evicted:
+            return False
+        if other.node is not self.node or other.name != self.name:
+            return False
+        if other.timestamp - self.timestamp > MERGE_INTERVAL:
+            return False
+        self.new_val = other.new_val
+        self.timestamp = other.timestamp
+        if self.name == 'name':
+            self.setText('renamed "{}" to "{}"'.format(
+                self.old_val, self.new_val))
+        # drop the command if the edit ended on the original value.
+        _set_obsolete(self, self.old_val == self.new_val)
+        return True
 
     def set_node_prop(self, name, value):
         """
         updates the node view and model.
         """
-        # set model data.
-        model = self.node.model
-        model.set_property(name, value)
-
-        # set view data.
-        view = self.node.view
-
-        # view widgets.
-        if hasattr(view, 'widgets') and name in view.widgets.keys():
-            # check if previous value is identical to current value,
-            # prevent signals from causing a infinite loop.
-            if view.widgets[name].get_value() != value:
-                view.widgets[name].set_value(value)
-
-        # view properties.
-        if name in view.properties.keys():
-            # remap "pos" to "xy_pos" node view has pre-existing pos method.
-            if name == 'pos':
-                name = 'xy_pos'
-            setattr(view, name, value)
+        _set_node_property(self.node, name, value)
 
+    @_skip_evicted
     def undo(self):
         if self.old_val != self.new_val:
             self.set_node_prop(self.name, self.old_val)
@@ -58,6 +159,7 @@ class PropertyChangedCmd(QtWidgets.QUndoCommand):
             graph = self.node.graph
             graph.property_changed.emit(self.node, self.name, self.old_val)
 
+    @_skip_evicted
     def redo(self):
         if self.old_val != self.new_val:
             self.set_node_prop(self.name, self.new_val)
@@ -67,7 +169,76 @@ class PropertyChangedCmd(QtWidgets.QUndoCommand):
             graph.property_changed.emit(self.node, self.name, self.new_val)
 
 
-class NodeMovedCmd(QtWidgets.QUndoCommand):
+class NodesPropertyChangedCmd(EvictableCmd):
+    """
+    Property changed command for multiple nodes, the graph
+    ``properties_changed`` signal is emitted once for all the nodes.
+
+    Args:
+        graph (NodeGraphQt.NodeGraph): node graph.
+        nodes (list[NodeGraphQt.NodeObject]): nodes.
+        name (str): node property name.
+        value (object): node property value.
+    """
+
+    def __init__(self, graph, nodes, name, value):
+        QtWidgets.QUndoCommand.__init__(self)
+        self.graph = graph
+        self.nodes = [n for n in nodes if n.get_property(name) != value]
+        self.setText('property "{}" ({} nodes)'.format(name, len(self.nodes)))
+        self.name = name
+        self.old_vals = [n.get_property(name) for n in self.nodes]
+        self.new_vals = [value] * len(self.nodes)
+        self.timestamp = time.time()
+
+    def id(self):
+        return 3
+
+    def mergeWith(self, other):
+        """
+        Merge continuous edits of the same property on the same nodes
+        (or a subset of them) into a single command, the new value is kept
+        per node.
+
+        Args:
+            other (NodesPropertyChangedCmd): newer command.
+
+        Returns:
+            bool: true if merged.
+        """
+        if self.evicted:
+            return False
+        if other.name != self.name:
+            return False
+        if other.timestamp - self.timestamp > MERGE_INTERVAL:
+            return False
+        indexes = {n.id: i for i, n in enumerate(self.nodes)}
+        if any(n.id not in indexes for n in other.nodes):
+            return False
+        for node, value in zip(other.nodes, other.new_vals):
+            self.new_vals[indexes[node.id]] = value
+        self.timestamp = other.timestamp
+        _set_obsolete(self, self.old_vals == self.new_vals)
+        return True
+
+    @_skip_evicted
+    def undo(self):
+        for node, value in zip(self.nodes, self.old_vals):
+            _set_node_property(node, self.name, value)
+        if self.nodes:
+            self.graph.properties_changed.emit(
+                list(self.nodes), self.name, list(self.old_vals))
+
+    @_skip_evicted
+    def redo(self):
+        for node, value in zip(self.nodes, self.new_vals):
+            _set_node_property(node, self.name, value)
+        if self.nodes:
+            self.graph.properties_changed.emit(
+                list(self.nodes), self.name, list(self.new_vals))
+
+
+class NodeMovedCmd(EvictableCmd):
     """
     Node moved command.
 
@@ -83,10 +254,33 @@ class NodeMovedCmd(QtWidgets.QUndoCommand):
         self.pos = pos
         self.prev_pos = prev_pos
 
+    def id(self):
+        return 2
+
+    def mergeWith(self, other):
+        """
+        Merge consecutive moves of the same node into a single command.
+
+        Args:
+            other (NodeMovedCmd): newer command.
+
+        Returns:
+            bool: true if merged.
+        """
+        if self.evicted:
+            return False
+        if other.node is not self.node:
+            return False
+        self.pos = other.pos
+        _set_obsolete(self, self.pos == self.prev_pos)
+        return True
+
+    @_skip_evicted
     def undo(self):
         self.node.view.xy_pos = self.prev_pos
         self.node.model.pos = self.prev_pos
 
+    @_skip_evicted
     def redo(self):
         if self.pos == self.prev_pos:
             return
@@ -94,7 +288,66 @@ class NodeMovedCmd(QtWidgets.QUndoCommand):
         self.node.model.pos = self.pos
 
 
-class NodeAddedCmd(QtWidgets.QUndoCommand):
+class NodesMovedCmd(EvictableCmd):
+    """
+    Nodes moved together in the node viewer.
+
+    Args:
+        moves (list[tuple]): (node, new position, previous position)
+            for each moved node.
+    """
+
+    def __init__(self, moves):
+        QtWidgets.QUndoCommand.__init__(self)
+        self.setText('move nodes')
+        self.moves = list(moves)
+        self.timestamp = time.time()
+
+    def id(self):
+        return 4
+
+    def mergeWith(self, other):
+        """
+        Merge continuous moves of the same nodes (eg. nudging the selection)
+        into a single command.
+
+        Args:
+            other (NodesMovedCmd): newer command.
+
+        Returns:
+            bool: true if merged.
+        """
+        if self.evicted:
+            return False
+        if other.timestamp - self.timestamp > MERGE_INTERVAL:
+            return False
+        new_pos = {node.id: pos for node, pos, _ in other.moves}
+        if len(new_pos) != len(self.moves) or \
+                any(node.id not in new_pos for node, _, _ in self.moves):
+            return False
+        self.moves = [(node, new_pos[node.id], prev_pos)
+                      for node, _, prev_pos in self.moves]
+        self.timestamp = other.timestamp
+        _set_obsolete(self, all(pos == prev_pos
+                                for _, pos, prev_pos in self.moves))
+        return True
+
+    @_skip_evicted
+    def undo(self):
+        for node, _, prev_pos in self.moves:
+            node.view.xy_pos = prev_pos
+            node.model.pos = prev_pos
+
+    @_skip_evicted
+    def redo(self):
+        for node, pos, prev_pos in self.moves:
+            if pos == prev_pos:
+                continue
+            node.view.xy_pos = pos
+            node.model.pos = pos
+
+
+class NodeAddedCmd(EvictableCmd):
     """
     Node added command.
 
@@ -112,17 +365,19 @@ class NodeAddedCmd(QtWidgets.QUndoCommand):
         self.node = node
         self.pos = pos
 
+    @_skip_evicted
     def undo(self):
         self.pos = self.pos or self.node.pos()
         self.model.nodes.pop(self.node.id)
         self.node.view.delete()
 
+    @_skip_evicted
     def redo(self):
         self.model.nodes[self.node.id] = self.node
         self.viewer.add_node(self.node.view, self.pos)
 
 
-class NodeRemovedCmd(QtWidgets.QUndoCommand):
+class NodeRemovedCmd(EvictableCmd):
     """
     Node deleted command.
 
@@ -138,16 +393,207 @@ class NodeRemovedCmd(QtWidgets.QUndoCommand):
         self.model = graph.model
         self.node = node
 
+    @_skip_evicted
     def undo(self):
         self.model.nodes[self.node.id] = self.node
         self.scene.addItem(self.node.view)
 
+    @_skip_evicted
     def redo(self):
         self.model.nodes.pop(self.node.id)
         self.node.view.delete()
 
 
-class NodeInputConnectedCmd(QtWidgets.QUndoCommand):
+class NodesDeletedCmd(EvictableCmd):
+    """
+    Bulk node deleted command.
+
+    Records the removed nodes with all their connections and locked ports in
+    one command so deleting a large selection doesn't push a macro of port
+    disconnect commands for every connection.
+
+    Args:
+        graph (NodeGraphQt.NodeGraph): node graph.
+        nodes (list[NodeGraphQt.NodeObject]): nodes to delete.
+        text (str): undo command text.
+    """
+
+    def __init__(self, graph, nodes, text=None):
+        QtWidgets.QUndoCommand.__init__(self)
+        self.setText(text or 'deleted "{}" nodes'.format(len(nodes)))
+        self.scene = graph.scene()
+        self.model = graph.model
+        self.nodes = list(nodes)
+        self.edges = []
+        self.locked_ports = []
+
+        seen = set()
+        for node in self.nodes:
+            if not hasattr(node, 'input_ports'):
+                continue
+            for port in node.input_ports() + node.output_ports():
+                if port.locked():
+                    self.locked_ports.append(port)
+                for cp in port.connected_ports():
+                    if port.type_() == PortTypeEnum.IN.value:
+                        edge = (port, cp)
+                    else:
+                        edge = (cp, port)
+                    key = (edge[0].node().id, edge[0].name(),
+                           edge[1].node().id, edge[1].name())
+                    if key not in seen:
+                        seen.add(key)
+                        self.edges.append(edge)
+
+    @staticmethod
+    def _set_connected(in_port, out_port, connected):
+        """
+        Connect or disconnect the port models and views.
+
+        Args:
+            in_port (NodeGraphQt.Port): input port.
+            out_port (NodeGraphQt.Port): output port.
+            connected (bool): true to connect.
+        """
+        in_model, out_model = in_port.model, out_port.model
+        in_id, out_id = in_port.node().id, out_port.node().id
+        if connected:
+            in_model.connected_ports[out_id].append(out_port.name())
+            out_model.connected_ports[in_id].append(in_port.name())
+            in_port.view.connect_to(out_port.view)
+            return
+
+        port_names = in_model.connected_ports.get(out_id)
+        if port_names and out_port.name() in port_names:
+            port_names.remove(out_port.name())
+        if not port_names:
+            in_model.connected_ports.pop(out_id, None)
+        port_names = out_model.connected_ports.get(in_id)
+        if port_names and in_port.name() in port_names:
+            port_names.remove(in_port.name())
+        if not port_names:
+            out_model.connected_ports.pop(in_id, None)
+        in_port.view.disconnect_from(out_port.view)
+
+    @_skip_evicted
+    def undo(self):
+        for node in self.nodes:
+            self.model.nodes[node.id] = node
+            self.scene.addItem(node.view)
+        for in_port, out_port in self.edges:
+            self._set_connected(in_port, out_port, True)
+            in_port.node().on_input_connected(in_port, out_port)
+        for port in self.locked_ports:
+            port.model.locked = True
+            port.view.locked = True
+
+    @_skip_evicted
+    def redo(self):
+        for port in self.locked_ports:
+            port.model.locked = False
+            port.view.locked = False
+        for in_port, out_port in self.edges:
+            self._set_connected(in_port, out_port, False)
+            in_port.node().on_input_disconnected(in_port, out_port)
+        for node in self.nodes:
+            self.model.nodes.pop(node.id, None)
+            node.view.delete()
+
+
+class NodesSnapshotCmd(EvictableCmd):
+    """
+    Snapshot based command for large structural operations (paste,
+    duplicate, auto layout).
+
+    The properties of the affected nodes are recorded before the operation
+    is performed without undo commands, :meth:`NodesSnapshotCmd.capture` then
+    records the property changes and the nodes added by the operation so
+    undo and redo are applied as a single batched update.
+
+    Args:
+        graph (NodeGraphQt.NodeGraph): node graph.
+        nodes (list[NodeGraphQt.NodeObject]): existing nodes affected by the
+            operation.
+        text (str): undo command text.
+    """
+
+    def __init__(self, graph, nodes, text):
+        QtWidgets.QUndoCommand.__init__(self)
+        self.setText(text)
+        self.graph = graph
+        self.nodes = list(nodes)
+        self.before = [self._node_state(n) for n in self.nodes]
+        self.changes = []
+        self.added = None
+        self._done = False
+
+    @staticmethod
+    def _node_state(node):
+        """
+        Returns a shallow copy of the node properties.
+
+        Args:
+            node (NodeGraphQt.NodeObject): node.
+
+        Returns:
+            dict: node properties.
+        """
+        state = {k: v for k, v in node.model.properties.items()
+                 if not k.startswith('_') and k not in ('inputs', 'outputs')}
+        state.update(node.model.custom_properties)
+        return state
+
+    def capture(self, added_nodes=None):
+        """
+        Record the changes made by the operation.
+
+        Args:
+            added_nodes (list[NodeGraphQt.NodeObject]): nodes created by the
+                operation.
+        """
+        for node, before in zip(self.nodes, self.before):
+            after = self._node_state(node)
+            diff = {k: (before.get(k), v) for k, v in after.items()
+                    if before.get(k) != v}
+            if diff:
+                self.changes.append((node, diff))
+        # the unchanged properties don't need to be kept around.
+        self.nodes = None
+        self.before = None
+        if added_nodes:
+            self.added = NodesDeletedCmd(self.graph, added_nodes)
+        self._done = True
+
+    def _apply(self, index):
+        """
+        Set the recorded property values.
+
+        Args:
+            index (int): 0 for the values before or 1 for the values after.
+        """
+        for node, diff in self.changes:
+            for name, values in diff.items():
+                _set_node_property(node, name, values[index])
+                self.graph.property_changed.emit(node, name, values[index])
+
+    @_skip_evicted
+    def undo(self):
+        if self.added:
+            self.added.redo()
+        self._apply(0)
+
+    @_skip_evicted
+    def redo(self):
+        # the operation has already been applied when the command is pushed.
+        if self._done:
+            self._done = False
+            return
+        if self.added:
+            self.added.undo()
+        self._apply(1)
+
+
+class NodeInputConnectedCmd(EvictableCmd):
     """
     "BaseNode.on_input_connected()" command.
 
@@ -165,16 +611,18 @@ class NodeInputConnectedCmd(QtWidgets.QUndoCommand):
             self.source = trg_port
             self.target = src_port
 
+    @_skip_evicted
     def undo(self):
         node = self.source.node()
         node.on_input_disconnected(self.source, self.target)
 
+    @_skip_evicted
     def redo(self):
         node = self.source.node()
         node.on_input_connected(self.source, self.target)
 
 
-class NodeInputDisconnectedCmd(QtWidgets.QUndoCommand):
+class NodeInputDisconnectedCmd(EvictableCmd):
     """
     Node "on_input_disconnected()" command.
 
@@ -192,16 +640,18 @@ class NodeInputDisconnectedCmd(QtWidgets.QUndoCommand):
             self.source = trg_port
             self.target = src_port
 
+    @_skip_evicted
     def undo(self):
         node = self.source.node()
         node.on_input_connected(self.source, self.target)
 
+    @_skip_evicted
     def redo(self):
         node = self.source.node()
         node.on_input_disconnected(self.source, self.target)
 
 
-class PortConnectedCmd(QtWidgets.QUndoCommand):
+class PortConnectedCmd(EvictableCmd):
     """
     Port connected command.
 
@@ -215,6 +665,7 @@ class PortConnectedCmd(QtWidgets.QUndoCommand):
         self.source = src_port
         self.target = trg_port
 
+    @_skip_evicted
     def undo(self):
         src_model = self.source.model
         trg_model = self.target.model
@@ -235,6 +686,7 @@ class PortConnectedCmd(QtWidgets.QUndoCommand):
 
         self.source.view.disconnect_from(self.target.view)
 
+    @_skip_evicted
     def redo(self):
         src_model = self.source.model
         trg_model = self.target.model
@@ -247,7 +699,7 @@ class PortConnectedCmd(QtWidgets.QUndoCommand):
         self.source.view.connect_to(self.target.view)
 
 
-class PortDisconnectedCmd(QtWidgets.QUndoCommand):
+class PortDisconnectedCmd(EvictableCmd):
     """
     Port disconnected command.
 
@@ -261,6 +713,7 @@ class PortDisconnectedCmd(QtWidgets.QUndoCommand):
         self.source = src_port
         self.target = trg_port
 
+    @_skip_evicted
     def undo(self):
         src_model = self.source.model
         trg_model = self.target.model
@@ -272,6 +725,7 @@ class PortDisconnectedCmd(QtWidgets.QUndoCommand):
 
         self.source.view.connect_to(self.target.view)
 
+    @_skip_evicted
     def redo(self):
         src_model = self.source.model
         trg_model = self.target.model
@@ -293,7 +747,7 @@ class PortDisconnectedCmd(QtWidgets.QUndoCommand):
         self.source.view.disconnect_from(self.target.view)
 
 
-class PortLockedCmd(QtWidgets.QUndoCommand):
+class PortLockedCmd(EvictableCmd):
     """
     Port locked command.
 
@@ -306,16 +760,18 @@ class PortLockedCmd(QtWidgets.QUndoCommand):
         self.setText('lock port "{}"'.format(port.name()))
         self.port = port
 
+    @_skip_evicted
     def undo(self):
         self.port.model.locked = False
         self.port.view.locked = False
 
+    @_skip_evicted
     def redo(self):
         self.port.model.locked = True
         self.port.view.locked = True
 
 
-class PortUnlockedCmd(QtWidgets.QUndoCommand):
+class PortUnlockedCmd(EvictableCmd):
     """
     Port unlocked command.
 
@@ -328,16 +784,18 @@ class PortUnlockedCmd(QtWidgets.QUndoCommand):
         self.setText('unlock port "{}"'.format(port.name()))
         self.port = port
 
+    @_skip_evicted
     def undo(self):
         self.port.model.locked = True
         self.port.view.locked = True
 
+    @_skip_evicted
     def redo(self):
         self.port.model.locked = False
         self.port.view.locked = False
 
 
-class PortVisibleCmd(QtWidgets.QUndoCommand):
+class PortVisibleCmd(EvictableCmd):
     """
     Port visibility command.
 
@@ -363,8 +821,10 @@ class PortVisibleCmd(QtWidgets.QUndoCommand):
             text_item.setVisible(visible)
         node_view.post_init()
 
+    @_skip_evicted
     def undo(self):
         self.set_visible(not self.visible)
         
+    @_skip_evicted
     def redo(self):
         self.set_visible(self.visible)
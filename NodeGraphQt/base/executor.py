@@ -0,0 +1,766 @@
+#!/usr/bin/python
+import concurrent.futures
+import hashlib
+import json
+import threading
+import traceback
+from collections import OrderedDict
+
+from Qt import QtCore
+
+from NodeGraphQt.base.undo_budget import estimate_size
+from NodeGraphQt.constants import NodeEnum, PortTypeEnum
+from NodeGraphQt.errors import GraphExecutionError
+from NodeGraphQt.nodes.base_node import BaseNode
+
+#: default memory budget of the node result cache (256 MB).
+CACHE_BYTES = 256 * 1024 * 1024
+
+
+class _NodeSnapshot(object):
+    """
+    Picklable stand in for a node passed to :meth:`BaseNode.run` when the
+    nodes are executed in a process pool.
+
+    Args:
+        node (NodeGraphQt.BaseNode): node.
+    """
+
+    def __init__(self, node):
+        self.id = node.id
+        self.type_ = node.type_
+        self._name = node.name()
+        self._properties = dict(node.model.custom_properties)
+
+    def __repr__(self):
+        return '<{}("{}") object at {}>'.format(
+            self.__class__.__name__, self._name, hex(id(self)))
+
+    def name(self):
+        return self._name
+
+    def get_property(self, name):
+        if name == 'name':
+            return self._name
+        return self._properties.get(name)
+
+
+def _run_snapshot(node_cls, snapshot, inputs):
+    """
+    Run the node class :meth:`BaseNode.run` function on a node snapshot.
+    (executed in a worker process)
+    """
+    return node_cls.run(snapshot, inputs)
+
+
+class ResultCache(object):
+    """
+    Least recently used cache of node outputs keyed by the node result hash
+    with a memory budget.
+
+    Args:
+        max_bytes (int): maximum estimated size in bytes (0 for unlimited).
+    """
+
+    def __init__(self, max_bytes=CACHE_BYTES):
+        self._max_bytes = max_bytes or 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __repr__(self):
+        return '<{}(entries={}, bytes={}) object at {}>'.format(
+            self.__class__.__name__, len(self._entries), self._bytes,
+            hex(id(self)))
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def max_bytes(self):
+        return self._max_bytes
+
+    def set_max_bytes(self, max_bytes=0):
+        """
+        Set the cache memory budget.
+
+        Args:
+            max_bytes (int): maximum estimated size in bytes
+                (0 for unlimited).
+        """
+        with self._lock:
+            self._max_bytes = max_bytes or 0
+            self._trim()
+
+    def get(self, key):
+        """
+        Returns the cached outputs for a result hash.
+
+        Args:
+            key (str): node result hash.
+
+        Returns:
+            dict: node outputs or None if not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, outputs):
+        """
+        Cache the node outputs and evict the least recently used outputs
+        that go over the memory budget.
+
+        Args:
+            key (str): node result hash.
+            outputs (dict): node outputs.
+        """
+        size = estimate_size(outputs)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (outputs, size)
+            self._bytes += size
+            self._trim()
+
+    def _trim(self):
+        """
+        Evict the least recently used outputs until the cache is within
+        the memory budget.
+        """
+        while self._max_bytes and self._bytes > self._max_bytes and \
+                self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Remove all the cached outputs.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Returns the cache statistics.
+
+        Returns:
+            dict: cache statistics.
+        """
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'max_bytes': self._max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': float(self.hits) / lookups if lookups else 0.0
+        }
+
+
+class _NodeTask(object):
+    """
+    Execution data of a node collected from the graph before the nodes are
+    executed so the worker threads don't read the graph.
+
+    Args:
+        node (NodeGraphQt.BaseNode): node.
+    """
+
+    def __init__(self, node):
+        self.node = node
+        self.id = node.id
+        self.snapshot = None
+        self.key = None
+        self.output_names = [p.name() for p in node.output_ports()]
+        # {input port name: (multi input, [(source node id, port name)])}
+        self.inputs = {}
+        self.upstream = set()
+        self.downstream = []
+        for port in node.input_ports():
+            sources = []
+            for cp in port.connected_ports():
+                if isinstance(cp.node(), BaseNode):
+                    sources.append((cp.node().id, cp.name()))
+                    self.upstream.add(cp.node().id)
+            self.inputs[port.name()] = (port.multi_connection(), sources)
+
+
+class GraphExecutor(QtCore.QObject):
+    """
+    Executes the :meth:`BaseNode.run` function of the nodes in a node graph
+    in topological order passing the output values along the connections.
+
+    Nodes are submitted to a thread pool (or process pool) as soon as all
+    their upstream nodes have finished, nodes downstream of a failed node are
+    not executed. The node progress bars show the execution status.
+
+    Changing a node property or connection marks the node and its downstream
+    nodes dirty, only the dirty nodes are evaluated again and their outputs
+    are looked up in a :class:`ResultCache` by a hash of the node type,
+    properties and upstream result hashes before the node is executed.
+    After an undo or redo (or a node model edit that didn't emit a signal)
+    the result hashes of the clean nodes are computed again to find the
+    changed nodes.
+    (the cache expects :meth:`BaseNode.run` to only depend on its inputs and
+    custom properties)
+
+    Args:
+        graph (NodeGraphQt.NodeGraph): node graph.
+        max_workers (int): maximum number of workers (default: pool default).
+        use_processes (bool): use a process pool instead of a thread pool.
+        cache_bytes (int): result cache memory budget in bytes
+            (0 for unlimited).
+    """
+
+    #: signal emitted when a node starts executing (node id).
+    node_started = QtCore.Signal(str)
+    #: signal emitted when a node finished executing (node id).
+    node_finished = QtCore.Signal(str)
+    #: signal emitted when a node failed (node id, error message).
+    node_failed = QtCore.Signal(str, str)
+    #: signal emitted when the execution finished ({node id: outputs}).
+    execution_finished = QtCore.Signal(dict)
+
+    def __init__(self, graph, max_workers=None, use_processes=False,
+                 cache_bytes=CACHE_BYTES):
+        super(GraphExecutor, self).__init__(graph)
+        self._graph = graph
+        self._max_workers = max_workers
+        self._use_processes = use_processes
+        self._thread = None
+        self._cancelled = False
+        # the results, result hashes, dirty nodes and errors are shared
+        # with the execution thread.
+        self._lock = threading.Lock()
+        self._results = {}
+        self._errors = {}
+        # nodes deleted during the current execution.
+        self._deleted = set()
+
+        # incremental execution.
+        self._cache = ResultCache(cache_bytes)
+        self._keys = {}
+        self._dirty = set()
+        self._run_stats = {}
+        # undo, redo and model edits without signals are only detected by
+        # comparing the result hashes of the clean nodes.
+        self._verify = False
+        self._revision = graph.model.revision
+        graph.undo_stack().indexChanged.connect(self._on_undo_index_changed)
+        graph.property_changed.connect(self._on_property_changed)
+        graph.properties_changed.connect(self._on_properties_changed)
+        graph.port_connected.connect(self._on_port_changed)
+        graph.port_disconnected.connect(self._on_port_changed)
+        graph.ports_disconnected.connect(self._on_ports_disconnected)
+        graph.nodes_deleted.connect(self._on_nodes_deleted)
+
+    def __repr__(self):
+        return '<{}(workers={}, processes={}) object at {}>'.format(
+            self.__class__.__name__, self._max_workers,
+            self._use_processes, hex(id(self)))
+
+    @property
+    def max_workers(self):
+        return self._max_workers
+
+    def set_max_workers(self, max_workers=None):
+        """
+        Set the maximum number of workers.
+
+        Args:
+            max_workers (int): number of workers (default: pool default).
+        """
+        self._max_workers = max_workers
+
+    @property
+    def use_processes(self):
+        return self._use_processes
+
+    def set_use_processes(self, use_processes=False):
+        """
+        Execute the nodes in a process pool instead of a thread pool.
+
+        Note:
+            The node classes must be importable in the worker processes and
+            their :meth:`BaseNode.run` function receives a node snapshot.
+
+        Args:
+            use_processes (bool): true to use a process pool.
+        """
+        self._use_processes = use_processes
+
+    def is_running(self):
+        """
+        Returns true if the nodes are currently executing.
+
+        Returns:
+            bool: true if running.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def results(self):
+        """
+        Returns the outputs of the last execution.
+
+        Returns:
+            dict: {node id: {output port name: value}}
+        """
+        with self._lock:
+            return dict(self._results)
+
+    def errors(self):
+        """
+        Returns the errors of the last execution.
+
+        Returns:
+            dict: {node id: error message}
+        """
+        with self._lock:
+            return dict(self._errors)
+
+    @property
+    def cache_bytes(self):
+        return self._cache.max_bytes
+
+    def set_cache_bytes(self, max_bytes=CACHE_BYTES):
+        """
+        Set the memory budget of the node result cache, the least recently
+        used outputs over the budget are evicted.
+
+        Args:
+            max_bytes (int): maximum estimated size in bytes
+                (0 for unlimited).
+        """
+        self._cache.set_max_bytes(max_bytes)
+
+    def cache(self):
+        """
+        Returns the node result cache.
+
+        Returns:
+            ResultCache: result cache.
+        """
+        return self._cache
+
+    def stats(self):
+        """
+        Returns the statistics of the last execution and the result cache.
+
+        Returns:
+            dict: execution statistics.
+        """
+        stats = dict(self._run_stats)
+        stats['cache'] = self._cache.stats()
+        return stats
+
+    def is_dirty(self, node):
+        """
+        Returns true if the node has to be evaluated again.
+
+        Args:
+            node (NodeGraphQt.BaseNode): node.
+
+        Returns:
+            bool: true if dirty.
+        """
+        with self._lock:
+            return node.id in self._dirty or node.id not in self._results
+
+    def mark_dirty(self, nodes):
+        """
+        Mark the nodes and their downstream nodes dirty.
+
+        Args:
+            nodes (list[NodeGraphQt.BaseNode]): changed nodes.
+        """
+        pending = [n for n in nodes if isinstance(n, BaseNode)]
+        with self._lock:
+            while pending:
+                node = pending.pop()
+                if node.id in self._dirty:
+                    continue
+                self._dirty.add(node.id)
+                for port in node.output_ports():
+                    pending.extend(cp.node() for cp in port.connected_ports()
+                                   if isinstance(cp.node(), BaseNode))
+
+    def _on_property_changed(self, node, name, value):
+        # only the custom properties are passed to the node.
+        if name in node.model.custom_properties:
+            self.mark_dirty([node])
+
+    def _on_properties_changed(self, nodes, name, values):
+        if nodes and name in nodes[0].model.custom_properties:
+            self.mark_dirty(nodes)
+
+    def _on_port_changed(self, in_port, out_port):
+        for port in (in_port, out_port):
+            if port.type_() == PortTypeEnum.IN.value:
+                self.mark_dirty([port.node()])
+
+    def _on_ports_disconnected(self, edges):
+        self.mark_dirty([in_port.node() for in_port, _ in edges])
+
+    def _on_undo_index_changed(self, index):
+        # undo commands don't emit the graph signals.
+        self._verify = True
+
+    def _on_nodes_deleted(self, node_ids):
+        with self._lock:
+            for node_id in node_ids:
+                self._results.pop(node_id, None)
+                self._keys.pop(node_id, None)
+                self._dirty.discard(node_id)
+            if self.is_running():
+                # drop the results the execution thread still returns.
+                self._deleted.update(node_ids)
+
+    def cancel(self):
+        """
+        Stop submitting nodes, the nodes currently running are finished and
+        the progress bars of the nodes not submitted yet are cleared.
+        """
+        self._cancelled = True
+
+    def schedule(self, nodes=None):
+        """
+        Returns the nodes to execute in topological order.
+
+        Args:
+            nodes (list[NodeGraphQt.BaseNode]): nodes to execute with their
+                upstream nodes (default: all nodes).
+
+        Returns:
+            list[NodeGraphQt.BaseNode]: nodes in execution order.
+        """
+        return [t.node for t in self._build_tasks(nodes)]
+
+    def _build_tasks(self, nodes=None):
+        """
+        Collect the tasks for the nodes and their upstream nodes sorted in
+        topological order.
+
+        Args:
+            nodes (list[NodeGraphQt.BaseNode]): nodes to execute.
+
+        Returns:
+            list[_NodeTask]: tasks in execution order.
+        """
+        if nodes is None:
+            nodes = self._graph.all_nodes()
+        tasks = {}
+        pending = [n for n in nodes if isinstance(n, BaseNode)]
+        while pending:
+            node = pending.pop()
+            if node.id in tasks:
+                continue
+            task = _NodeTask(node)
+            tasks[node.id] = task
+            for port in node.input_ports():
+                pending.extend(cp.node() for cp in port.connected_ports()
+                               if isinstance(cp.node(), BaseNode))
+
+        # kahn's algorithm.
+        in_degree = {}
+        for task in tasks.values():
+            in_degree[task.id] = len(task.upstream)
+            for up_id in task.upstream:
+                tasks[up_id].downstream.append(task.id)
+        ready = [t for t in tasks.values() if not in_degree[t.id]]
+        order = []
+        while ready:
+            task = ready.pop()
+            order.append(task)
+            for down_id in task.downstream:
+                in_degree[down_id] -= 1
+                if not in_degree[down_id]:
+                    ready.append(tasks[down_id])
+        if len(order) != len(tasks):
+            cycle = [tasks[i].node.name() for i, d in in_degree.items() if d]
+            raise GraphExecutionError(
+                'Can\'t execute nodes in a cycle: {}'.format(cycle))
+        return order
+
+    def execute(self, nodes=None, wait=False):
+        """
+        Execute the nodes and their upstream nodes.
+
+        Args:
+            nodes (list[NodeGraphQt.BaseNode]): nodes to execute with their
+                upstream nodes (default: all nodes).
+            wait (bool): block until the execution finished.
+
+        Returns:
+            dict: {node id: outputs} if ``wait`` is true else None.
+        """
+        if self.is_running():
+            raise GraphExecutionError('Nodes are already executing.')
+        tasks = self._build_tasks(nodes)
+        self._cancelled = False
+        with self._lock:
+            self._errors = {}
+            self._deleted = set()
+        run_tasks = self._plan(tasks, verified_all=nodes is None)
+        self._graph.update_progress({t.id: {'percent': 0} for t in run_tasks})
+        if wait:
+            self._run_tasks(run_tasks)
+            with self._lock:
+                return {t.id: self._results[t.id] for t in tasks
+                        if t.id in self._results}
+        self._thread = threading.Thread(target=self._run_tasks,
+                                        args=(run_tasks,))
+        self._thread.daemon = True
+        self._thread.start()
+
+    @staticmethod
+    def _result_key(task, upstream_keys):
+        """
+        Returns the result hash of a node from its type, custom properties
+        and the result hashes of the connected upstream nodes.
+
+        Args:
+            task (_NodeTask): node task.
+            upstream_keys (dict): {node id: result hash}
+
+        Returns:
+            str: result hash.
+        """
+        node = task.node
+        inputs = [
+            [name, [[upstream_keys.get(n_id), port_name]
+                    for n_id, port_name in sources]]
+            for name, (_, sources) in sorted(task.inputs.items())
+        ]
+        data = json.dumps([node.type_, node.model.custom_properties, inputs],
+                          sort_keys=True, default=repr)
+        return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+    def _plan(self, tasks, verified_all=False):
+        """
+        Resolve the clean nodes and the cached outputs of the dirty nodes.
+
+        Args:
+            tasks (list[_NodeTask]): tasks in topological order.
+            verified_all (bool): true if the tasks cover all the nodes so
+                the pending result hash check can be cleared.
+
+        Returns:
+            list[_NodeTask]: tasks that have to be executed.
+        """
+        revision = self._graph.model.revision
+        verify = self._verify or self._revision != revision
+        if verified_all:
+            self._verify = False
+            self._revision = revision
+
+        run_tasks = []
+        cached = {}
+        clean = 0
+        with self._lock:
+            for task in tasks:
+                is_clean = task.id not in self._dirty and \
+                    task.id in self._results and task.id in self._keys
+                if is_clean and not verify:
+                    clean += 1
+                    continue
+                # tasks are in topological order so the upstream hashes are
+                # already up to date.
+                task.key = self._result_key(task, self._keys)
+                if is_clean and task.key == self._keys[task.id]:
+                    clean += 1
+                    continue
+                self._keys[task.id] = task.key
+                self._dirty.discard(task.id)
+                outputs = self._cache.get(task.key)
+                if outputs is None:
+                    run_tasks.append(task)
+                    continue
+                self._results[task.id] = outputs
+                cached[task.id] = {
+                    'percent': 100,
+                    'color': NodeEnum.STATUS_CACHED_COLOR.value}
+        hits = len(cached)
+        if cached:
+            self._graph.update_progress(cached)
+        self._run_stats = {'nodes': len(tasks),
+                           'clean': clean,
+                           'cache_hits': hits,
+                           'executed': len(run_tasks)}
+        return run_tasks
+
+    def _task_inputs(self, task):
+        """
+        Returns the input values of a task from the upstream results.
+
+        Args:
+            task (_NodeTask): node task.
+
+        Returns:
+            dict: {input port name: value}
+        """
+        inputs = {}
+        with self._lock:
+            for name, (multi, sources) in task.inputs.items():
+                values = [self._results.get(n_id, {}).get(port_name)
+                          for n_id, port_name in sources]
+                if multi:
+                    inputs[name] = values
+                else:
+                    inputs[name] = values[0] if values else None
+        return inputs
+
+    def _task_outputs(self, task, outputs):
+        """
+        Returns the node outputs returned by :meth:`BaseNode.run` as a dict.
+
+        Args:
+            task (_NodeTask): node task.
+            outputs (object): outputs returned by the node.
+
+        Returns:
+            dict: {output port name: value}
+        """
+        if outputs is None:
+            return {}
+        if isinstance(outputs, dict):
+            return outputs
+        if len(task.output_names) == 1:
+            return {task.output_names[0]: outputs}
+        raise GraphExecutionError(
+            '{} returned a {} for {} outputs, expected a dict.'.format(
+                task.node.name(), type(outputs).__name__,
+                len(task.output_names)))
+
+    def _submit(self, pool, task):
+        """
+        Submit a task to the worker pool.
+
+        Args:
+            pool (concurrent.futures.Executor): worker pool.
+            task (_NodeTask): node task.
+
+        Returns:
+            concurrent.futures.Future: future.
+        """
+        inputs = self._task_inputs(task)
+        self._graph.update_progress({task.id: {
+            'percent': 100, 'color': NodeEnum.STATUS_RUNNING_COLOR.value}})
+        self.node_started.emit(task.id)
+        if self._use_processes:
+            return pool.submit(_run_snapshot, type(task.node),
+                               task.snapshot, inputs)
+        return pool.submit(task.node.run, inputs)
+
+    def _run_tasks(self, tasks):
+        """
+        Execute the tasks in dependency order.
+        (runs in the execution thread)
+
+        Args:
+            tasks (list[_NodeTask]): tasks in topological order.
+        """
+        by_id = {t.id: t for t in tasks}
+        remaining = {t.id: len(t.upstream.intersection(by_id)) for t in tasks}
+        if self._use_processes:
+            # snapshots are picklable unlike the nodes.
+            for task in tasks:
+                task.snapshot = _NodeSnapshot(task.node)
+            pool_cls = concurrent.futures.ProcessPoolExecutor
+        else:
+            pool_cls = concurrent.futures.ThreadPoolExecutor
+
+        with pool_cls(max_workers=self._max_workers) as pool:
+            running = {}
+            finished = set()
+            for task in tasks:
+                if not remaining[task.id]:
+                    running[self._submit(pool, task)] = task
+            while running:
+                done, _ = concurrent.futures.wait(
+                    list(running),
+                    return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    try:
+                        outputs = self._task_outputs(task, future.result())
+                    except Exception as e:
+                        self._fail(task, by_id, e)
+                        continue
+                    with self._lock:
+                        if task.id not in self._deleted:
+                            self._results[task.id] = outputs
+                    self._cache.put(task.key, outputs)
+                    self._graph.update_progress({task.id: {
+                        'percent': 100,
+                        'color': NodeEnum.STATUS_FINISHED_COLOR.value}})
+                    self.node_finished.emit(task.id)
+                    for down_id in task.downstream:
+                        if down_id not in by_id:
+                            continue
+                        remaining[down_id] -= 1
+                        with self._lock:
+                            failed = down_id in self._errors
+                        if not remaining[down_id] and not self._cancelled \
+                                and not failed:
+                            down_task = by_id[down_id]
+                            running[self._submit(pool, down_task)] = down_task
+                    finished.add(task.id)
+
+        # failed, skipped and cancelled nodes are evaluated on the next run.
+        cancelled = {}
+        with self._lock:
+            for task in tasks:
+                if task.id in finished or task.id in self._deleted:
+                    continue
+                self._results.pop(task.id, None)
+                self._dirty.add(task.id)
+                if task.id not in self._errors:
+                    # never submitted, clear the pending progress bar.
+                    cancelled[task.id] = None
+        if cancelled:
+            self._graph.update_progress(cancelled)
+
+        self.execution_finished.emit(self.results())
+
+    def _fail(self, task, tasks, error):
+        """
+        Mark a task and its downstream tasks as failed.
+
+        Args:
+            task (_NodeTask): failed task.
+            tasks (dict): {node id: _NodeTask}
+            error (Exception): error raised by the node.
+        """
+        message = ''.join(
+            traceback.format_exception_only(type(error), error)).strip()
+        skipped = {}
+        with self._lock:
+            self._errors[task.id] = message
+            pending = list(task.downstream)
+            while pending:
+                down_id = pending.pop()
+                if down_id in self._errors or down_id not in tasks:
+                    continue
+                self._errors[down_id] = 'upstream node "{}" failed.'.format(
+                    task.node.name())
+                skipped[down_id] = None
+                pending.extend(tasks[down_id].downstream)
+
+        color = NodeEnum.STATUS_FAILED_COLOR.value
+        self._graph.update_progress({task.id: {'percent': 100, 'color': color}})
+        self.node_failed.emit(task.id, message)
+        if skipped:
+            self._graph.update_progress(skipped)
@@ -1,16 +1,215 @@
 #!/usr/bin/python
+import importlib
+import json
+
 from NodeGraphQt.errors import NodeRegistrationError
 
 
+class NodeDescriptor(object):
+    """
+    Lightweight description of a node class that is registered without
+    importing its module, the class is imported the first time a node of
+    this type is created.
+
+    Args:
+        identifier (str): node ``__identifier__`` eg. ``"nodes.widgets"``
+        class_name (str): node class name.
+        name (str): node name (``NODE_NAME``).
+        module (str): module path to import the class from.
+        icon (str): optional path to the node icon image.
+    """
+
+    def __init__(self, identifier, class_name, name, module, icon=None):
+        self.identifier = identifier
+        self.class_name = class_name
+        self.name = name
+        self.module = module
+        self.icon = icon
+
+    def __repr__(self):
+        return '<{}("{}") object at {}>'.format(
+            self.__class__.__name__, self.type_, hex(id(self)))
+
+    @property
+    def type_(self):
+        """
+        Node type identifier followed by the class name.
+
+        Returns:
+            str: node type.
+        """
+        return '{}.{}'.format(self.identifier, self.class_name)
+
+    @property
+    def category(self):
+        """
+        Node category used by the nodes palette and tree widgets.
+
+        Returns:
+            str: node identifier category.
+        """
+        return self.identifier
+
+    def load(self):
+        """
+        Import the node class.
+
+        Returns:
+            type: node class.
+        """
+        module = importlib.import_module(self.module)
+        node_cls = getattr(module, self.class_name, None)
+        if node_cls is None or node_cls.type_ != self.type_:
+            raise NodeRegistrationError(
+                'node type "{}" not found in module "{}"'
+                .format(self.type_, self.module))
+        return node_cls
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Create a descriptor from a dictionary (manifest entry).
+
+        Args:
+            data (dict): {"identifier", "class_name", "name", "module",
+                "icon"(optional)}
+
+        Returns:
+            NodeDescriptor: node descriptor.
+        """
+        return cls(data['identifier'], data['class_name'],
+                   data.get('name') or data['class_name'],
+                   data['module'], data.get('icon'))
+
+    def to_dict(self):
+        """
+        Returns the descriptor as a dictionary (manifest entry).
+
+        Returns:
+            dict: descriptor data.
+        """
+        data = {
+            'identifier': self.identifier,
+            'class_name': self.class_name,
+            'name': self.name,
+            'module': self.module,
+        }
+        if self.icon:
+            data['icon'] = self.icon
+        return data
+
+
+def load_manifest(file_path):
+    """
+    Read node descriptors from a JSON manifest file.
+
+    .. code-block:: json
+
+        {"nodes": [{"identifier": "studio.nodes",
+                    "class_name": "BlurNode",
+                    "name": "Blur",
+                    "module": "studio.nodes.filters",
+                    "icon": "/path/to/blur.png"}]}
+
+    Args:
+        file_path (str): manifest file path.
+
+    Returns:
+        list[NodeDescriptor]: node descriptors.
+    """
+    with open(file_path) as data_file:
+        data = json.load(data_file)
+    if isinstance(data, dict):
+        data = data.get('nodes', [])
+    return [NodeDescriptor.from_dict(d) for d in data]
+
+
 class NodeFactory(object):
     """
     Node factory that stores all the node types.
+
+    A factory created with a ``parent`` factory is a layer over the parent:
+    lookups fall back to the parent and only the local registrations are
+    stored, so creating a child factory doesn't depend on the number of
+    registered nodes.
+
+    Args:
+        parent (NodeFactory): parent factory (optional).
     """
 
-    def __init__(self):
+    def __init__(self, parent=None):
+        self.__parent = parent
         self.__aliases = {}
         self.__names = {}
         self.__nodes = {}
+        self.__descriptors = {}
+        self.__listeners = []
+        self.__version = 0
+        self.__merged = None
+
+    def __deepcopy__(self, memo):
+        # registered classes are shared and listeners are not copied.
+        factory = NodeFactory(parent=self.__parent)
+        factory.__aliases.update(self.__aliases)
+        factory.__names.update(
+            {name: list(types) for name, types in self.__names.items()})
+        factory.__nodes.update(self.__nodes)
+        factory.__descriptors.update(self.__descriptors)
+        return factory
+
+    @property
+    def parent(self):
+        """
+        Return the parent factory.
+
+        Returns:
+            NodeFactory: parent factory or None.
+        """
+        return self.__parent
+
+    def child_factory(self):
+        """
+        Return a new factory layered over this factory.
+
+        Returns:
+            NodeFactory: child factory.
+        """
+        return NodeFactory(parent=self)
+
+    def _versions(self):
+        """
+        Return the change counters of the factory and its parents.
+
+        Returns:
+            tuple: versions.
+        """
+        if self.__parent is None:
+            return self.__version,
+        return (self.__version,) + self.__parent._versions()
+
+    def _merged(self):
+        """
+        Return the registrations merged with the parent factories.
+        (cached until the factory or a parent changes)
+
+        Returns:
+            tuple(dict, dict, dict, dict): names, aliases, nodes, descriptors.
+        """
+        versions = self._versions()
+        if self.__merged is None or self.__merged[0] != versions:
+            parent = self.__parent
+            names = {n: list(t) for n, t in parent.names.items()}
+            for name, node_types in self.__names.items():
+                names.setdefault(name, []).extend(node_types)
+            aliases = dict(parent.aliases)
+            aliases.update(self.__aliases)
+            nodes = dict(parent.nodes)
+            nodes.update(self.__nodes)
+            descriptors = {t: d for t, d in parent.descriptors.items()
+                           if t not in nodes}
+            descriptors.update(self.__descriptors)
+            self.__merged = (versions, names, aliases, nodes, descriptors)
+        return self.__merged[1:]
 
     @property
     def names(self):
@@ -20,7 +219,9 @@ class NodeFactory(object):
         Returns:
             dict: key=<node name, value=node_type
         """
-        return self.__names
+        if self.__parent is None:
+            return self.__names
+        return self._merged()[0]
 
     @property
     def aliases(self):
@@ -30,17 +231,157 @@ class NodeFactory(object):
         Returns:
             dict: key=alias, value=node type
         """
-        return self.__aliases
+        if self.__parent is None:
+            return self.__aliases
+        return self._merged()[1]
 
     @property
     def nodes(self):
         """
         Return all registered nodes.
 
+        Note:
+            Nodes registered with a :class:`NodeDescriptor` are only listed
+            once their class has been imported, see
+            :attr:`NodeFactory.descriptors`.
+
         Returns:
             dict: key=node identifier, value=node class
         """
-        return self.__nodes
+        if self.__parent is None:
+            return self.__nodes
+        return self._merged()[2]
+
+    @property
+    def descriptors(self):
+        """
+        Return the node descriptors whose class hasn't been imported yet.
+
+        Returns:
+            dict: key=node identifier, value=NodeDescriptor
+        """
+        if self.__parent is None:
+            return self.__descriptors
+        return self._merged()[3]
+
+    def node_types(self):
+        """
+        Return all registered node type identifiers including the ones
+        registered with a descriptor.
+
+        Returns:
+            list[str]: node types.
+        """
+        return list(self.nodes.keys()) + list(self.descriptors.keys())
+
+    def _find_registered(self, node_type):
+        """
+        Return the node class or descriptor registered in this factory or
+        the parent factories.
+
+        Args:
+            node_type (str): node type identifier.
+
+        Returns:
+            type or NodeDescriptor: registered node or None.
+        """
+        factory = self
+        while factory is not None:
+            registered = (factory.__nodes.get(node_type) or
+                          factory.__descriptors.get(node_type))
+            if registered:
+                return registered
+            factory = factory.__parent
+
+    def _find_alias(self, alias):
+        """
+        Return the node type for an alias in this factory or the parent
+        factories.
+
+        Args:
+            alias (str): node type alias.
+
+        Returns:
+            str: node type or None.
+        """
+        factory = self
+        while factory is not None:
+            if alias in factory.__aliases:
+                return factory.__aliases[alias]
+            factory = factory.__parent
+
+    def _get_node_class(self, node_type):
+        """
+        Return the node class, importing it from the node descriptor on
+        first use.
+
+        Args:
+            node_type (str): node type identifier.
+
+        Returns:
+            type: node class or None.
+        """
+        node_cls = self.__nodes.get(node_type)
+        if node_cls is None and node_type in self.__descriptors:
+            # import the node class on first use.
+            node_cls = self.__descriptors[node_type].load()
+            self.__descriptors.pop(node_type)
+            self.__nodes[node_type] = node_cls
+            self.__version += 1
+        if node_cls is None and self.__parent is not None:
+            node_cls = self.__parent._get_node_class(node_type)
+        return node_cls
+
+    def get_icon(self, node_type):
+        """
+        Return the icon path from the node descriptor.
+
+        Args:
+            node_type (str): node type identifier.
+
+        Returns:
+            str: icon path or None.
+        """
+        descriptor = self._find_registered(node_type)
+        if isinstance(descriptor, NodeDescriptor):
+            return descriptor.icon
+
+    def add_listener(self, listener):
+        """
+        Add a function called when the registered nodes change.
+
+        The listener is called with ``("registered", node_type, node_name)``
+        when a node is registered and ``("cleared", None, None)`` when the
+        registered nodes are cleared.
+
+        Args:
+            listener (function): listener function.
+        """
+        if listener not in self.__listeners:
+            self.__listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """
+        Remove a function added with :meth:`NodeFactory.add_listener`.
+
+        Args:
+            listener (function): listener function.
+        """
+        if listener in self.__listeners:
+            self.__listeners.remove(listener)
+
+    def _notify(self, event, node_type=None, name=None):
+        """
+        Call the listener functions.
+
+        Args:
+            event (str): "registered" or "cleared".
+            node_type (str): node type identifier.
+            name (str): node name.
+        """
+        self.__version += 1
+        for listener in list(self.__listeners):
+            listener(event, node_type, name)
 
     def create_node_instance(self, node_type=None):
         """
@@ -52,10 +393,9 @@ class NodeFactory(object):
         Returns:
             NodeGraphQt.NodeObject: new node object.
         """
-        if node_type in self.aliases:
-            node_type = self.aliases[node_type]
+        node_type = self._find_alias(node_type) or node_type
 
-        _NodeClass = self.__nodes.get(node_type)
+        _NodeClass = self._get_node_class(node_type)
         if not _NodeClass:
             print('can\'t find node type {}'.format(node_type))
         return _NodeClass()
@@ -74,30 +414,71 @@ class NodeFactory(object):
         name = node.NODE_NAME
         node_type = node.type_
 
-        if self.__nodes.get(node_type):
+        self._check_registered(node_type)
+        self.__nodes[node_type] = node
+        self._add_name(name, node_type, alias)
+
+    def register_descriptor(self, descriptor, alias=None):
+        """
+        register a node without importing its class.
+
+        Args:
+            descriptor (NodeDescriptor or dict): node descriptor.
+            alias (str): custom alias for the node identifier (optional).
+        """
+        if isinstance(descriptor, dict):
+            descriptor = NodeDescriptor.from_dict(descriptor)
+        node_type = descriptor.type_
+
+        self._check_registered(node_type)
+        self.__descriptors[node_type] = descriptor
+        self._add_name(descriptor.name, node_type, alias)
+
+    def _check_registered(self, node_type):
+        """
+        Raise an error if the node type is already registered.
+
+        Args:
+            node_type (str): node type identifier.
+        """
+        registered = self._find_registered(node_type)
+        if registered:
             raise NodeRegistrationError(
                 'node type "{}" already registered to "{}"! '
                 'Please specify a new plugin class name or __identifier__.'
-                .format(node_type, self.__nodes[node_type]))
-        self.__nodes[node_type] = node
+                .format(node_type, registered))
 
+    def _add_name(self, name, node_type, alias=None):
+        """
+        Add the node name and alias of a new registered node type.
+
+        Args:
+            name (str): node name.
+            node_type (str): node type identifier.
+            alias (str): custom alias for the node identifier (optional).
+        """
         if self.__names.get(name):
             self.__names[name].append(node_type)
         else:
             self.__names[name] = [node_type]
 
         if alias:
-            if self.__aliases.get(alias):
+            if self._find_alias(alias):
                 raise NodeRegistrationError(
                     'Alias: "{}" already registered to "{}"'
-                    .format(alias, self.__aliases.get(alias))
+                    .format(alias, self._find_alias(alias))
                 )
             self.__aliases[alias] = node_type
-            
+
+        self._notify('registered', node_type, name)
+
     def clear_registered_nodes(self):
         """
         clear out registered nodes, to prevent conflicts on reset.
+        (only the local registrations of a child factory are cleared)
         """
         self.__nodes.clear()
+        self.__descriptors.clear()
         self.__names.clear()
         self.__aliases.clear()
+        self._notify('cleared')
@@ -0,0 +1,235 @@
+#!/usr/bin/python
+import json
+from array import array
+
+from NodeGraphQt.base.session_store import SESSIONS_KEY, get_blob
+from NodeGraphQt.nodes.port_node import PortInputNode, PortOutputNode
+
+#: node kinds in :attr:`FlatGraph.kinds`.
+NODE, GROUP, PORT_INPUT, PORT_OUTPUT = range(4)
+
+
+class FlatGraph(object):
+    """
+    Node and edge table of a serialized session flattened across all the
+    nested group nodes.
+
+    Nodes are referenced by their index in the table, the per node and per
+    edge values are stored in compact ``array`` columns. The group nodes and
+    port nodes are kept in the node table (see :attr:`FlatGraph.kinds`) but
+    the edges are resolved through them so each edge connects two
+    :data:`NODE` nodes directly.
+
+    Attributes:
+        node_ids (list[str]): node id in its parent session.
+        kinds (array): node kind (NODE, GROUP, PORT_INPUT, PORT_OUTPUT).
+        types (array): index into :attr:`FlatGraph.type_names`.
+        parents (array): index of the parent group node (-1 at the top level).
+        edge_src (array): source node index.
+        edge_src_port (array): index into :attr:`FlatGraph.port_names`.
+        edge_dst (array): destination node index.
+        edge_dst_port (array): index into :attr:`FlatGraph.port_names`.
+    """
+
+    def __init__(self):
+        self.node_ids = []
+        self.type_names = []
+        self.port_names = []
+        self.kinds = array('b')
+        self.types = array('i')
+        self.parents = array('i')
+        self.edge_src = array('i')
+        self.edge_src_port = array('i')
+        self.edge_dst = array('i')
+        self.edge_dst_port = array('i')
+
+    def __repr__(self):
+        return '<{}(nodes={}, edges={}) object at {}>'.format(
+            self.__class__.__name__, len(self), self.edge_count, hex(id(self)))
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    @property
+    def edge_count(self):
+        return len(self.edge_src)
+
+    def node_type(self, index):
+        """
+        Returns the node type identifier of a node.
+
+        Args:
+            index (int): node index.
+
+        Returns:
+            str: node type identifier.
+        """
+        return self.type_names[self.types[index]]
+
+    def path(self, index):
+        """
+        Returns the node id path from the top level session.
+
+        Args:
+            index (int): node index.
+
+        Returns:
+            str: node path eg. ``"0x1c8ad2/n03"``
+        """
+        names = []
+        while index >= 0:
+            names.append(self.node_ids[index])
+            index = self.parents[index]
+        return '/'.join(reversed(names))
+
+    def nodes(self, kind=NODE):
+        """
+        Returns the indexes of the nodes of a kind.
+
+        Args:
+            kind (int): node kind.
+
+        Returns:
+            list[int]: node indexes.
+        """
+        return [i for i, k in enumerate(self.kinds) if k == kind]
+
+    def edges(self):
+        """
+        Yields the resolved edges.
+
+        Yields:
+            tuple(int, str, int, str): source node, source port,
+                destination node, destination port.
+        """
+        port_names = self.port_names
+        for i in range(len(self.edge_src)):
+            yield (self.edge_src[i], port_names[self.edge_src_port[i]],
+                   self.edge_dst[i], port_names[self.edge_dst_port[i]])
+
+
+def _sub_session(value, table, decoded):
+    """
+    Returns the decoded sub graph session of a serialized group node.
+
+    Args:
+        value (str or dict): serialized "subgraph_session" value.
+        table (dict): shared sessions table of the top level session.
+        decoded (dict): decoded sessions by content hash.
+
+    Returns:
+        dict: sub graph session or None.
+    """
+    if not value:
+        return
+    if isinstance(value, dict):
+        return value
+    if value in decoded:
+        return decoded[value]
+    session = None
+    if value in table:
+        session = json.loads(table[value]['session'])
+    elif get_blob(value) is not None:
+        session = get_blob(value).data()
+    elif value.startswith('{'):
+        session = json.loads(value)
+    decoded[value] = session
+    return session
+
+
+def flatten_session(session):
+    """
+    Flatten a serialized session across all its nested group node sessions
+    without building any sub graph, viewer or node items.
+
+    Identical group sessions are only decoded once.
+
+    Args:
+        session (dict): serialized session
+            (see :meth:`NodeGraph.serialize_session`).
+
+    Returns:
+        FlatGraph: flattened node and edge table.
+    """
+    flat = FlatGraph()
+    type_indexes = {}
+    port_indexes = {}
+    table = session.get(SESSIONS_KEY, {})
+    decoded = {}
+
+    # (node index, output port) -> [(node index, input port)]
+    out_links = {}
+    # (group index, port name) -> input port node index
+    port_input_nodes = {}
+    # output port node index -> (group index, port name)
+    port_output_groups = {}
+
+    stack = [(session, -1)]
+    while stack:
+        data, parent = stack.pop()
+        local = {}
+        for n_id, n_data in data.get('nodes', {}).items():
+            index = len(flat.node_ids)
+            local[n_id] = index
+            type_ = n_data.get('type_', '')
+            if type_ == PortInputNode.type_:
+                kind = PORT_INPUT
+                port_input_nodes[(parent, n_data.get('name'))] = index
+            elif type_ == PortOutputNode.type_:
+                kind = PORT_OUTPUT
+                port_output_groups[index] = (parent, n_data.get('name'))
+            else:
+                sub_session = _sub_session(
+                    n_data.get('subgraph_session'), table, decoded)
+                kind = GROUP if sub_session else NODE
+                if sub_session:
+                    stack.append((sub_session, index))
+
+            if type_ not in type_indexes:
+                type_indexes[type_] = len(flat.type_names)
+                flat.type_names.append(type_)
+            flat.node_ids.append(n_id)
+            flat.kinds.append(kind)
+            flat.types.append(type_indexes[type_])
+            flat.parents.append(parent)
+
+        for connection in data.get('connections', []):
+            in_id, in_port = connection.get('in', ('', ''))
+            out_id, out_port = connection.get('out', ('', ''))
+            if in_id in local and out_id in local:
+                out_links.setdefault((local[out_id], out_port), []).append(
+                    (local[in_id], in_port))
+
+    # resolve the edges through the group and port nodes.
+    kinds = flat.kinds
+    for src, src_port in out_links:
+        if kinds[src] != NODE:
+            continue
+        seen = set()
+        pending = list(out_links[(src, src_port)])
+        while pending:
+            dst, dst_port = pending.pop()
+            if (dst, dst_port) in seen:
+                continue
+            seen.add((dst, dst_port))
+            kind = kinds[dst]
+            if kind == GROUP:
+                # continue from the input port node inside the group.
+                inner = port_input_nodes.get((dst, dst_port))
+                if inner is not None:
+                    pending.extend(out_links.get((inner, dst_port), ()))
+            elif kind == PORT_OUTPUT:
+                # continue from the group output port in the parent session.
+                group, name = port_output_groups[dst]
+                if group >= 0:
+                    pending.extend(out_links.get((group, name), ()))
+            elif kind == NODE:
+                for name in (src_port, dst_port):
+                    if name not in port_indexes:
+                        port_indexes[name] = len(flat.port_names)
+                        flat.port_names.append(name)
+                flat.edge_src.append(src)
+                flat.edge_src_port.append(port_indexes[src_port])
+                flat.edge_dst.append(dst)
+                flat.edge_dst_port.append(port_indexes[dst_port])
+    return flat
@@ -1,23 +1,34 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
-import copy
 import json
 import os
 import re
+from collections import deque
 
 from Qt import QtCore, QtWidgets
 
 from NodeGraphQt.base.commands import (NodeAddedCmd,
                                        NodeRemovedCmd,
-                                       NodeMovedCmd,
+                                       NodesDeletedCmd,
+                                       NodesPropertyChangedCmd,
+                                       NodesSnapshotCmd,
+                                       NodesMovedCmd,
                                        PortConnectedCmd)
-from NodeGraphQt.base.factory import NodeFactory
+from NodeGraphQt.base.executor import GraphExecutor
+from NodeGraphQt.base.factory import NodeFactory, load_manifest
+from NodeGraphQt.base.flat_graph import flatten_session
 from NodeGraphQt.base.menu import NodeGraphMenu, NodesMenu
 from NodeGraphQt.base.model import NodeGraphModel
 from NodeGraphQt.base.node import NodeObject
+from NodeGraphQt.base.session_store import (SESSIONS_KEY,
+                                            SessionBlob,
+                                            load_sessions,
+                                            sessions_table)
 from NodeGraphQt.base.port import Port
+from NodeGraphQt.base.undo_budget import UndoBudget
 from NodeGraphQt.constants import (
     NODE_LAYOUT_DIRECTION, NODE_LAYOUT_HORIZONTAL, NODE_LAYOUT_VERTICAL,
+    NodeEnum,
     PipeLayoutEnum,
     URI_SCHEME, URN_SCHEME,
     PortTypeEnum,
@@ -27,6 +38,7 @@ from NodeGraphQt.nodes.backdrop_node import BackdropNode
 from NodeGraphQt.nodes.base_node import BaseNode
 from NodeGraphQt.nodes.group_node import GroupNode
 from NodeGraphQt.nodes.port_node import PortInputNode, PortOutputNode
+from NodeGraphQt.qgraphics.theme import SharedTheme
 from NodeGraphQt.widgets.node_graph import NodeGraphWidget, SubGraphWidget
 from NodeGraphQt.widgets.viewer import NodeViewer
 from NodeGraphQt.widgets.viewer_nav import NodeNavigationWidget
@@ -93,6 +105,15 @@ class NodeGraph(QtCore.QObject):
     :parameters: :class:`NodeGraphQt.Port`, :class:`NodeGraphQt.Port`
     :emits: input port, output port
     """
+    ports_disconnected = QtCore.Signal(list)
+    """
+    Signal triggered when the connections of deleted nodes have been removed
+    (emitted once instead of :attr:`NodeGraph.port_disconnected` for each
+    connection).
+
+    :parameters: list[tuple(:class:`NodeGraphQt.Port`, :class:`NodeGraphQt.Port`)]
+    :emits: input port and output port of each removed connection.
+    """
     property_changed = QtCore.Signal(NodeObject, str, object)
     """
     Signal is triggered when a property has changed on a node.
@@ -100,6 +121,15 @@ class NodeGraph(QtCore.QObject):
     :parameters: :class:`NodeGraphQt.BaseNode`, str, object
     :emits: triggered node, property name, property value
     """
+    properties_changed = QtCore.Signal(list, str, list)
+    """
+    Signal is triggered when a property has changed on multiple nodes with
+    :meth:`NodeGraph.set_nodes_property` (emitted instead of
+    :attr:`NodeGraph.property_changed` for each node).
+
+    :parameters: list[:class:`NodeGraphQt.BaseNode`], str, list[object]
+    :emits: triggered nodes, property name, property value for each node
+    """
     data_dropped = QtCore.Signal(QtCore.QMimeData, QtCore.QPoint)
     """
     Signal is triggered when data has been dropped to the graph.
@@ -115,6 +145,9 @@ class NodeGraph(QtCore.QObject):
     :emits: new session path
     """
 
+    # internal signal to start the progress update timer from any thread.
+    _progress_queued = QtCore.Signal()
+
     def __init__(self, parent=None, **kwargs):
         """
         Args:
@@ -131,16 +164,30 @@ class NodeGraph(QtCore.QObject):
         self._undo_view = None
         self._undo_stack = (
             kwargs.get('undo_stack') or QtWidgets.QUndoStack(self))
+        self._undo_budget = UndoBudget(self._undo_stack)
+        self._snapshot_undo = True
 
         self._widget = None
 
         self._sub_graphs = {}
 
-        self._default_theme = {}
+        self._default_theme = SharedTheme()
         
         self._viewer = (
             kwargs.get('viewer') or NodeViewer(undo_stack=self._undo_stack))
 
+        # progress bar updates queued from any thread.
+        self._progress_queue = deque()
+        self._progress_pending = False
+        self._progress_timer = QtCore.QTimer(self)
+        self._progress_timer.setSingleShot(True)
+        self._progress_timer.setInterval(16)
+        self._progress_timer.timeout.connect(self._apply_progress_updates)
+        self._progress_queued.connect(self._progress_timer.start)
+
+        # node execution engine. (created on first use)
+        self._executor = None
+
         self._build_context_menu()
         self._register_builtin_nodes()
         self._wire_signals()
@@ -232,6 +279,19 @@ class NodeGraph(QtCore.QObject):
         if node.get_property(prop_name) != prop_value:
             node.set_property(prop_name, prop_value)
 
+    def _on_property_bin_nodes_changed(self, node_ids, prop_name, prop_value):
+        """
+        called when a property widget has changed for multiple nodes in a
+        properties bin.
+
+        Args:
+            node_ids (list[str]): node ids.
+            prop_name (str): node property name.
+            prop_value (object): python built in types.
+        """
+        nodes = [self.get_node_by_id(nid) for nid in node_ids]
+        self.set_nodes_property([n for n in nodes if n], prop_name, prop_value)
+
     def _on_node_name_changed(self, node_id, name):
         """
         called when a node text qgraphics item in the viewer is edited.
@@ -329,11 +389,12 @@ class NodeGraph(QtCore.QObject):
         Args:
             node_data (dict): {<node_view>: <previous_pos>}
         """
-        self._undo_stack.beginMacro('move nodes')
+        moves = []
         for node_view, prev_pos in node_data.items():
             node = self._model.nodes[node_view.id]
-            self._undo_stack.push(NodeMovedCmd(node, node.pos(), prev_pos))
-        self._undo_stack.endMacro()
+            moves.append((node, node.pos(), prev_pos))
+        # single command (not a macro) so continuous moves can be merged.
+        self._undo_stack.push(NodesMovedCmd(moves))
 
     def _on_node_backdrop_updated(self, node_id, update_property, value):
         """
@@ -591,6 +652,28 @@ class NodeGraph(QtCore.QObject):
             prop_bin (NodeGraphQt.PropertiesBinWidget): properties widget.
         """
         prop_bin.property_changed.connect(self._on_property_bin_changed)
+        prop_bin.properties_changed.connect(
+            self._on_property_bin_nodes_changed)
+
+    def set_nodes_property(self, nodes, name, value, push_undo=True):
+        """
+        Set the value of a property on multiple nodes as a single undo
+        command and a single :attr:`NodeGraph.properties_changed` signal.
+
+        Args:
+            nodes (list[NodeGraphQt.NodeObject]): nodes.
+            name (str): name of the property.
+            value (object): property data (python built in types).
+            push_undo (bool): register the command to the undo stack.
+                (default: True)
+        """
+        undo_cmd = NodesPropertyChangedCmd(self, nodes, name, value)
+        if not undo_cmd.nodes:
+            return
+        if push_undo:
+            self._undo_stack.push(undo_cmd)
+        else:
+            undo_cmd.redo()
 
     def undo_stack(self):
         """
@@ -637,6 +720,214 @@ class NodeGraph(QtCore.QObject):
         """
         self._undo_stack.endMacro()
 
+    def set_snapshot_undo(self, enabled=True):
+        """
+        Set the undo mode used for large structural operations
+        (paste, duplicate and auto layout).
+
+        When enabled the operation is recorded as a single snapshot command
+        with the affected node properties and created nodes so undo and redo
+        are applied in one batched update, when disabled every change is
+        pushed as a separate command in a undo macro.
+
+        Args:
+            enabled (bool): true to use snapshot undo (default: True).
+        """
+        self._snapshot_undo = enabled
+
+    def snapshot_undo(self):
+        """
+        Returns true if large structural operations are recorded as snapshot
+        undo commands.
+
+        See Also:
+            :meth:`NodeGraph.set_snapshot_undo()`
+
+        Returns:
+            bool: true if snapshot undo is enabled.
+        """
+        return self._snapshot_undo
+
+    def _begin_structural_undo(self, text, nodes):
+        """
+        Start recording a structural operation followed by a
+        :meth:`NodeGraph._end_structural_undo()`.
+
+        Args:
+            text (str): undo command text.
+            nodes (list[NodeGraphQt.NodeObject]): existing nodes affected by
+                the operation.
+
+        Returns:
+            NodesSnapshotCmd: snapshot command or None if the changes are
+                pushed to the undo stack as a macro.
+        """
+        if self._snapshot_undo:
+            return NodesSnapshotCmd(self, nodes, text)
+        self._undo_stack.beginMacro(text)
+
+    def _end_structural_undo(self, undo_cmd, added_nodes=None):
+        """
+        End recording a structural operation started by
+        :meth:`NodeGraph._begin_structural_undo()`.
+
+        Args:
+            undo_cmd (NodesSnapshotCmd): snapshot command or None.
+            added_nodes (list[NodeGraphQt.NodeObject]): nodes created by the
+                operation.
+        """
+        if undo_cmd is None:
+            self._undo_stack.endMacro()
+            return
+        undo_cmd.capture(added_nodes)
+        self._undo_stack.push(undo_cmd)
+
+    def set_undo_budget(self, max_commands=0, max_bytes=0):
+        """
+        Set a budget for the memory held by the undo history.
+
+        When the estimated size of the undo history goes over ``max_bytes``
+        the oldest commands are evicted and can no longer be undone.
+
+        Note:
+            ``max_commands`` uses :meth:`QUndoStack.setUndoLimit` which
+            can only be set on a empty stack, if the undo stack isn't empty
+            the limit is applied the next time the undo stack is cleared.
+
+        See Also:
+            :meth:`NodeGraph.undo_memory_report()`
+
+        Args:
+            max_commands (int): maximum number of commands (0 for unlimited).
+            max_bytes (int): maximum estimated size in bytes (0 for unlimited).
+        """
+        self._undo_budget.set_budget(max_commands, max_bytes)
+
+    def undo_memory_report(self):
+        """
+        Returns a report of the estimated memory held by the undo history.
+
+        See Also:
+            :meth:`NodeGraph.set_undo_budget()`
+
+        Returns:
+            dict: command count, estimated bytes, evictions and the usage
+                per command type.
+        """
+        return self._undo_budget.report()
+
+    def update_progress(self, mapping):
+        """
+        Queue node progress bar updates, this function can be called from
+        any thread.
+
+        The updates are applied on the GUI thread once per frame and only the
+        latest value for each node is applied.
+
+        Value types:
+            * ``int`` or ``float``: progress bar percentage.
+            * ``list[tuple]``: progress bar block colors.
+            * ``dict``: :meth:`NodeItem.set_progress_bar_percent` keyword
+              arguments. eg. ``{'percent': 100, 'color': (0, 125, 0, 255)}``
+            * ``None``: hide the progress bar.
+
+        Args:
+            mapping (dict): {node id: value}
+        """
+        # deque.append() is thread safe, the timer is started on the GUI
+        # thread through a queued signal.
+        self._progress_queue.append(dict(mapping))
+        if not self._progress_pending:
+            self._progress_pending = True
+            self._progress_queued.emit()
+
+    def _apply_progress_updates(self):
+        """
+        Apply the queued progress bar updates keeping the latest value for
+        each node.
+        """
+        self._progress_pending = False
+        latest = {}
+        queue = self._progress_queue
+        while queue:
+            latest.update(queue.popleft())
+
+        for node_id, value in latest.items():
+            node = self._progress_node(node_id)
+            if node is None or not hasattr(node.view, 'set_progress_bar_mode'):
+                continue
+            if value is None:
+                node.view.set_progress_bar_mode(
+                    NodeEnum.PROGRESS_BAR_MODE_NONE.value)
+            elif isinstance(value, (list, tuple)):
+                node.view.set_progress_bar_block_colors(value)
+            elif isinstance(value, dict):
+                node.view.set_progress_bar_percent(**value)
+            else:
+                node.view.set_progress_bar_percent(value)
+
+    def executor(self):
+        """
+        Returns the executor used to run the nodes in the node graph.
+
+        The node outputs are cached within a memory budget
+        (256 MB by default) see :meth:`NodeGraph.set_result_cache_budget`.
+
+        See Also:
+            :meth:`NodeGraph.execute_nodes`, :meth:`BaseNode.run`
+
+        Returns:
+            NodeGraphQt.GraphExecutor: graph executor.
+        """
+        if self._executor is None:
+            self._executor = GraphExecutor(self)
+        return self._executor
+
+    def set_result_cache_budget(self, max_bytes):
+        """
+        Set the memory budget of the executor node result cache.
+
+        See Also:
+            :meth:`GraphExecutor.stats`
+
+        Args:
+            max_bytes (int): maximum estimated size in bytes (0 for unlimited).
+        """
+        self.executor().set_cache_bytes(max_bytes)
+
+    def execute_nodes(self, nodes=None, wait=False):
+        """
+        Execute the :meth:`BaseNode.run` function of the nodes and their
+        upstream nodes in topological order.
+
+        Args:
+            nodes (list[NodeGraphQt.BaseNode]): nodes to execute
+                (default: all nodes).
+            wait (bool): block until the execution finished.
+
+        Returns:
+            dict: {node id: outputs} if ``wait`` is true else None.
+        """
+        return self.executor().execute(nodes, wait=wait)
+
+    def _progress_node(self, node_id):
+        """
+        Returns the node from this graph or the expanded sub graphs.
+
+        Args:
+            node_id (str): node id.
+
+        Returns:
+            NodeGraphQt.NodeObject: node or None.
+        """
+        node = self._model.nodes.get(node_id)
+        if node is None:
+            for sub_graph in self._sub_graphs.values():
+                node = sub_graph._progress_node(node_id)
+                if node is not None:
+                    break
+        return node
+
     def context_menu(self):
         """
         Returns the context menu for the node graph.
@@ -848,7 +1139,7 @@ class NodeGraph(QtCore.QObject):
         Returns:
             list[str]: list of node type identifiers.
         """
-        return sorted(self._node_factory.nodes.keys())
+        return sorted(self._node_factory.node_types())
 
     def register_node(self, node, alias=None):
         """
@@ -871,6 +1162,34 @@ class NodeGraph(QtCore.QObject):
         [self._node_factory.register_node(n) for n in nodes]
         self._viewer.rebuild_tab_search()
 
+    def register_node_descriptors(self, descriptors):
+        """
+        Register nodes from lightweight descriptors without importing the
+        node classes, a class is imported when the first node of its type
+        is created.
+
+        See Also:
+            :class:`NodeGraphQt.base.factory.NodeDescriptor`
+
+        Args:
+            descriptors (list[NodeDescriptor or dict]): node descriptors.
+        """
+        [self._node_factory.register_descriptor(d) for d in descriptors]
+        self._viewer.rebuild_tab_search()
+
+    def register_nodes_manifest(self, file_path):
+        """
+        Register the nodes listed in a JSON manifest file without importing
+        the node classes.
+
+        See Also:
+            :func:`NodeGraphQt.base.factory.load_manifest`
+
+        Args:
+            file_path (str): manifest file path.
+        """
+        self.register_node_descriptors(load_manifest(file_path))
+
     def create_node(self, node_type, name=None, selected=True, color=None,
                     text_color=None, pos=None, push_undo=True):
         """
@@ -968,9 +1287,8 @@ class NodeGraph(QtCore.QObject):
         node.NODE_NAME = self.get_unique_name(node.NODE_NAME)
         node.model._graph_model = self.model
         node.model.name = node.NODE_NAME
-        default_theme_op = getattr(node, "set_default_theme", None)
-        if default_theme_op:
-            node.set_default_theme(self._default_theme)
+        if getattr(node._view, 'set_default_theme', None):
+            node._view.set_default_theme(self._default_theme)
         node.update()
 
         if push_undo:
@@ -1068,30 +1386,28 @@ class NodeGraph(QtCore.QObject):
         if len(nodes) == 1:
             self.delete_node(nodes[0], push_undo=push_undo)
             return
-        node_ids = [n.id for n in nodes]
-        if push_undo:
-            self._undo_stack.beginMacro('deleted "{}" nodes'.format(len(nodes)))
-        for node in nodes:
-            if isinstance(node, BaseNode):
-                for p in node.input_ports():
-                    if p.locked():
-                        p.set_locked(False,
-                                     connected_ports=False,
-                                     push_undo=push_undo)
-                    p.clear_connections(push_undo=push_undo)
-                for p in node.output_ports():
-                    if p.locked():
-                        p.set_locked(False,
-                                     connected_ports=False,
-                                     push_undo=push_undo)
-                    p.clear_connections(push_undo=push_undo)
-            if push_undo:
-                self._undo_stack.push(NodeRemovedCmd(self, node))
-            else:
-                NodeRemovedCmd(self, node).redo()
+        self._remove_nodes(nodes, push_undo=push_undo)
+
+    def _remove_nodes(self, nodes, text=None, push_undo=True):
+        """
+        Remove the nodes and their connections with a single
+        :class:`NodesDeletedCmd` and emit the signals once the nodes have
+        been removed. (the removed connections are emitted with a single
+        :attr:`NodeGraph.ports_disconnected` signal)
+
+        Args:
+            nodes (list[NodeGraphQt.BaseNode]): list of node instances.
+            text (str): undo command text.
+            push_undo (bool): register the command to the undo stack.
+        """
+        undo_cmd = NodesDeletedCmd(self, nodes, text)
         if push_undo:
-            self._undo_stack.endMacro()
-        self.nodes_deleted.emit(node_ids)
+            self._undo_stack.push(undo_cmd)
+        else:
+            undo_cmd.redo()
+        if undo_cmd.edges:
+            self.ports_disconnected.emit(list(undo_cmd.edges))
+        self.nodes_deleted.emit([n.id for n in nodes])
 
     def all_nodes(self):
         """
@@ -1212,17 +1528,11 @@ class NodeGraph(QtCore.QObject):
         """
         Clears the current node graph session.
         """
-        for n in self.all_nodes():
-            if isinstance(n, BaseNode):
-                for p in n.input_ports():
-                    if p.locked():
-                        p.set_locked(False, connected_ports=False)
-                    p.clear_connections()
-                for p in n.output_ports():
-                    if p.locked():
-                        p.set_locked(False, connected_ports=False)
-                    p.clear_connections()
-            self._undo_stack.push(NodeRemovedCmd(self, n))
+        nodes = self.all_nodes()
+        if nodes:
+            # the undo history is cleared so the nodes are removed in bulk
+            # without pushing undo commands.
+            NodesDeletedCmd(self, nodes, 'clear session').redo()
         self._undo_stack.clear()
         self._model.session = ''
         self._model._custom_prop = {}
@@ -1244,7 +1554,7 @@ class NodeGraph(QtCore.QObject):
         # serialize graph session.
         serial_data['graph']['acyclic'] = self.acyclic()
         serial_data['graph']['pipe_collision'] = self.pipe_collision()
-        serial_data['graph']['default_theme'] = self._default_theme
+        serial_data['graph']['default_theme'] = self._default_theme.values()
         graph_props = self.properties()
         if graph_props:
             serial_data['graph']['custom'] = graph_props
@@ -1255,12 +1565,19 @@ class NodeGraph(QtCore.QObject):
             n.update_model()
 
             node_dict = n.model.to_dict
-            # add node theme overrid values
-            if getattr(n._view, "get_theme_specifics", None):
-                for key, value in node_dict.items():
-                    node_dict[key]['theme_overrides'] =  n._view.get_theme_specifics(self._default_theme)
+            # add node theme override values
+            if getattr(n._view, 'has_theme_overrides', None) and \
+                    n._view.has_theme_overrides():
+                node_dict[n.id]['theme_overrides'] = \
+                    n._view.get_theme_specifics()
             nodes_data.update(node_dict)
 
+        # serialize the shared group node sessions.
+        session_blobs = [n.model.subgraph_session for n in nodes
+                         if isinstance(n.model.subgraph_session, SessionBlob)]
+        if session_blobs:
+            serial_data[SESSIONS_KEY] = sessions_table(session_blobs)
+
         for n_id, n_data in nodes_data.items():
             serial_data['nodes'][n_id] = n_data
 
@@ -1293,7 +1610,8 @@ class NodeGraph(QtCore.QObject):
 
         return serial_data
 
-    def _deserialize(self, data, relative_pos=False, pos=None):
+    def _deserialize(self, data, relative_pos=False, pos=None,
+                     push_undo=True):
         """
         deserialize node data.
         (used internally by the node graph)
@@ -1302,10 +1620,15 @@ class NodeGraph(QtCore.QObject):
             data (dict): node data.
             relative_pos (bool): position node relative to the cursor.
             pos (tuple or list): custom x, y position.
+            push_undo (bool): register the commands to the undo stack.
 
         Returns:
             list[NodeGraphQt.Nodes]: list of node instances.
         """
+        # load the shared group node sessions.
+        # (held until the group nodes reference them)
+        session_blobs = load_sessions(data.get(SESSIONS_KEY, {}))
+
         # update node graph properties.
         for attr_name, attr_value in data.get('graph', {}).items():
             if attr_name == 'acyclic':
@@ -1329,6 +1652,8 @@ class NodeGraph(QtCore.QObject):
                 for prop in node.model.properties.keys():
                     if prop in n_data.keys():
                         node.model.set_property(prop, n_data[prop])
+                if isinstance(node, GroupNode):
+                    node.set_sub_graph_session(node.model.subgraph_session)
                 # set custom properties.
                 for prop, val in n_data.get('custom', {}).items():
                     if node.has_property(prop):
@@ -1340,7 +1665,7 @@ class NodeGraph(QtCore.QObject):
                         node.view.widgets[prop].set_value(val)
                 
                 nodes[n_id] = node
-                self.add_node(node, n_data.get('pos'))
+                self.add_node(node, n_data.get('pos'), push_undo=push_undo)
 
                 # create custom products which were originally added after node creation
                 if n_data.get('custom_property_data'):
@@ -1365,6 +1690,9 @@ class NodeGraph(QtCore.QObject):
                         'output_ports': n_data['output_ports']
                     })
 
+        # the group nodes now hold the loaded sessions.
+        del session_blobs
+
         # build the connections.
         for connection in data.get('connections', []):
             nid, pname = connection.get('in', ('', ''))
@@ -1385,8 +1713,12 @@ class NodeGraph(QtCore.QObject):
                 # important when duplicating nodes.
                 allow_connection = any([not in_port.model.connected_ports,
                                         in_port.model.multi_connection])
-                if allow_connection:
+                if not allow_connection:
+                    continue
+                if push_undo:
                     self._undo_stack.push(PortConnectedCmd(in_port, out_port))
+                else:
+                    PortConnectedCmd(in_port, out_port).redo()
 
         node_objs = nodes.values()
         if relative_pos:
@@ -1412,6 +1744,28 @@ class NodeGraph(QtCore.QObject):
         """
         return self._serialize(self.all_nodes())
 
+    def flatten_session(self, nodes=None):
+        """
+        Returns the node graph session flattened across all the nested group
+        nodes into a single node and edge table, the group node sessions are
+        read without expanding them.
+
+        Note:
+            Changes in the currently expanded sub graphs are only included
+            once they're collapsed.
+
+        See Also:
+            :func:`NodeGraphQt.base.flat_graph.flatten_session`
+
+        Args:
+            nodes (list[NodeGraphQt.BaseNode]): nodes to flatten
+                (default: all nodes).
+
+        Returns:
+            NodeGraphQt.base.flat_graph.FlatGraph: flattened session.
+        """
+        return flatten_session(self._serialize(nodes or self.all_nodes()))
+
     def deserialize_session(self, layout_data):
         """
         Load node graph session from a dictionary object.
@@ -1531,10 +1885,10 @@ class NodeGraph(QtCore.QObject):
                 list of nodes (default: selected nodes).
         """
         nodes = nodes or self.selected_nodes()
+        if not nodes:
+            return
         self.copy_nodes(nodes)
-        self._undo_stack.beginMacro('cut nodes')
-        [self._undo_stack.push(NodeRemovedCmd(self, n)) for n in nodes]
-        self._undo_stack.endMacro()
+        self._remove_nodes(nodes, text='cut nodes')
 
     def paste_nodes(self):
         """
@@ -1552,11 +1906,15 @@ class NodeGraph(QtCore.QObject):
                   '"{}"'.format(cb_text))
             return
 
-        self._undo_stack.beginMacro('pasted nodes')
-        self.clear_selection()
-        nodes = self._deserialize(serial_data, relative_pos=True)
-        [n.set_selected(True) for n in nodes]
-        self._undo_stack.endMacro()
+        selected = self.selected_nodes()
+        undo_cmd = self._begin_structural_undo('pasted nodes', selected)
+        push_undo = undo_cmd is None
+        [n.set_property('selected', False, push_undo) for n in selected]
+        nodes = self._deserialize(serial_data,
+                                  relative_pos=True,
+                                  push_undo=push_undo)
+        [n.set_property('selected', True, push_undo) for n in nodes]
+        self._end_structural_undo(undo_cmd, nodes)
 
     def duplicate_nodes(self, nodes):
         """
@@ -1570,18 +1928,21 @@ class NodeGraph(QtCore.QObject):
         if not nodes:
             return
 
-        self._undo_stack.beginMacro('duplicate nodes')
+        selected = self.selected_nodes()
+        undo_cmd = self._begin_structural_undo('duplicate nodes', selected)
+        push_undo = undo_cmd is None
 
-        self.clear_selection()
+        [n.set_property('selected', False, push_undo) for n in selected]
         serial = self._serialize(nodes)
-        new_nodes = self._deserialize(serial)
+        new_nodes = self._deserialize(serial, push_undo=push_undo)
         offset = 50
         for n in new_nodes:
             x, y = n.pos()
-            n.set_pos(x + offset, y + offset)
-            n.set_property('selected', True)
+            n.set_property('pos', [float(x + offset), float(y + offset)],
+                           push_undo)
+            n.set_property('selected', True, push_undo)
 
-        self._undo_stack.endMacro()
+        self._end_structural_undo(undo_cmd, new_nodes)
         return new_nodes
 
     def disable_nodes(self, nodes, mode=None):
@@ -1729,8 +2090,6 @@ class NodeGraph(QtCore.QObject):
             start_nodes (list[NodeGraphQt.BaseNode]):
                 list of nodes to start the auto layout from (Optional).
         """
-        self.begin_undo('Auto Layout Nodes')
-
         nodes = nodes or self.all_nodes()
 
         # filter out the backdrops.
@@ -1754,6 +2113,12 @@ class NodeGraph(QtCore.QObject):
         if not start_nodes:
             return
 
+        undo_cmd = self._begin_structural_undo('Auto Layout Nodes', nodes)
+        push_undo = undo_cmd is None
+
+        def set_pos(node, x, y):
+            node.set_property('pos', [float(x), float(y)], push_undo)
+
         node_views = [n.view for n in nodes]
         nodes_center_0 = self.viewer().nodes_rect_center(node_views)
 
@@ -1777,7 +2142,7 @@ class NodeGraph(QtCore.QObject):
                 for idx, node in enumerate(ranked_nodes):
                     dy = max(node_height, node.view.height)
                     current_y += 0 if idx == 0 else dy
-                    node.set_pos(current_x, current_y)
+                    set_pos(node, current_x, current_y)
                     current_y += dy * 0.5 + 10
 
                 current_x += max_width * 0.5 + 100
@@ -1792,7 +2157,7 @@ class NodeGraph(QtCore.QObject):
                 for idx, node in enumerate(ranked_nodes):
                     dx = max(node_width, node.view.width)
                     current_x += 0 if idx == 0 else dx
-                    node.set_pos(current_x, current_y)
+                    set_pos(node, current_x, current_y)
                     current_x += dx * 0.5 + 10
 
                 current_y += max_height * 0.5 + 100
@@ -1800,13 +2165,13 @@ class NodeGraph(QtCore.QObject):
         nodes_center_1 = self.viewer().nodes_rect_center(node_views)
         dx = nodes_center_0[0] - nodes_center_1[0]
         dy = nodes_center_0[1] - nodes_center_1[1]
-        [n.set_pos(n.x_pos() + dx, n.y_pos() + dy) for n in nodes]
+        [set_pos(n, n.x_pos() + dx, n.y_pos() + dy) for n in nodes]
 
         # wrap the backdrop nodes.
         for backdrop, contained_nodes in backdrops.items():
-            backdrop.wrap_nodes(contained_nodes)
+            backdrop.wrap_nodes(contained_nodes, push_undo=push_undo)
 
-        self.end_undo()
+        self._end_structural_undo(undo_cmd)
 
     # convenience dialog functions.
     # --------------------------------------------------------------------------
@@ -1954,7 +2319,7 @@ class NodeGraph(QtCore.QObject):
             return sub_graph
 
         # build new sub graph.
-        node_factory = copy.deepcopy(self.node_factory)
+        node_factory = self.node_factory.child_factory()
         sub_graph = SubGraph(self, node=node, node_factory=node_factory)
 
         # populate the sub graph.
@@ -2018,10 +2383,19 @@ class NodeGraph(QtCore.QObject):
             'port_hover_color': PortEnum.ACTIVE_COLOR.value,
             'port_hover_border_color': PortEnum.HOVER_BORDER_COLOR.value}
         """
-        self._default_theme = theme
-        for node_name, node in self._model.nodes.items():
-            if getattr(node._view, "set_default_theme", None):
-                node._view.set_default_theme(theme, update_current)
+        # the nodes share the theme object so they only need to be visited
+        # to keep their current theme or to set the node colors.
+        views = [n.view for n in self._model.nodes.values()
+                 if getattr(n.view, 'set_default_theme', None)]
+        if not update_current:
+            for view in views:
+                view.pin_theme()
+        self._default_theme.set_values(theme)
+        if update_current and \
+                ('node_color' in theme or 'node_border_color' in theme):
+            for view in views:
+                view.set_default_theme(self._default_theme)
+        self._viewer.scene().update()
 
 class SubGraph(NodeGraph):
     """
@@ -2050,6 +2424,19 @@ class SubGraph(NodeGraph):
         self._parent_graph = parent
         self._subviewer_widget = None
 
+        # true when the sub graph changed since it was expanded.
+        self._dirty = False
+        # graph model revision when the session was last in sync.
+        self._clean_revision = self._model.revision
+        self._undo_stack.indexChanged.connect(self.set_dirty)
+        self.node_created.connect(self.set_dirty)
+        self.nodes_deleted.connect(self.set_dirty)
+        self.port_connected.connect(self.set_dirty)
+        self.port_disconnected.connect(self.set_dirty)
+        self.ports_disconnected.connect(self.set_dirty)
+        self.property_changed.connect(self.set_dirty)
+        self.properties_changed.connect(self.set_dirty)
+
         if self._parent_graph.is_root:
             self._initialized_graphs = [self]
             self._sub_graphs[self._node.id] = self
@@ -2114,7 +2501,8 @@ class SubGraph(NodeGraph):
 
         return input_nodes, output_nodes
 
-    def _deserialize(self, data, relative_pos=False, pos=None):
+    def _deserialize(self, data, relative_pos=False, pos=None,
+                     push_undo=True):
         """
         deserialize node data.
         (used internally by the node graph)
@@ -2123,10 +2511,15 @@ class SubGraph(NodeGraph):
             data (dict): node data.
             relative_pos (bool): position node relative to the cursor.
             pos (tuple or list): custom x, y position.
+            push_undo (bool): register the commands to the undo stack.
 
         Returns:
             list[NodeGraphQt.Nodes]: list of node instances.
         """
+        # load the shared group node sessions.
+        # (held until the group nodes reference them)
+        session_blobs = load_sessions(data.get(SESSIONS_KEY, {}))
+
         # update node graph properties.
         for attr_name, attr_value in data.get('graph', {}).items():
             if attr_name == 'acyclic':
@@ -2144,11 +2537,15 @@ class SubGraph(NodeGraph):
             name = n_data.get('name')
             if identifier == PortInputNode.type_:
                 nodes[n_id] = input_nodes[name]
-                nodes[n_id].set_pos(*(n_data.get('pos') or [0, 0]))
+                nodes[n_id].set_property(
+                    'pos', [float(v) for v in n_data.get('pos') or [0, 0]],
+                    push_undo)
                 continue
             elif identifier == PortOutputNode.type_:
                 nodes[n_id] = output_nodes[name]
-                nodes[n_id].set_pos(*(n_data.get('pos') or [0, 0]))
+                nodes[n_id].set_property(
+                    'pos', [float(v) for v in n_data.get('pos') or [0, 0]],
+                    push_undo)
                 continue
 
             node = self._node_factory.create_node_instance(identifier)
@@ -2160,12 +2557,14 @@ class SubGraph(NodeGraph):
             for prop in node.model.properties.keys():
                 if prop in n_data.keys():
                     node.model.set_property(prop, n_data[prop])
+            if isinstance(node, GroupNode):
+                node.set_sub_graph_session(node.model.subgraph_session)
             # set custom properties.
             for prop, val in n_data.get('custom', {}).items():
                 node.model.set_property(prop, val)
 
             nodes[n_id] = node
-            self.add_node(node, n_data.get('pos'))
+            self.add_node(node, n_data.get('pos'), push_undo=push_undo)
 
             if n_data.get('port_deletion_allowed', None):
                 node.set_ports({
@@ -2173,6 +2572,9 @@ class SubGraph(NodeGraph):
                     'output_ports': n_data['output_ports']
                 })
 
+        # the group nodes now hold the loaded sessions.
+        del session_blobs
+
         # build the connections.
         for connection in data.get('connections', []):
             nid, pname = connection.get('in', ('', ''))
@@ -2188,7 +2590,10 @@ class SubGraph(NodeGraph):
             out_port = out_node.outputs().get(pname) if out_node else None
 
             if in_port and out_port:
-                self._undo_stack.push(PortConnectedCmd(in_port, out_port))
+                if push_undo:
+                    self._undo_stack.push(PortConnectedCmd(in_port, out_port))
+                else:
+                    PortConnectedCmd(in_port, out_port).redo()
 
         node_objs = list(nodes.values())
         if relative_pos:
@@ -2349,16 +2754,60 @@ class SubGraph(NodeGraph):
             )
         super(SubGraph, self).delete_node(node, push_undo=push_undo)
 
+    def is_dirty(self):
+        """
+        Returns true if the sub graph changed since it was expanded or last
+        written back to the group node.
+
+        Returns:
+            bool: true if changed.
+        """
+        return self._dirty or self._model.revision != self._clean_revision
+
+    def set_dirty(self, *args):
+        """
+        Mark the sub graph as changed so the session is written back to the
+        group node when collapsed.
+
+        Note:
+            Changes made through undo commands, the node graph signals and
+            the node and port models are tracked automatically, call this
+            function after mutating a model container directly.
+            (eg. ``node.model.custom_properties['foo'] = 'bar'``)
+        """
+        self._dirty = True
+
+    def deserialize_session(self, layout_data):
+        """
+        Load the group node session into the sub graph.
+
+        Args:
+            layout_data (dict): serialized sub graph session.
+        """
+        super(SubGraph, self).deserialize_session(layout_data)
+        # the sub graph now matches the group node session.
+        self._dirty = False
+        self._clean_revision = self._model.revision
+
     def collapse_graph(self, clear_session=True):
         """
         Collapse the current sub graph and hide its widget.
 
+        The group node session is only re-serialized if the sub graph
+        changed since it was expanded.
+
         Args:
             clear_session (bool): clear the current session.
         """
         # update the group node.
-        serialized_session = self.serialize_session()
-        self.node.set_sub_graph_session(serialized_session)
+        if self.is_dirty() or not self.node.get_sub_graph_session_blob():
+            old_session = self.node.get_sub_graph_session_blob()
+            self.node.set_sub_graph_session(self.serialize_session())
+            self._dirty = False
+            self._clean_revision = self._model.revision
+            if self.node.get_sub_graph_session_blob() is not old_session and \
+                    isinstance(self._parent_graph, SubGraph):
+                self._parent_graph.set_dirty()
 
         # close the visible widgets.
         if self._undo_view:
@@ -2404,7 +2853,7 @@ class SubGraph(NodeGraph):
             grp_sub_graph.collapse_graph(clear_session=False)
 
         # build new sub graph.
-        node_factory = copy.deepcopy(self.node_factory)
+        node_factory = self.node_factory.child_factory()
         sub_graph = SubGraph(self, node=node, node_factory=node_factory)
 
         # populate the sub graph.
@@ -12,6 +12,18 @@ from NodeGraphQt.constants import (
 from NodeGraphQt.errors import NodePropertyError, PortPropertyError, GraphPropertyError
 
 
+def _touch(graph_model):
+    """
+    Increment the revision of a node graph model after one of its node or
+    port models has changed.
+
+    Args:
+        graph_model (NodeGraphModel): node graph model (or None).
+    """
+    if graph_model is not None:
+        graph_model.revision += 1
+
+
 class PortModel(object):
     """
     Data dump for a port object.
@@ -33,6 +45,21 @@ class PortModel(object):
         return '<{}(\'{}\') object at {}>'.format(
             self.__class__.__name__, self.name, hex(id(self)))
 
+    def __setattr__(self, name, value):
+        changed = self.__dict__.get(name, self) != value
+        object.__setattr__(self, name, value)
+        if changed:
+            self._touch()
+
+    def _touch(self):
+        """
+        Increment the node graph model revision of the port node.
+        """
+        node = self.__dict__.get('node')
+        model = getattr(node, 'model', None)
+        if model is not None:
+            _touch(model._graph_model)
+
     def add_property(self, name, value):
         """
         add custom property.
@@ -44,10 +71,12 @@ class PortModel(object):
             raise PortPropertyError(
                 '"{}" Port property already exists.'.format(name))
         self._custom_prop[name] = value
+        self._touch()
 
     def set_property(self, name, value):
         if name in self._custom_prop.keys():
             self._custom_prop[name] = value
+            self._touch()
         else:
             raise PortPropertyError('No Port property "{}"'.format(name))
 
@@ -110,7 +139,8 @@ class NodeModel(object):
         self.port_deletion_allowed = False
 
         # GroupNode attrs.
-        self.subgraph_session = {}
+        # (shared session blob or the session content hash)
+        self.subgraph_session = ''
 
         # Custom
         self._custom_prop = {}
@@ -146,6 +176,12 @@ class NodeModel(object):
         return '<{}(\'{}\') object at {}>'.format(
             self.__class__.__name__, self.name, self.id)
 
+    def __setattr__(self, name, value):
+        changed = self.__dict__.get(name, self) != value
+        object.__setattr__(self, name, value)
+        if changed:
+            _touch(self.__dict__.get('_graph_model'))
+
     def add_property(self, name, value, items=None, range=None,
                      widget_type=NODE_PROP, tab=None, extra=None):
         """
@@ -171,6 +207,7 @@ class NodeModel(object):
         self._custom_prop[name] = value
         if extra:
             self._custom_prop_extra[name] = extra
+        _touch(self._graph_model)
 
         if self._graph_model is None:
             self._TEMP_property_widget_types[name] = widget_type
@@ -194,7 +231,9 @@ class NodeModel(object):
         if name in self.properties.keys():
             setattr(self, name, value)
         elif name in self._custom_prop.keys():
-            self._custom_prop[name] = value
+            if self._custom_prop[name] != value:
+                self._custom_prop[name] = value
+                _touch(self._graph_model)
         else:
             raise NodePropertyError('No property "{}"'.format(name))
 
@@ -246,6 +285,7 @@ class NodeModel(object):
     def set_property_extra(self, name, value):
         if name in self._custom_prop_extra.keys():
             self._custom_prop_extra[name] = value
+            _touch(self._graph_model)
         else:
             raise NodePropertyError('No property extra"{}"'.format(name))
 
@@ -304,7 +344,7 @@ class NodeModel(object):
                     'input_ports': [<port_name>, <port_name>],
                     'output_ports': [<port_name>, <port_name>],
                     },
-                    subgraph_session: <sub graph session data>
+                    subgraph_session: <sub graph session content hash>
                 }
         """
         node_dict = self.__dict__.copy()
@@ -340,7 +380,8 @@ class NodeModel(object):
             node_dict['output_ports'] = output_ports
 
         if self.subgraph_session:
-            node_dict['subgraph_session'] = self.subgraph_session
+            node_dict['subgraph_session'] = getattr(
+                self.subgraph_session, 'key', self.subgraph_session)
 
         custom_props_extra = node_dict.pop('_custom_prop_extra', {}) #remove and add as 'extra' below
         custom_props = node_dict.pop('_custom_prop', {})
@@ -389,6 +430,9 @@ class NodeGraphModel(object):
         self.pipe_collision = False
         self._custom_prop = {}
 
+        # incremented when a node or port model of the graph changes.
+        self.revision = 0
+
     def common_properties(self):
         """
         Return all common node properties.
@@ -487,6 +531,7 @@ class NodeGraphModel(object):
         props = self.__dict__.copy()
         props.pop('nodes')
         props.pop('session')
+        props.pop('revision')
         props.pop('_NodeGraphModel__common_node_props')
         custom_props = dict(props.pop('_custom_prop', {}))
         if custom_props:
@@ -0,0 +1,173 @@
+#!/usr/bin/python
+import hashlib
+import json
+import weakref
+
+# interned session blobs, a blob is kept alive by the group node models
+# (and parent blobs) referencing it.
+_BLOBS = weakref.WeakValueDictionary()
+
+#: serialized session key for the shared sub graph sessions table.
+SESSIONS_KEY = 'subgraph_sessions'
+
+
+class SessionBlob(object):
+    """
+    Immutable sub graph session stored as canonical JSON text and identified
+    by the hash of that text.
+
+    Group nodes with identical sub graph sessions share the same blob, the
+    session is only decoded with :meth:`SessionBlob.data` when a group node
+    is expanded.
+
+    Args:
+        key (str): content hash of the session text.
+        text (str): canonical session JSON text.
+        children (list[SessionBlob]): blobs of the nested group nodes.
+    """
+
+    __slots__ = ('key', 'text', 'children', '__weakref__')
+
+    def __init__(self, key, text, children=None):
+        self.key = key
+        self.text = text
+        self.children = children or []
+
+    def __repr__(self):
+        return '<{}("{}") object at {}>'.format(
+            self.__class__.__name__, self.key, hex(id(self)))
+
+    def data(self):
+        """
+        Returns a new decoded copy of the session.
+
+        Returns:
+            dict: serialized sub graph session.
+        """
+        return json.loads(self.text)
+
+
+def _canonical_session(session):
+    """
+    Returns a copy of the session with the node ids replaced by their index
+    so identical sub graphs have the same text.
+
+    Args:
+        session (dict): serialized sub graph session.
+
+    Returns:
+        dict: canonical session.
+    """
+    nodes = session.get('nodes', {})
+    width = len(str(len(nodes)))
+    id_map = {n_id: 'n{:0{}d}'.format(i, width)
+              for i, n_id in enumerate(nodes.keys())}
+    canonical = dict(session)
+    canonical['nodes'] = {id_map[n_id]: n_data
+                          for n_id, n_data in nodes.items()}
+    if 'connections' in session:
+        canonical['connections'] = [
+            {ptype: [id_map.get(n_id, n_id), port_name]
+             for ptype, (n_id, port_name) in connection.items()}
+            for connection in session['connections']
+        ]
+    return canonical
+
+
+def _intern(key, text, children):
+    """
+    Returns the interned blob for a session key.
+    """
+    blob = _BLOBS.get(key)
+    if blob is None:
+        blob = SessionBlob(key, text, children)
+        _BLOBS[key] = blob
+    return blob
+
+
+def get_blob(key):
+    """
+    Returns the interned session blob for a content hash.
+
+    Args:
+        key (str): content hash.
+
+    Returns:
+        SessionBlob: session blob or None if it's not loaded.
+    """
+    return _BLOBS.get(key)
+
+
+def intern_session(session):
+    """
+    Returns the shared blob for a serialized sub graph session.
+
+    The shared sessions table of the nested group nodes is removed from the
+    session as the nested group nodes only keep the content hash.
+
+    Args:
+        session (dict): serialized sub graph session.
+
+    Returns:
+        SessionBlob: session blob.
+    """
+    session = dict(session)
+    table = session.pop(SESSIONS_KEY, {})
+    # keep the nested blobs alive while linking them.
+    nested = load_sessions(table)
+
+    children = []
+    for n_data in session.get('nodes', {}).values():
+        child = get_blob(n_data.get('subgraph_session') or '')
+        if child is not None and child not in children:
+            children.append(child)
+    del nested
+
+    text = json.dumps(_canonical_session(session),
+                      sort_keys=True, separators=(',', ':'))
+    key = hashlib.sha1(text.encode('utf-8')).hexdigest()
+    return _intern(key, text, children)
+
+
+def load_sessions(table):
+    """
+    Intern the sessions from a serialized sessions table.
+
+    Args:
+        table (dict): {content hash: {'session': text, 'children': [hash]}}
+
+    Returns:
+        list[SessionBlob]: the loaded blobs
+            (to be held until they are referenced by the group nodes).
+    """
+    blobs = [_intern(key, entry['session'], []) for key, entry in table.items()]
+    for blob in blobs:
+        if not blob.children:
+            blob.children = [
+                b for b in (_BLOBS.get(k) for k in
+                            table[blob.key].get('children', []))
+                if b is not None
+            ]
+    return blobs
+
+
+def sessions_table(blobs):
+    """
+    Returns the serialized sessions table for blobs and their nested blobs.
+
+    Args:
+        blobs (list[SessionBlob]): session blobs.
+
+    Returns:
+        dict: {content hash: {'session': text, 'children': [hash]}}
+    """
+    table = {}
+    stack = list(blobs)
+    while stack:
+        blob = stack.pop()
+        if blob.key in table:
+            continue
+        table[blob.key] = {'session': blob.text,
+                           'children': [c.key for c in blob.children]}
+        stack.extend(blob.children)
+    return table
@@ -0,0 +1,373 @@
+#!/usr/bin/python
+import sys
+from collections import deque
+
+from Qt import QtCore, QtWidgets, QtCompat
+
+from NodeGraphQt.base.commands import EvictableCmd, _set_obsolete
+from NodeGraphQt.base.node import NodeObject
+from NodeGraphQt.base.port import Port
+
+# rough memory cost of a node qgraphics item and its child items.
+NODE_VIEW_SIZE = 4096
+# memory cost of a reference to an object that is still alive elsewhere.
+REFERENCE_SIZE = 8
+
+
+def estimate_size(value, seen=None):
+    """
+    Returns a rough estimate of the memory held by a value.
+
+    Nodes are only counted when they are no longer in their node graph, as
+    the undo command would be the only thing keeping them alive.
+
+    Args:
+        value (object): value to estimate.
+        seen (set): ids of the already counted objects.
+
+    Returns:
+        int: estimated size in bytes.
+    """
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, NodeObject):
+        graph = value.graph
+        if graph and graph.model.nodes.get(value.id) is value:
+            return REFERENCE_SIZE
+        return NODE_VIEW_SIZE + estimate_size(value.model.__dict__, seen)
+    if isinstance(value, Port):
+        return REFERENCE_SIZE
+    if isinstance(value, QtWidgets.QUndoCommand):
+        return command_size(value, seen)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k, seen) + estimate_size(v, seen)
+            for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(
+            estimate_size(v, seen) for v in value)
+    if isinstance(value, (str, bytes, int, float, bool, type(None))):
+        return sys.getsizeof(value)
+    # graph, scene, viewer, model and other shared objects.
+    return REFERENCE_SIZE
+
+
+def command_size(command, seen=None):
+    """
+    Returns the estimated memory held by an undo command and its children.
+
+    Args:
+        command (QtWidgets.QUndoCommand): undo command.
+        seen (set): ids of the already counted objects.
+
+    Returns:
+        int: estimated size in bytes.
+    """
+    seen = set() if seen is None else seen
+    size = sys.getsizeof(command) + sys.getsizeof(command.text())
+    size += estimate_size(getattr(command, '__dict__', {}), seen)
+    for i in range(command.childCount()):
+        size += command_size(command.child(i), seen)
+    return size
+
+
+class UndoBudget(QtCore.QObject):
+    """
+    Keeps the memory held by a undo stack within a budget.
+
+    The command limit uses the native ``QUndoStack.setUndoLimit()`` which can
+    only be changed while the stack is empty, so a new limit is applied on the
+    next time the stack is cleared.
+
+    When the estimated size of the undo history goes over the byte budget the
+    oldest commands are evicted with :meth:`EvictableCmd.evict`, their data is
+    released and they are removed from the stack once they're undone.
+
+    The command sizes are measured once when the commands are pushed and the
+    eviction continues from the oldest command not evicted yet so a push only
+    measures the new command.
+
+    Args:
+        undo_stack (QtWidgets.QUndoStack): undo stack.
+        max_commands (int): maximum number of commands (0 for unlimited).
+        max_bytes (int): maximum estimated size in bytes (0 for unlimited).
+    """
+
+    def __init__(self, undo_stack, max_commands=0, max_bytes=0):
+        super(UndoBudget, self).__init__(undo_stack)
+        self._stack = undo_stack
+        self._max_commands = 0
+        self._max_bytes = 0
+        # estimated size of the command at each undo stack index.
+        self._sizes = deque()
+        self._total = 0
+        # index of the oldest command that hasn't been evicted.
+        self._cursor = 0
+        self._index = 0
+        self._evicted = 0
+        self._evicted_bytes = 0
+        self._stack.indexChanged.connect(self._on_index_changed)
+        self._stack.destroyed.connect(self._on_stack_destroyed)
+        self.set_budget(max_commands, max_bytes)
+
+    def __repr__(self):
+        return '<{}(commands={}, bytes={}) object at {}>'.format(
+            self.__class__.__name__,
+            self._max_commands, self._max_bytes, hex(id(self)))
+
+    @property
+    def max_commands(self):
+        return self._max_commands
+
+    @property
+    def max_bytes(self):
+        return self._max_bytes
+
+    def set_budget(self, max_commands=0, max_bytes=0):
+        """
+        Set the undo history budget.
+
+        Args:
+            max_commands (int): maximum number of commands (0 for unlimited).
+            max_bytes (int): maximum estimated size in bytes (0 for unlimited).
+        """
+        self._max_commands = max_commands or 0
+        self._max_bytes = max_bytes or 0
+        self._apply_undo_limit()
+        if self._stack_valid():
+            self._sync()
+            self.enforce()
+
+    def _stack_valid(self):
+        """
+        Returns true if the undo stack hasn't been deleted.
+        (the stack emits "indexChanged" while it's being destroyed)
+
+        Returns:
+            bool: true if valid.
+        """
+        return self._stack is not None and QtCompat.isValid(self._stack)
+
+    def _on_stack_destroyed(self, *args):
+        """
+        Slot triggered when the undo stack is destroyed.
+        """
+        self._stack = None
+        self._sizes.clear()
+
+    def _apply_undo_limit(self):
+        """
+        Set the command limit on the undo stack if it's empty.
+        """
+        if not self._stack_valid():
+            return
+        if self._stack.count() == 0 and \
+                self._stack.undoLimit() != self._max_commands:
+            self._stack.setUndoLimit(self._max_commands)
+
+    def _on_index_changed(self, index):
+        """
+        Slot triggered when a command is pushed, undone or redone.
+
+        Args:
+            index (int): undo stack index.
+        """
+        if not self._stack_valid():
+            return
+        if self._stack.count() == 0:
+            self._sizes.clear()
+            self._total = 0
+            self._cursor = 0
+            self._index = 0
+            self._apply_undo_limit()
+            return
+        if self._max_bytes:
+            self._update(index)
+            self.enforce()
+
+    def _measure(self, command):
+        """
+        Returns the estimated size of a command, the size of the node graph
+        commands is stored on the command.
+
+        Args:
+            command (QtWidgets.QUndoCommand): undo command.
+
+        Returns:
+            int: estimated size in bytes.
+        """
+        if isinstance(command, EvictableCmd):
+            if command.size_estimate is None:
+                command.size_estimate = command_size(command)
+            return command.size_estimate
+        # macro commands created by "QUndoStack.beginMacro()".
+        size = sys.getsizeof(command) + sys.getsizeof(command.text())
+        for i in range(command.childCount()):
+            size += self._measure(command.child(i))
+        return size
+
+    def _update(self, index):
+        """
+        Update the command sizes after the undo stack index changed.
+
+        Args:
+            index (int): undo stack index.
+        """
+        stack = self._stack
+        count = stack.count()
+        sizes = self._sizes
+        prev_index, self._index = self._index, index
+        if index != count:
+            # undo or redo, only commands removed as obsolete change the
+            # stack.
+            if count != len(sizes):
+                self._sync()
+            return
+
+        top = stack.command(count - 1)
+        if count == len(sizes) + 1:
+            # pushed a new command.
+            sizes.append(self._measure(top))
+            self._total += sizes[-1]
+            return
+
+        if count == len(sizes):
+            if isinstance(top, EvictableCmd) and \
+                    top.size_estimate is not None:
+                # redo or the pushed command merged into the top command.
+                top.size_estimate = None
+                self._total -= sizes[-1]
+                sizes[-1] = self._measure(top)
+                self._total += sizes[-1]
+                return
+            if prev_index == len(sizes) and count == stack.undoLimit():
+                # pushed a new command and the undo limit dropped the
+                # oldest command.
+                self._total -= sizes.popleft()
+                self._cursor = max(0, self._cursor - 1)
+                sizes.append(self._measure(top))
+                self._total += sizes[-1]
+                return
+        # the pushed command replaced the commands that could be redone.
+        self._sync()
+
+    def _sync(self):
+        """
+        Measure all the commands in the undo stack.
+        """
+        self._sizes.clear()
+        self._total = 0
+        self._cursor = 0
+        if not self._max_bytes or not self._stack_valid():
+            return
+        stack = self._stack
+        self._index = stack.index()
+        for i in range(stack.count()):
+            command = stack.command(i)
+            size = self._measure(command)
+            self._sizes.append(size)
+            self._total += size
+            if i == self._cursor and self._is_evicted(command):
+                self._cursor += 1
+
+    @staticmethod
+    def _is_evicted(command):
+        """
+        Returns true if the command has been evicted.
+
+        Args:
+            command (QtWidgets.QUndoCommand): undo command.
+
+        Returns:
+            bool: true if evicted.
+        """
+        if isinstance(command, EvictableCmd):
+            return command.evicted
+        return command.text().startswith('(evicted)')
+
+    def _evict(self, command):
+        """
+        Release the data held by a command and its children.
+
+        Args:
+            command (QtWidgets.QUndoCommand): undo command.
+
+        Returns:
+            bool: true if any data was released.
+        """
+        evicted = False
+        for i in range(command.childCount()):
+            evicted = self._evict(command.child(i)) or evicted
+        if isinstance(command, EvictableCmd):
+            if not command.evicted:
+                command.evict()
+                command.size_estimate = command_size(command)
+                evicted = True
+        elif evicted and not command.text().startswith('(evicted)'):
+            # macro command created by "QUndoStack.beginMacro()".
+            command.setText('(evicted) {}'.format(command.text()))
+            _set_obsolete(command)
+        return evicted
+
+    def enforce(self):
+        """
+        Evict the oldest commands until the undo history is within the
+        byte budget.
+        """
+        if not self._max_bytes or not self._stack_valid() or \
+                self._total <= self._max_bytes:
+            return
+        stack = self._stack
+        # never evict commands that can still be redone or the latest one.
+        undo_count = min(stack.index(), len(self._sizes)) - 1
+        while self._total > self._max_bytes and self._cursor < undo_count:
+            index = self._cursor
+            self._cursor += 1
+            command = stack.command(index)
+            if self._is_evicted(command) or not self._evict(command):
+                continue
+            size = self._measure(command)
+            freed = self._sizes[index] - size
+            self._sizes[index] = size
+            self._total -= freed
+            self._evicted += 1
+            self._evicted_bytes += freed
+
+    def report(self):
+        """
+        Returns a report of the undo stack memory usage.
+
+        Returns:
+            dict: undo history usage.
+        """
+        by_type = {}
+        total = 0
+        stack = self._stack if self._stack_valid() else None
+        count = stack.count() if stack else 0
+        for i in range(count):
+            command = stack.command(i)
+            size = self._measure(command)
+            total += size
+            name = type(command).__name__
+            if command.childCount():
+                name = 'macro'
+            cmd_count, cmd_total = by_type.get(name, (0, 0))
+            by_type[name] = (cmd_count + 1, cmd_total + size)
+        return {
+            'commands': count,
+            'index': stack.index() if stack else 0,
+            'undo_limit': stack.undoLimit() if stack else 0,
+            'max_commands': self._max_commands,
+            'max_bytes': self._max_bytes,
+            'estimated_bytes': total,
+            'evicted_commands': self._evicted,
+            'evicted_bytes': self._evicted_bytes,
+            'by_type': {
+                name: {'count': cmd_count, 'bytes': cmd_total}
+                for name, (cmd_count, cmd_total) in by_type.items()
+            }
+        }
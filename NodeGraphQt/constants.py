@@ -128,6 +128,14 @@ class NodeEnum(Enum):
     PROGRESS_BAR_MODE_NONE = 0
     PROGRESS_BAR_MODE_PERCENT = 1
     PROGRESS_BAR_MODE_BLOCKS = 2
+    #: progress bar color while the node is executing.
+    STATUS_RUNNING_COLOR = (230, 160, 20, 255)
+    #: progress bar color when the node executed successfully.
+    STATUS_FINISHED_COLOR = (0, 125, 0, 255)
+    #: progress bar color when the node execution failed.
+    STATUS_FAILED_COLOR = (200, 40, 40, 255)
+    #: progress bar color when the node outputs were found in the cache.
+    STATUS_CACHED_COLOR = (40, 110, 170, 255)
 
 # ==================================== PORT ====================================
 
@@ -0,0 +1,389 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import bisect
+import weakref
+
+from Qt import QtCore, QtGui
+
+from NodeGraphQt.constants import URN_SCHEME
+
+#: item data role for the node type identifier.
+NODE_TYPE_ROLE = QtCore.Qt.UserRole + 1
+#: item data role that is true for node category items.
+CATEGORY_ROLE = QtCore.Qt.UserRole + 2
+
+_SHARED_MODELS = weakref.WeakValueDictionary()
+
+
+class _CategoryItem(object):
+    """
+    Node category row data.
+
+    Args:
+        name (str): node identifier category eg. ``"nodes.widgets"``
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.nodes = []
+
+
+class NodesModel(QtCore.QAbstractItemModel):
+    """
+    Item model over the nodes registered to a
+    :class:`NodeGraphQt.base.factory.NodeFactory` with the node categories
+    as top level items and the nodes as child items.
+
+    The model listens to the node factory so node registration only inserts
+    the new rows, use :meth:`NodesModel.shared` to get the model shared by
+    the nodes tree and nodes palette widgets.
+
+    Args:
+        factory (NodeGraphQt.base.factory.NodeFactory): node factory.
+        parent (QtCore.QObject): parent object.
+    """
+
+    def __init__(self, factory=None, parent=None):
+        super(NodesModel, self).__init__(parent)
+        self._root = _CategoryItem('')
+        self._categories = []
+        self._category_names = []
+        self._icon_paths = {}
+        self._icons = {}
+        self._factory = None
+        self.set_factory(factory)
+
+    def __repr__(self):
+        return '<{}(categories={}) object at {}>'.format(
+            self.__class__.__name__, len(self._categories), hex(id(self)))
+
+    @classmethod
+    def shared(cls, factory):
+        """
+        Returns the model shared by the widgets displaying the node factory.
+
+        Args:
+            factory (NodeGraphQt.base.factory.NodeFactory): node factory.
+
+        Returns:
+            NodesModel: nodes model.
+        """
+        model = _SHARED_MODELS.get(id(factory))
+        if model is None or model.factory() is not factory:
+            model = cls(factory)
+            _SHARED_MODELS[id(factory)] = model
+        return model
+
+    def factory(self):
+        """
+        Returns the node factory the model displays.
+
+        Returns:
+            NodeGraphQt.base.factory.NodeFactory: node factory.
+        """
+        return self._factory
+
+    def set_factory(self, factory):
+        """
+        Set the node factory displayed by the model.
+
+        Args:
+            factory (NodeGraphQt.base.factory.NodeFactory): node factory.
+        """
+        if self._factory is not None:
+            self._factory.remove_listener(self._on_factory_changed)
+        self._factory = factory
+        if factory is not None:
+            factory.add_listener(self._on_factory_changed)
+        self.refresh()
+
+    def refresh(self):
+        """
+        Rebuild the model from the node factory.
+        """
+        self.beginResetModel()
+        self._categories = []
+        self._category_names = []
+        if self._factory is not None:
+            for name, node_types in self._factory.names.items():
+                for node_type in node_types:
+                    self._add_node(node_type, name, notify=False)
+        self.endResetModel()
+
+    @staticmethod
+    def node_category(node_type):
+        """
+        Returns the category of a node type.
+
+        Args:
+            node_type (str): node type identifier.
+
+        Returns:
+            str: node identifier category eg. ``"nodes.widgets"``
+        """
+        return '.'.join(node_type.split('.')[:-1])
+
+    def _add_node(self, node_type, name, notify=True):
+        """
+        Add a node row (and its category row if needed) sorted by name.
+
+        Args:
+            node_type (str): node type identifier.
+            name (str): node name.
+            notify (bool): emit the row insert signals.
+        """
+        category = self.node_category(node_type)
+        row = bisect.bisect_left(self._category_names, category)
+        if row == len(self._category_names) or \
+                self._category_names[row] != category:
+            if notify:
+                self.beginInsertRows(QtCore.QModelIndex(), row, row)
+            self._category_names.insert(row, category)
+            self._categories.insert(row, _CategoryItem(category))
+            if notify:
+                self.endInsertRows()
+
+        cat_item = self._categories[row]
+        key = (name, node_type)
+        node_row = bisect.bisect_left(cat_item.nodes, key)
+        if node_row < len(cat_item.nodes) and cat_item.nodes[node_row] == key:
+            return
+        if notify:
+            self.beginInsertRows(self.createIndex(row, 0, self._root),
+                                 node_row, node_row)
+        cat_item.nodes.insert(node_row, key)
+        if notify:
+            self.endInsertRows()
+
+    def _on_factory_changed(self, event, node_type=None, name=None):
+        """
+        Called by the node factory when the registered nodes change.
+
+        Args:
+            event (str): "registered" or "cleared".
+            node_type (str): node type identifier.
+            name (str): node name.
+        """
+        if event == 'registered':
+            self._add_node(node_type, name)
+        else:
+            self.refresh()
+
+    def category_index(self, category):
+        """
+        Returns the model index of a node category.
+
+        Args:
+            category (str): node identifier category eg. ``"nodes.widgets"``
+
+        Returns:
+            QtCore.QModelIndex: category index (invalid if not found).
+        """
+        row = bisect.bisect_left(self._category_names, category)
+        if row < len(self._category_names) and \
+                self._category_names[row] == category:
+            return self.createIndex(row, 0, self._root)
+        return QtCore.QModelIndex()
+
+    def set_node_icon(self, node_type, icon):
+        """
+        Set the icon displayed for a node type, the image is only loaded
+        when the item is first displayed.
+        (overrides the icon from the node descriptor)
+
+        Args:
+            node_type (str): node type identifier.
+            icon (str): path to the icon image.
+        """
+        self._icon_paths[node_type] = icon
+        self._icons.pop(node_type, None)
+
+    def _node_icon(self, node_type):
+        """
+        Returns the icon for a node type (loaded on first use).
+
+        Args:
+            node_type (str): node type identifier.
+
+        Returns:
+            QtGui.QIcon: icon or None.
+        """
+        icon = self._icons.get(node_type)
+        if icon is None:
+            path = self._icon_paths.get(node_type)
+            if path is None and self._factory is not None:
+                path = self._factory.get_icon(node_type)
+            if path is None:
+                return
+            icon = QtGui.QIcon(path)
+            self._icons[node_type] = icon
+        return icon
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QtCore.QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column, self._root)
+        return self.createIndex(row, column, self._categories[parent.row()])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QtCore.QModelIndex()
+        cat_item = index.internalPointer()
+        if cat_item is self._root:
+            return QtCore.QModelIndex()
+        row = bisect.bisect_left(self._category_names, cat_item.name)
+        return self.createIndex(row, 0, self._root)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if not parent.isValid():
+            return len(self._categories)
+        if parent.internalPointer() is self._root:
+            return len(self._categories[parent.row()].nodes)
+        return 0
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 1
+
+    def flags(self, index):
+        if not index.isValid():
+            return QtCore.Qt.NoItemFlags
+        if index.internalPointer() is self._root:
+            return QtCore.Qt.ItemIsEnabled
+        return (QtCore.Qt.ItemIsEnabled |
+                QtCore.Qt.ItemIsSelectable |
+                QtCore.Qt.ItemIsDragEnabled)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return
+        cat_item = index.internalPointer()
+
+        # category item.
+        if cat_item is self._root:
+            category = self._categories[index.row()].name
+            if role == QtCore.Qt.DisplayRole:
+                return category
+            elif role == QtCore.Qt.ToolTipRole:
+                return category
+            elif role == CATEGORY_ROLE:
+                return True
+            elif role == QtCore.Qt.BackgroundRole:
+                return QtGui.QBrush(QtGui.QPalette().midlight().color())
+            elif role == QtCore.Qt.SizeHintRole:
+                return QtCore.QSize(100, 26)
+            return
+
+        # node item.
+        name, node_type = cat_item.nodes[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            return name
+        elif role in (QtCore.Qt.ToolTipRole, NODE_TYPE_ROLE):
+            return node_type
+        elif role == CATEGORY_ROLE:
+            return False
+        elif role == QtCore.Qt.DecorationRole:
+            return self._node_icon(node_type)
+        elif role == QtCore.Qt.SizeHintRole:
+            return QtCore.QSize(100, 26)
+
+    def supportedDragActions(self):
+        return QtCore.Qt.CopyAction
+
+    def mimeData(self, indexes):
+        node_ids = ['node:{}'.format(i.data(NODE_TYPE_ROLE))
+                    for i in indexes if not i.data(CATEGORY_ROLE)]
+        node_urn = URN_SCHEME + ';'.join(node_ids)
+        mime_data = super(NodesModel, self).mimeData(indexes)
+        mime_data.setUrls([node_urn])
+        return mime_data
+
+
+class NodesFilterProxyModel(QtCore.QSortFilterProxyModel):
+    """
+    Proxy model that filters the :class:`NodesModel` node items by name or
+    node type identifier.
+
+    Categories are kept if one of their nodes matches the filter or when
+    ``filter_categories`` is false. Category labels are set on the proxy
+    model so the views sharing the same :class:`NodesModel` can display
+    different labels.
+
+    Args:
+        parent (QtCore.QObject): parent object.
+    """
+
+    def __init__(self, parent=None):
+        super(NodesFilterProxyModel, self).__init__(parent)
+        self._filter_text = ''
+        self._labels = {}
+        self.filter_categories = True
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        value = super(NodesFilterProxyModel, self).data(index, role)
+        if role == QtCore.Qt.DisplayRole and self._labels and \
+                super(NodesFilterProxyModel, self).data(index, CATEGORY_ROLE):
+            return self._labels.get(value, value)
+        return value
+
+    def set_category_label(self, category, label):
+        """
+        Override the display label for a node category in the views using
+        this proxy model.
+
+        Args:
+            category (str): node identifier category eg. ``"nodes.widgets"``
+            label (str): custom display label. eg. ``"Node Widgets"``
+        """
+        self._labels[category] = label
+        model = self.sourceModel()
+        if model is None:
+            return
+        index = self.mapFromSource(model.category_index(category))
+        if index.isValid():
+            self.dataChanged.emit(index, index)
+
+    def filter_text(self):
+        """
+        Returns the current filter text.
+
+        Returns:
+            str: filter text.
+        """
+        return self._filter_text
+
+    def set_filter_text(self, text):
+        """
+        Set the filter text (case insensitive).
+
+        Args:
+            text (str): filter text.
+        """
+        self._filter_text = (text or '').lower()
+        self.invalidateFilter()
+
+    def _node_accepted(self, index):
+        """
+        Returns true if a node item matches the filter.
+
+        Args:
+            index (QtCore.QModelIndex): source node index.
+
+        Returns:
+            bool: true if accepted.
+        """
+        name = (index.data(QtCore.Qt.DisplayRole) or '').lower()
+        node_type = (index.data(NODE_TYPE_ROLE) or '').lower()
+        return self._filter_text in name or self._filter_text in node_type
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self._filter_text:
+            return True
+        model = self.sourceModel()
+        index = model.index(source_row, 0, source_parent)
+        if index.data(CATEGORY_ROLE):
+            if not self.filter_categories:
+                return True
+            return any(self._node_accepted(model.index(row, 0, index))
+                       for row in range(model.rowCount(index)))
+        return self._node_accepted(index)
@@ -1,10 +1,10 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
-from collections import defaultdict
-
 from Qt import QtWidgets, QtCore, QtGui
 
-from NodeGraphQt.constants import URN_SCHEME
+from NodeGraphQt.custom_widgets.nodes_model import (CATEGORY_ROLE,
+                                                    NodesModel,
+                                                    NodesFilterProxyModel)
 
 
 class NodesGridDelagate(QtWidgets.QStyledItemDelegate):
@@ -20,8 +20,7 @@ class NodesGridDelagate(QtWidgets.QStyledItemDelegate):
             super(NodesGridDelagate, self).paint(painter, option, index)
             return
 
-        model = index.model().sourceModel()
-        item = model.item(index.row(), index.column())
+        text = index.data(QtCore.Qt.DisplayRole) or ''
 
         sub_margin = 2
         radius = 5
@@ -102,28 +101,17 @@ class NodesGridDelagate(QtWidgets.QStyledItemDelegate):
 
         font = painter.font()
         font_metrics = QtGui.QFontMetrics(font)
-        font_width = font_metrics.horizontalAdvance(item.text().replace(' ', '_'))
+        font_width = font_metrics.horizontalAdvance(text.replace(' ', '_'))
         font_height = font_metrics.height()
         text_rect = QtCore.QRectF(
             sub_rect.center().x() - (font_width / 2),
             sub_rect.center().y() - (font_height * 0.55),
             font_width, font_height)
-        painter.drawText(text_rect, item.text())
+        painter.drawText(text_rect, text)
         painter.restore()
 
-
-class NodesGridProxyModel(QtCore.QSortFilterProxyModel):
-
-    def __init__(self, parent=None):
-        super(NodesGridProxyModel, self).__init__(parent)
-        
-    def mimeData(self, indexes):
-        node_ids = ['node:{}'.format(i.data(QtCore.Qt.ToolTipRole))
-                    for i in indexes]
-        node_urn = URN_SCHEME + ';'.join(node_ids)
-        mime_data = super(NodesGridProxyModel, self).mimeData(indexes)
-        mime_data.setUrls([node_urn])
-        return mime_data
+    def sizeHint(self, option, index):
+        return QtCore.QSize(130, 40)
 
 
 class NodesGridView(QtWidgets.QListView):
@@ -138,23 +126,8 @@ class NodesGridView(QtWidgets.QListView):
         self.setDragEnabled(True)
         self.setMinimumSize(450, 300)
         self.setSpacing(4)
-
-        model = QtGui.QStandardItemModel()
-        proxy_model = NodesGridProxyModel()
-        proxy_model.setSourceModel(model)
-        self.setModel(proxy_model)
         self.setItemDelegate(NodesGridDelagate(self))
 
-    def clear(self):
-        self.model().sourceMode().clear()
-
-    def add_item(self, label, tooltip=''):
-        item = QtGui.QStandardItem(label)
-        item.setSizeHint(QtCore.QSize(130, 40))
-        item.setToolTip(tooltip)
-        model = self.model().sourceModel()
-        model.appendRow(item)
-
 
 class NodesPaletteWidget(QtWidgets.QWidget):
     """
@@ -190,15 +163,24 @@ class NodesPaletteWidget(QtWidgets.QWidget):
 
         self._category_tabs = {}
         self._custom_labels = {}
-        self._factory = node_graph.node_factory if node_graph else None
+        self._factory = None
+        self._model = None
+        self._proxy_model = NodesFilterProxyModel(self)
+        self._proxy_model.filter_categories = False
+
+        self._search_line = QtWidgets.QLineEdit()
+        self._search_line.setPlaceholderText('search')
+        self._search_line.textChanged.connect(self.set_filter)
 
         self._tab_widget = QtWidgets.QTabWidget()
         self._tab_widget.setMovable(True)
 
         layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(self._search_line)
         layout.addWidget(self._tab_widget)
 
-        self._build_ui()
+        if node_graph:
+            self._set_node_factory(node_graph.node_factory)
 
     def __repr__(self):
         return '<{} object at {}>'.format(
@@ -207,20 +189,31 @@ class NodesPaletteWidget(QtWidgets.QWidget):
 
     def _build_ui(self):
         """
-        populate the ui
+        populate the ui with a tab for each node category.
         """
-        categories = set()
-        node_types = defaultdict(list)
-        for name, node_ids in self._factory.names.items():
-            for nid in node_ids:
-                category = '.'.join(nid.split('.')[:-1])
-                categories.add(category)
-                node_types[category].append((nid, name))
-
-        for category, nodes_list in node_types.items():
-            grid_view = self._add_category_tab(category)
-            for node_id, node_name in nodes_list:
-                grid_view.add_item(node_name, node_id)
+        self._tab_widget.clear()
+        for grid_view in self._category_tabs.values():
+            grid_view.deleteLater()
+        self._category_tabs = {}
+        for row in range(self._model.rowCount()):
+            self._add_category_tab(self._model.index(row, 0).data(
+                QtCore.Qt.ToolTipRole))
+
+    def _on_rows_inserted(self, parent, first, last):
+        """
+        Add a tab for the new node categories.
+
+        Args:
+            parent (QtCore.QModelIndex): parent source index.
+            first (int): first inserted row.
+            last (int): last inserted row.
+        """
+        if parent.isValid():
+            return
+        for row in range(first, last + 1):
+            index = self._model.index(row, 0)
+            if index.data(CATEGORY_ROLE):
+                self._add_category_tab(index.data(QtCore.Qt.ToolTipRole))
 
     def _set_node_factory(self, factory):
         """
@@ -229,7 +222,16 @@ class NodesPaletteWidget(QtWidgets.QWidget):
         Args:
             factory (NodeFactory): node factory.
         """
+        if self._model is not None:
+            self._model.rowsInserted.disconnect(self._on_rows_inserted)
+            self._model.modelReset.disconnect(self._build_ui)
         self._factory = factory
+        self._model = NodesModel.shared(factory)
+        # connected after the proxy model so it's up to date in the slots.
+        self._proxy_model.setSourceModel(self._model)
+        self._model.rowsInserted.connect(self._on_rows_inserted)
+        self._model.modelReset.connect(self._build_ui)
+        self._build_ui()
 
     def _add_category_tab(self, category):
         """
@@ -243,7 +245,11 @@ class NodesPaletteWidget(QtWidgets.QWidget):
         """
         if category not in self._category_tabs:
             grid_widget = NodesGridView(self)
-            self._tab_widget.addTab(grid_widget, category)
+            grid_widget.setModel(self._proxy_model)
+            grid_widget.setRootIndex(self._proxy_model.mapFromSource(
+                self._model.category_index(category)))
+            label = self._custom_labels.get(category, category)
+            self._tab_widget.addTab(grid_widget, label)
             self._category_tabs[category] = grid_widget
         return self._category_tabs[category]
 
@@ -267,13 +273,19 @@ class NodesPaletteWidget(QtWidgets.QWidget):
                 break
         self._custom_labels[category] = label
 
+    def set_filter(self, text):
+        """
+        Only display the nodes with a name or node type containing the text.
+
+        Args:
+            text (str): filter text (empty to display all nodes).
+        """
+        if self._search_line.text() != text:
+            self._search_line.setText(text)
+        self._proxy_model.set_filter_text(text)
+
     def update(self):
         """
         Update and refresh the node palette widget.
         """
-        self._build_tree()
-
-
-
-
-
+        self._model.refresh()
@@ -1,29 +1,21 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
-from Qt import QtWidgets, QtCore, QtGui
+from Qt import QtWidgets
 
-from NodeGraphQt.constants import URN_SCHEME
+from NodeGraphQt.custom_widgets.nodes_model import (NodesModel,
+                                                    NodesFilterProxyModel)
 
-TYPE_NODE = QtWidgets.QTreeWidgetItem.UserType + 1
-TYPE_CATEGORY = QtWidgets.QTreeWidgetItem.UserType + 2
 
-
-class BaseNodeTreeItem(QtWidgets.QTreeWidgetItem):
-
-    def __eq__(self, other):
-        """
-        Workaround fix for QTreeWidgetItem "operator not implemented error".
-        see link: https://bugreports.qt.io/browse/PYSIDE-74
-        """
-        return id(self) == id(other)
-
-
-class NodesTreeWidget(QtWidgets.QTreeWidget):
+class NodesTreeWidget(QtWidgets.QTreeView):
     """
     The :class:`NodeGraphQt.NodesTreeWidget` is a widget for displaying all
     registered nodes from the node graph with this widget a user can create
     nodes by dragging and dropping.
 
+    The tree displays the :class:`NodeGraphQt.custom_widgets.nodes_model.NodesModel`
+    shared with the :class:`NodeGraphQt.NodesPaletteWidget` so registering a
+    node only inserts the new items.
+
     .. image:: _images/nodes_tree.png
         :width: 300px
 
@@ -49,63 +41,39 @@ class NodesTreeWidget(QtWidgets.QTreeWidget):
         self.setDragDropMode(QtWidgets.QAbstractItemView.DragOnly)
         self.setSelectionMode(self.ExtendedSelection)
         self.setHeaderHidden(True)
+        self.setUniformRowHeights(True)
         self.setWindowTitle('Nodes')
 
-        self._factory = node_graph.node_factory if node_graph else None
-        self._custom_labels = {}
-        self._category_items = {}
+        self._factory = None
+        self._model = None
+        self._proxy_model = NodesFilterProxyModel(self)
+        self._proxy_model.rowsInserted.connect(self._on_rows_inserted)
+        self._proxy_model.modelReset.connect(self.expandAll)
+        self._proxy_model.layoutChanged.connect(self.expandAll)
+        self.setModel(self._proxy_model)
 
-        self._build_tree()
+        if node_graph:
+            self._set_node_factory(node_graph.node_factory)
 
     def __repr__(self):
         return '<{} object at {}>'.format(
             self.__class__.__name__, hex(id(self))
         )
 
-    def mimeData(self, items):
-        node_ids = ['node:{}'.format(i.toolTip(0)) for i in items]
-        node_urn = URN_SCHEME + ';'.join(node_ids)
-        mime_data = super(NodesTreeWidget, self).mimeData(items)
-        mime_data.setUrls([node_urn])
-        return mime_data
-
-    def _build_tree(self):
+    def _on_rows_inserted(self, parent, first, last):
         """
-        Populate the node tree.
+        Expand new category items.
+
+        Args:
+            parent (QtCore.QModelIndex): parent index.
+            first (int): first inserted row.
+            last (int): last inserted row.
         """
-        self.clear()
-        palette = QtGui.QPalette()
-        categories = set()
-        node_types = {}
-        for name, node_ids in self._factory.names.items():
-            for nid in node_ids:
-                categories.add('.'.join(nid.split('.')[:-1]))
-                node_types[nid] = name
-
-        self._category_items = {}
-        for category in sorted(categories):
-            if category in self._custom_labels.keys():
-                label = self._custom_labels[category]
-            else:
-                label = '{}'.format(category)
-            cat_item = BaseNodeTreeItem(self, [label], type=TYPE_CATEGORY)
-            cat_item.setFirstColumnSpanned(True)
-            cat_item.setFlags(QtCore.Qt.ItemIsEnabled)
-            cat_item.setBackground(0, QtGui.QBrush(palette.midlight().color()))
-            cat_item.setSizeHint(0, QtCore.QSize(100, 26))
-            self.addTopLevelItem(cat_item)
-            cat_item.setExpanded(True)
-            self._category_items[category] = cat_item
-
-        for node_id, node_name in node_types.items():
-            category = '.'.join(node_id.split('.')[:-1])
-            category_item = self._category_items[category]
-
-            item = BaseNodeTreeItem(category_item, [node_name], type=TYPE_NODE)
-            item.setToolTip(0, node_id)
-            item.setSizeHint(0, QtCore.QSize(100, 26))
-
-            category_item.addChild(item)
+        if parent.isValid():
+            return
+        for row in range(first, last + 1):
+            self.setFirstColumnSpanned(row, parent, True)
+            self.expand(self._proxy_model.index(row, 0, parent))
 
     def _set_node_factory(self, factory):
         """
@@ -115,6 +83,9 @@ class NodesTreeWidget(QtWidgets.QTreeWidget):
             factory (NodeFactory): node factory.
         """
         self._factory = factory
+        self._model = NodesModel.shared(factory)
+        self._proxy_model.setSourceModel(self._model)
+        self.expandAll()
 
     def set_category_label(self, category, label):
         """
@@ -127,13 +98,20 @@ class NodesTreeWidget(QtWidgets.QTreeWidget):
             category (str): node identifier category eg. ``"nodes.widgets"``
             label (str): custom display label. eg. ``"Node Widgets"``
         """
-        self._custom_labels[category] = label
-        if category in self._category_items:
-            item = self._category_items[category]
-            item.setText(0, label)
+        self._proxy_model.set_category_label(category, label)
+
+    def set_filter(self, text):
+        """
+        Only display the nodes with a name or node type containing the text.
+
+        Args:
+            text (str): filter text (empty to display all nodes).
+        """
+        self._proxy_model.set_filter_text(text)
+        self.expandAll()
 
     def update(self):
         """
         Update and refresh the node tree widget.
         """
-        self._build_tree()
+        self._model.refresh()
@@ -774,6 +774,33 @@ WIDGET_MAP = {
 }
 
 
+def create_property_widget(node, name):
+    """
+    Returns a new property widget for a node property.
+
+    Args:
+        node (NodeGraphQt.NodeObject): node object.
+        name (str): property name.
+
+    Returns:
+        BaseProperty: property widget or None if the property is hidden.
+    """
+    model = node.model
+    wid_type = model.get_widget_type(name)
+    if wid_type == 0:
+        return
+    widget = WIDGET_MAP.get(wid_type)()
+    if name in model.custom_properties.keys():
+        items = model.get_property_items(name)
+        if items is not None:
+            widget.set_items(items)
+        prop_range = model.get_property_range(name)
+        if prop_range is not None:
+            widget.set_min(prop_range[0])
+            widget.set_max(prop_range[1])
+    return widget
+
+
 # main property widgets.
 # ==============================================================================
 
@@ -785,6 +812,8 @@ class PropListWidget(QtWidgets.QWidget):
 
     def __init__(self, parent=None):
         super(PropListWidget, self).__init__(parent)
+        self.__widgets = {}
+        self.__labels = {}
         self.__layout = QtWidgets.QGridLayout()
         self.__layout.setColumnStretch(1, 1)
         self.__layout.setSpacing(6)
@@ -820,8 +849,23 @@ class PropListWidget(QtWidgets.QWidget):
         if widget.__class__.__name__ == 'PropTextEdit':
             label_flags = label_flags | QtCore.Qt.AlignTop
 
-        self.__layout.addWidget(QtWidgets.QLabel(label), row, 0, label_flags)
+        label_wgt = QtWidgets.QLabel(label)
+        self.__layout.addWidget(label_wgt, row, 0, label_flags)
         self.__layout.addWidget(widget, row, 1)
+        self.__widgets[name] = widget
+        self.__labels[name] = label_wgt
+
+    def set_label(self, name, label):
+        """
+        Set the label displayed next to a property widget.
+
+        Args:
+            name (str): property name.
+            label (str): label to display.
+        """
+        label_wgt = self.__labels.get(name)
+        if label_wgt and label_wgt.text() != label:
+            label_wgt.setText(label)
 
     def get_widget(self, name):
         """
@@ -833,16 +877,26 @@ class PropListWidget(QtWidgets.QWidget):
         Returns:
             QtWidgets.QWidget: property widget.
         """
-        for row in range(self.__layout.rowCount()):
-            item = self.__layout.itemAtPosition(row, 1)
-            if item and name == item.widget().toolTip():
-                return item.widget()
+        return self.__widgets.get(name)
+
+    def get_widgets(self):
+        """
+        Returns all the property widgets in the window.
+
+        Returns:
+            dict: {property name: property widget}
+        """
+        return dict(self.__widgets)
 
 
 class NodePropWidget(QtWidgets.QWidget):
     """
     Node properties widget for display a Node object.
 
+    Property widgets are only created when their tab is first displayed and
+    the widget can be re-used for another node with the same properties
+    with :meth:`NodePropWidget.set_node`.
+
     Args:
         parent (QtWidgets.QWidget): parent object.
         node (NodeGraphQt.BaseNode): node.
@@ -854,9 +908,13 @@ class NodePropWidget(QtWidgets.QWidget):
 
     def __init__(self, parent=None, node=None):
         super(NodePropWidget, self).__init__(parent)
+        self.__node = node
         self.__node_id = node.id
+        self.__layout_key = None
         self.__tab_windows = {}
+        self.__pending_tabs = {}
         self.__tab = QtWidgets.QTabWidget()
+        self.__tab.currentChanged.connect(self._on_tab_changed)
 
         close_btn = QtWidgets.QPushButton('X')
         close_btn.setToolTip('close property')
@@ -891,6 +949,20 @@ class NodePropWidget(QtWidgets.QWidget):
             self.__class__.__name__, hex(id(self))
         )
 
+    @staticmethod
+    def layout_key(node):
+        """
+        Returns a key that is the same for nodes that are displayed with
+        the same tabs and property widgets.
+
+        Args:
+            node (NodeGraphQt.NodeObject): node object.
+
+        Returns:
+            tuple: node type and property names.
+        """
+        return node.type_, tuple(sorted(node.model.custom_properties.keys()))
+
     def _on_close(self):
         """
         called by the close button.
@@ -907,68 +979,102 @@ class NodePropWidget(QtWidgets.QWidget):
         """
         self.property_changed.emit(self.__node_id, name, value)
 
+    def _on_tab_changed(self, index):
+        """
+        slot function called when the current tab has changed.
+
+        Args:
+            index (int): tab index.
+        """
+        if index >= 0:
+            self._build_tab(self.__tab.tabText(index))
+
     def _read_node(self, node):
         """
-        Populate widget from a node.
+        Populate the tabs from a node, the property widgets are created
+        when a tab is displayed.
 
         Args:
             node (NodeGraphQt.BaseNode): node class.
         """
         model = node.model
-        graph_model = node.graph.model
-
-        common_props = graph_model.get_node_common_properties(node.type_)
 
         # sort tabs and properties.
         tab_mapping = defaultdict(list)
-        for prop_name, prop_val in model.custom_properties.items():
+        for prop_name in model.custom_properties.keys():
             tab_name = model.get_tab_name(prop_name)
-            tab_mapping[tab_name].append((prop_name, prop_val))
+            tab_mapping[tab_name].append(prop_name)
+        tab_mapping['Node'] += ['color', 'text_color', 'disabled', 'id']
 
-        # add tabs.
+        # add tabs (the first tab gets built by the "currentChanged" signal).
+        self.__pending_tabs = dict(tab_mapping)
         for tab in sorted(tab_mapping.keys()):
             if tab != 'Node':
                 self.add_tab(tab)
-
-        # populate tab properties.
-        for tab in sorted(tab_mapping.keys()):
-            prop_window = self.__tab_windows[tab]
-            for prop_name, value in tab_mapping[tab]:
-                wid_type = model.get_widget_type(prop_name)
-                if wid_type == 0:
-                    continue
-
-                _WidgetClass = WIDGET_MAP.get(wid_type)
-                widget = _WidgetClass()
-                if prop_name in common_props.keys():
-                    if 'items' in common_props[prop_name].keys():
-                        widget.set_items(common_props[prop_name]['items'])
-                    if 'range' in common_props[prop_name].keys():
-                        prop_range = common_props[prop_name]['range']
-                        widget.set_min(prop_range[0])
-                        widget.set_max(prop_range[1])
-
-                prop_window.add_widget(prop_name, widget, value,
-                                       prop_name.replace('_', ' '))
-                widget.value_changed.connect(self._on_property_changed)
-
-        # add "Node" tab properties.
         self.add_tab('Node')
-        default_props = ['color', 'text_color', 'disabled', 'id']
-        prop_window = self.__tab_windows['Node']
-        for prop_name in default_props:
-            wid_type = model.get_widget_type(prop_name)
-            _WidgetClass = WIDGET_MAP.get(wid_type)
-
-            widget = _WidgetClass()
-            prop_window.add_widget(prop_name,
-                                   widget,
-                                   model.get_property(prop_name),
-                                   prop_name.replace('_', ' '))
+        self._on_tab_changed(self.__tab.currentIndex())
+
+        self.__layout_key = self.layout_key(node)
+        self.type_wgt.setText(model.get_property('type_'))
+
+    def _build_tab(self, tab):
+        """
+        Create the property widgets for a tab that hasn't been displayed yet.
 
+        Args:
+            tab (str): tab name.
+        """
+        prop_names = self.__pending_tabs.pop(tab, None)
+        if not prop_names:
+            return
+        prop_window = self.__tab_windows[tab]
+        for prop_name in prop_names:
+            widget = create_property_widget(self.__node, prop_name)
+            if widget is None:
+                continue
+            prop_window.add_widget(prop_name, widget,
+                                   self.__node.get_property(prop_name),
+                                   prop_name.replace('_', ' '))
             widget.value_changed.connect(self._on_property_changed)
 
-        self.type_wgt.setText(model.get_property('type_'))
+    def set_node(self, node):
+        """
+        Link the widget to a node and update the values of the property
+        widgets that have already been created.
+
+        Note:
+            The node should have the same :meth:`NodePropWidget.layout_key`
+            as the current node, otherwise a new widget should be created.
+
+        Args:
+            node (NodeGraphQt.NodeObject): node object.
+        """
+        self.__node = node
+        self.__node_id = node.id
+
+        widgets = [('name', self.name_wgt)]
+        for prop_window in self.__tab_windows.values():
+            widgets += prop_window.get_widgets().items()
+        for prop_name, widget in widgets:
+            if isinstance(widget, PropButton):
+                continue
+            value = node.get_property(prop_name)
+            if value != widget.get_value():
+                widget.blockSignals(True)
+                widget.set_value(value)
+                widget.blockSignals(False)
+
+    def current_layout_key(self):
+        """
+        Returns the layout key of the node the widget was built from.
+
+        See Also:
+            :meth:`NodePropWidget.layout_key`
+
+        Returns:
+            tuple: node type and property names.
+        """
+        return self.__layout_key
 
     def node_id(self):
         """
@@ -1028,6 +1134,278 @@ class NodePropWidget(QtWidgets.QWidget):
                 return widget
 
 
+class NodesPropWidget(QtWidgets.QWidget):
+    """
+    Properties widget for editing the common properties of multiple nodes
+    at once.
+
+    Properties that don't have the same value on all the nodes display the
+    value of the first node and are labeled as "(mixed)".
+
+    Args:
+        parent (QtWidgets.QWidget): parent object.
+        nodes (list[NodeGraphQt.NodeObject]): nodes.
+        widget_id (str): id emitted by the ``property_closed`` signal.
+    """
+
+    #: signal (node_ids, prop_name, prop_value)
+    properties_changed = QtCore.Signal(list, str, object)
+    property_closed = QtCore.Signal(str)
+
+    def __init__(self, parent=None, nodes=None, widget_id='__selection__'):
+        super(NodesPropWidget, self).__init__(parent)
+        self.__nodes = list(nodes)
+        self.__widget_id = widget_id
+        self.__tab_windows = {}
+        self.__pending_tabs = {}
+        self.__tab = QtWidgets.QTabWidget()
+        self.__tab.currentChanged.connect(self._on_tab_changed)
+
+        close_btn = QtWidgets.QPushButton('X')
+        close_btn.setToolTip('close property')
+        close_btn.clicked.connect(self._on_close)
+
+        self.count_wgt = QtWidgets.QLabel()
+
+        self.type_wgt = QtWidgets.QLabel()
+        self.type_wgt.setAlignment(QtCore.Qt.AlignRight)
+        self.type_wgt.setToolTip('type_')
+        font = self.type_wgt.font()
+        font.setPointSize(10)
+        self.type_wgt.setFont(font)
+
+        name_layout = QtWidgets.QHBoxLayout()
+        name_layout.setContentsMargins(0, 0, 0, 0)
+        name_layout.addWidget(self.count_wgt, 1)
+        name_layout.addWidget(close_btn)
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setSpacing(4)
+        layout.addLayout(name_layout)
+        layout.addWidget(self.__tab)
+        layout.addWidget(self.type_wgt)
+        self._read_nodes()
+
+    def __repr__(self):
+        return '<{}({} nodes) object at {}>'.format(
+            self.__class__.__name__, len(self.__nodes), hex(id(self))
+        )
+
+    @staticmethod
+    def common_properties(nodes):
+        """
+        Returns the custom properties that all the nodes have with the same
+        widget, items and range.
+
+        Args:
+            nodes (list[NodeGraphQt.NodeObject]): nodes.
+
+        Returns:
+            list[str]: property names (ordered as the first node).
+        """
+        if not nodes:
+            return []
+        ref_model = nodes[0].model
+        names = [n for n in ref_model.custom_properties.keys()
+                 if ref_model.get_widget_type(n) != 0]
+
+        # widget attributes are stored per node type.
+        node_types = {}
+        for node in nodes:
+            node_types.setdefault(node.type_, node)
+        for node in node_types.values():
+            model = node.model
+            names = [
+                n for n in names
+                if n in model.custom_properties.keys() and
+                model.get_widget_type(n) == ref_model.get_widget_type(n) and
+                model.get_property_items(n) ==
+                ref_model.get_property_items(n) and
+                model.get_property_range(n) ==
+                ref_model.get_property_range(n)
+            ]
+
+        # properties can be added to a single node instance.
+        for node in nodes:
+            custom_props = node.model.custom_properties
+            names = [n for n in names if n in custom_props]
+        return names
+
+    def _on_close(self):
+        """
+        called by the close button.
+        """
+        self.property_closed.emit(self.__widget_id)
+
+    def _on_property_changed(self, name, value):
+        """
+        slot function called when a property widget has changed.
+
+        Args:
+            name (str): property name.
+            value (object): new value.
+        """
+        self.properties_changed.emit(self.node_ids(), name, value)
+
+    def _on_tab_changed(self, index):
+        """
+        slot function called when the current tab has changed.
+
+        Args:
+            index (int): tab index.
+        """
+        if index >= 0:
+            self._build_tab(self.__tab.tabText(index))
+
+    def _read_nodes(self):
+        """
+        Populate the tabs from the common properties of the nodes, the
+        property widgets are created when a tab is displayed.
+        """
+        model = self.__nodes[0].model
+
+        tab_mapping = defaultdict(list)
+        for prop_name in self.common_properties(self.__nodes):
+            tab_mapping[model.get_tab_name(prop_name)].append(prop_name)
+        tab_mapping['Node'] += ['color', 'text_color', 'disabled']
+
+        self.__pending_tabs = dict(tab_mapping)
+        for tab in sorted(tab_mapping.keys()):
+            if tab != 'Node':
+                self._add_tab(tab)
+        self._add_tab('Node')
+        self._on_tab_changed(self.__tab.currentIndex())
+        self._update_labels()
+
+    def _update_labels(self):
+        """
+        Update the node count and node type labels.
+        """
+        self.count_wgt.setText('{} nodes'.format(len(self.__nodes)))
+        node_types = sorted(set(n.type_ for n in self.__nodes))
+        self.type_wgt.setText(', '.join(node_types))
+
+    def _add_tab(self, name):
+        """
+        add a new tab.
+
+        Args:
+            name (str): tab name.
+        """
+        self.__tab_windows[name] = PropListWidget(self)
+        self.__tab.addTab(self.__tab_windows[name], name)
+
+    def _build_tab(self, tab):
+        """
+        Create the property widgets for a tab that hasn't been displayed yet.
+
+        Args:
+            tab (str): tab name.
+        """
+        prop_names = self.__pending_tabs.pop(tab, None)
+        if not prop_names:
+            return
+        ref_node = self.__nodes[0]
+        prop_window = self.__tab_windows[tab]
+        for prop_name in prop_names:
+            widget = create_property_widget(ref_node, prop_name)
+            if widget is None:
+                continue
+            value = ref_node.get_property(prop_name)
+            prop_window.add_widget(
+                prop_name, widget, value, self._prop_label(prop_name))
+            widget.value_changed.connect(self._on_property_changed)
+
+    def _prop_label(self, prop_name):
+        """
+        Returns the label of a property, labeled as "(mixed)" if the nodes
+        don't have the same value.
+
+        Args:
+            prop_name (str): property name.
+
+        Returns:
+            str: property label.
+        """
+        label = prop_name.replace('_', ' ')
+        value = self.__nodes[0].get_property(prop_name)
+        if any(n.get_property(prop_name) != value for n in self.__nodes):
+            label += ' (mixed)'
+        return label
+
+    def update_label(self, prop_name):
+        """
+        Update the "(mixed)" label of a property after a node value has
+        changed.
+
+        Args:
+            prop_name (str): property name.
+        """
+        if not self.__nodes:
+            return
+        for prop_win in self.__tab_windows.values():
+            if prop_win.get_widget(prop_name):
+                prop_win.set_label(prop_name, self._prop_label(prop_name))
+                return
+
+    def widget_id(self):
+        """
+        Returns the id emitted when the widget is closed.
+
+        Returns:
+            str: widget id.
+        """
+        return self.__widget_id
+
+    def nodes(self):
+        """
+        Returns the nodes linked to the widget.
+
+        Returns:
+            list[NodeGraphQt.NodeObject]: nodes.
+        """
+        return list(self.__nodes)
+
+    def node_ids(self):
+        """
+        Returns the ids of the nodes linked to the widget.
+
+        Returns:
+            list[str]: node ids.
+        """
+        return [n.id for n in self.__nodes]
+
+    def remove_nodes(self, node_ids):
+        """
+        Unlink nodes from the widget.
+
+        Args:
+            node_ids (list[str]): node ids.
+        """
+        node_ids = set(node_ids)
+        self.__nodes = [n for n in self.__nodes if n.id not in node_ids]
+        self._update_labels()
+        if not self.__nodes:
+            return
+        for prop_win in self.__tab_windows.values():
+            for prop_name in prop_win.get_widgets():
+                prop_win.set_label(prop_name, self._prop_label(prop_name))
+
+    def get_widget(self, name):
+        """
+        get property widget.
+
+        Args:
+            name (str): property name.
+
+        Returns:
+            QtWidgets.QWidget: property widget.
+        """
+        for prop_win in self.__tab_windows.values():
+            widget = prop_win.get_widget(name)
+            if widget:
+                return widget
+
+
 if __name__ == '__main__':
     import sys
     from NodeGraphQt import BaseNode, NodeGraph
@@ -1,7 +1,10 @@
 #!/usr/bin/python
+from collections import OrderedDict
+
 from Qt import QtWidgets, QtCore, QtGui, QtCompat
 
-from NodeGraphQt.custom_widgets.properties import NodePropWidget
+from NodeGraphQt.custom_widgets.properties import (NodePropWidget,
+                                                   NodesPropWidget)
 
 
 class PropertiesDelegate(QtWidgets.QStyledItemDelegate):
@@ -69,6 +72,15 @@ class PropertiesBinWidget(QtWidgets.QWidget):
     The :class:`NodeGraphQt.PropertiesBinWidget` is a list widget for displaying
     and editing a nodes properties.
 
+    Node property widgets are kept in a small cache after they've been
+    removed from the bin and re-used when the same node (or a node with the
+    same properties) is loaded again, see
+    :meth:`PropertiesBinWidget.set_cache_size`.
+
+    With multi selection enabled the common properties of the selected nodes
+    are displayed once and edits are applied to all of them with a single
+    undo command, see :meth:`PropertiesBinWidget.set_multi_selection`.
+
     .. image:: _images/prop_bin.png
         :width: 950px
 
@@ -91,6 +103,11 @@ class PropertiesBinWidget(QtWidgets.QWidget):
 
     #: Signal emitted (node_id, prop_name, prop_value)
     property_changed = QtCore.Signal(str, str, object)
+    #: Signal emitted (node_ids, prop_name, prop_value)
+    properties_changed = QtCore.Signal(list, str, object)
+
+    #: row id of the multiple nodes property widget.
+    SELECTION_ID = '__selection__'
 
     def __init__(self, parent=None, node_graph=None):
         super(PropertiesBinWidget, self).__init__(parent)
@@ -105,6 +122,20 @@ class PropertiesBinWidget(QtWidgets.QWidget):
         self.resize(450, 400)
 
         self._block_signal = False
+        self._graph = node_graph
+
+        # {row id: table item} for the rows in the list.
+        self._items = {}
+        # least recently used cache of node property widgets.
+        self._prop_widgets = OrderedDict()
+        self._cache_size = 8
+
+        self._multi = False
+        self.btn_multi = QtWidgets.QPushButton('multi')
+        self.btn_multi.setCheckable(True)
+        self.btn_multi.setToolTip(
+            'Edit the common properties of the selected nodes.')
+        self.btn_multi.toggled.connect(self.set_multi_selection)
 
         self._lock = False
         self.btn_lock = QtWidgets.QPushButton('lock')
@@ -120,6 +151,7 @@ class PropertiesBinWidget(QtWidgets.QWidget):
         top_layout.setSpacing(2)
         top_layout.addWidget(self._limit)
         top_layout.addStretch(1)
+        top_layout.addWidget(self.btn_multi)
         top_layout.addWidget(self.btn_lock)
         top_layout.addWidget(btn_clr)
 
@@ -132,18 +164,22 @@ class PropertiesBinWidget(QtWidgets.QWidget):
         node_graph.node_double_clicked.connect(self.add_node)
         node_graph.nodes_deleted.connect(self.__on_nodes_deleted)
         node_graph.property_changed.connect(self.__on_graph_property_changed)
+        node_graph.properties_changed.connect(
+            self.__on_graph_properties_changed)
+        node_graph.node_selection_changed.connect(self.__on_selection_changed)
 
     def __repr__(self):
         return '<{} object at {}>'.format(self.__class__.__name__, hex(id(self)))
 
     def __on_prop_close(self, node_id):
-        items = self._prop_list.findItems(node_id, QtCore.Qt.MatchExactly)
-        [self._prop_list.removeRow(i.row()) for i in items]
+        item = self._items.get(node_id)
+        if item:
+            self._remove_row(item.row())
 
     def __on_limit_changed(self, value):
         rows = self._prop_list.rowCount()
         if rows > value:
-            self._prop_list.removeRow(rows - 1)
+            self._remove_row(rows - 1)
 
     def __on_nodes_deleted(self, nodes):
         """
@@ -152,7 +188,33 @@ class PropertiesBinWidget(QtWidgets.QWidget):
         Args:
             nodes (list[str]): list of node ids.
         """
-        [self.__on_prop_close(n) for n in nodes]
+        for node_id in nodes:
+            self.__on_prop_close(node_id)
+            prop_widget = self._prop_widgets.pop(node_id, None)
+            if prop_widget:
+                prop_widget.deleteLater()
+
+        nodes_widget = self.nodes_prop_widget()
+        if nodes_widget:
+            nodes_widget.remove_nodes(nodes)
+            if not nodes_widget.nodes():
+                self.__on_prop_close(self.SELECTION_ID)
+
+    def __on_selection_changed(self, selected, deselected):
+        """
+        Slot function when the node selection has changed.
+
+        Args:
+            selected (list[NodeGraphQt.NodeObject]): selected nodes.
+            deselected (list[NodeGraphQt.NodeObject]): deselected nodes.
+        """
+        if not self._multi:
+            return
+        nodes = self._graph.selected_nodes()
+        if len(nodes) > 1:
+            self.add_nodes(nodes)
+        else:
+            self.__on_prop_close(self.SELECTION_ID)
 
     def __on_graph_property_changed(self, node, prop_name, prop_value):
         """
@@ -164,9 +226,48 @@ class PropertiesBinWidget(QtWidgets.QWidget):
             prop_value (object): node property value.
         """
         properties_widget = self.prop_widget(node)
-        if not properties_widget:
-            return
+        if properties_widget:
+            self._update_widget(properties_widget, prop_name, prop_value)
+
+        nodes_widget = self.nodes_prop_widget()
+        if nodes_widget and node.id in nodes_widget.node_ids():
+            if nodes_widget.nodes()[0] is node:
+                self._update_widget(nodes_widget, prop_name, prop_value)
+            nodes_widget.update_label(prop_name)
 
+    def __on_graph_properties_changed(self, nodes, prop_name, prop_values):
+        """
+        Slot function that updates the property bin from the node graph
+        signal emitted when a property changed on multiple nodes.
+
+        Args:
+            nodes (list[NodeGraphQt.NodeObject]): nodes.
+            prop_name (str): node property name.
+            prop_values (list[object]): node property value for each node.
+        """
+        for node, prop_value in zip(nodes, prop_values):
+            properties_widget = self.prop_widget(node)
+            if properties_widget:
+                self._update_widget(properties_widget, prop_name, prop_value)
+
+        nodes_widget = self.nodes_prop_widget()
+        if nodes_widget:
+            ref_node = nodes_widget.nodes()[0]
+            for node, prop_value in zip(nodes, prop_values):
+                if node is ref_node:
+                    self._update_widget(nodes_widget, prop_name, prop_value)
+                    break
+            nodes_widget.update_label(prop_name)
+
+    def _update_widget(self, properties_widget, prop_name, prop_value):
+        """
+        Set a property widget value without emitting the bin signals.
+
+        Args:
+            properties_widget (NodePropWidget or NodesPropWidget): widget.
+            prop_name (str): node property name.
+            prop_value (object): node property value.
+        """
         property_window = properties_widget.get_widget(prop_name)
 
         if property_window and prop_value != property_window.get_value():
@@ -186,6 +287,161 @@ class PropertiesBinWidget(QtWidgets.QWidget):
         if not self._block_signal:
             self.property_changed.emit(node_id, prop_name, prop_value)
 
+    def __on_nodes_widget_changed(self, node_ids, prop_name, prop_value):
+        """
+        Slot function triggered when a property widget value has changed
+        in the multiple nodes property widget.
+
+        Args:
+            node_ids (list[str]): node ids.
+            prop_name (str): node property name.
+            prop_value (object): node property value.
+        """
+        if not self._block_signal:
+            self.properties_changed.emit(node_ids, prop_name, prop_value)
+
+    def _remove_row(self, row):
+        """
+        Remove a row from the list and keep the node property widget in the
+        cache. (the table deletes the cell widget so the property widget is
+        taken out of its container first)
+
+        Args:
+            row (int): row index.
+        """
+        item = self._prop_list.item(row, 0)
+        if item:
+            self._items.pop(item.text(), None)
+        container = self._prop_list.cellWidget(row, 0)
+        if container and isinstance(container.property_widget,
+                                    NodePropWidget):
+            prop_widget = container.property_widget
+            prop_widget.hide()
+            prop_widget.setParent(None)
+        self._prop_list.removeRow(row)
+        self._trim_cache()
+
+    def _insert_row(self, row_id, prop_widget):
+        """
+        Insert a property widget at the top of the list.
+
+        Args:
+            row_id (str): node id or the multiple nodes row id.
+            prop_widget (NodePropWidget or NodesPropWidget): widget.
+        """
+        self._prop_list.insertRow(0)
+        container = QtWidgets.QWidget()
+        container.property_widget = prop_widget
+        layout = QtWidgets.QVBoxLayout(container)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(prop_widget)
+        prop_widget.show()
+        self._prop_list.setCellWidget(0, 0, container)
+
+        item = QtWidgets.QTableWidgetItem(row_id)
+        self._prop_list.setItem(0, 0, item)
+        self._prop_list.selectRow(0)
+        self._items[row_id] = item
+        self._trim_cache()
+
+    def _make_room(self, row_id):
+        """
+        Remove the existing row for the id and the last row if the list
+        is at the node limit.
+
+        Args:
+            row_id (str): node id or the multiple nodes row id.
+        """
+        self.__on_prop_close(row_id)
+        rows = self._prop_list.rowCount()
+        if rows >= self.limit():
+            self._remove_row(rows - 1)
+
+    def _displayed_ids(self):
+        """
+        Returns the ids of the nodes loaded in the bin.
+
+        Returns:
+            set[str]: node ids.
+        """
+        return set(self._items.keys())
+
+    def _trim_cache(self):
+        """
+        Delete the least recently used property widgets that are not loaded
+        in the bin until the cache is within its size.
+        """
+        excess = len(self._prop_widgets) - self._cache_size
+        if excess <= 0:
+            return
+        displayed = self._displayed_ids()
+        for node_id in list(self._prop_widgets.keys()):
+            if excess <= 0:
+                break
+            if node_id in displayed:
+                continue
+            self._prop_widgets.pop(node_id).deleteLater()
+            excess -= 1
+
+    def _acquire_prop_widget(self, node):
+        """
+        Returns a property widget for the node, re-using the cached widget
+        for the node (if its properties didn't change) or the least recently
+        used widget of a node with the same properties when the cache is
+        full.
+
+        Args:
+            node (NodeGraphQt.NodeObject): node object.
+
+        Returns:
+            NodePropWidget: node property widget.
+        """
+        layout_key = NodePropWidget.layout_key(node)
+        prop_widget = self._prop_widgets.pop(node.id, None)
+        if prop_widget is not None and \
+                prop_widget.current_layout_key() != layout_key:
+            # the node properties changed since the widget was cached.
+            prop_widget.deleteLater()
+            prop_widget = None
+        if prop_widget is None and len(self._prop_widgets) >= self._cache_size:
+            displayed = self._displayed_ids()
+            for node_id, cached in self._prop_widgets.items():
+                if node_id not in displayed and \
+                        cached.current_layout_key() == layout_key:
+                    prop_widget = self._prop_widgets.pop(node_id)
+                    break
+
+        if prop_widget is None:
+            prop_widget = NodePropWidget(node=node)
+            prop_widget.property_changed.connect(
+                self.__on_property_widget_changed)
+            prop_widget.property_closed.connect(self.__on_prop_close)
+        else:
+            prop_widget.set_node(node)
+
+        self._prop_widgets[node.id] = prop_widget
+        return prop_widget
+
+    def cache_size(self):
+        """
+        Returns the number of node property widgets kept in the cache.
+
+        Returns:
+            int: cache size.
+        """
+        return self._cache_size
+
+    def set_cache_size(self, size):
+        """
+        Set the number of node property widgets kept in the cache after
+        they have been removed from the bin.
+
+        Args:
+            size (int): cache size.
+        """
+        self._cache_size = max(0, int(size))
+        self._trim_cache()
+
     def limit(self):
         """
         Returns the limit for how many nodes can be loaded into the bin.
@@ -214,23 +470,32 @@ class PropertiesBinWidget(QtWidgets.QWidget):
         if self.limit() == 0 or self._lock:
             return
 
-        rows = self._prop_list.rowCount()
-        if rows >= self.limit():
-            self._prop_list.removeRow(rows - 1)
+        self._make_room(node.id)
+        self._insert_row(node.id, self._acquire_prop_widget(node))
 
-        itm_find = self._prop_list.findItems(node.id, QtCore.Qt.MatchExactly)
-        if itm_find:
-            self._prop_list.removeRow(itm_find[0].row())
+    def add_nodes(self, nodes):
+        """
+        Add the common properties of multiple nodes to the properties bin
+        (replaces the previous multiple nodes widget).
 
-        self._prop_list.insertRow(0)
-        prop_widget = NodePropWidget(node=node)
-        prop_widget.property_changed.connect(self.__on_property_widget_changed)
-        prop_widget.property_closed.connect(self.__on_prop_close)
-        self._prop_list.setCellWidget(0, 0, prop_widget)
+        Args:
+            nodes (list[NodeGraphQt.NodeObject]): node objects.
+        """
+        if not nodes:
+            return
+        if len(nodes) == 1:
+            self.add_node(nodes[0])
+            return
+        if self.limit() == 0 or self._lock:
+            return
 
-        item = QtWidgets.QTableWidgetItem(node.id)
-        self._prop_list.setItem(0, 0, item)
-        self._prop_list.selectRow(0)
+        self._make_room(self.SELECTION_ID)
+        nodes_widget = NodesPropWidget(nodes=nodes,
+                                       widget_id=self.SELECTION_ID)
+        nodes_widget.properties_changed.connect(
+            self.__on_nodes_widget_changed)
+        nodes_widget.property_closed.connect(self.__on_prop_close)
+        self._insert_row(self.SELECTION_ID, nodes_widget)
 
     def remove_node(self, node):
         """
@@ -242,6 +507,29 @@ class PropertiesBinWidget(QtWidgets.QWidget):
         node_id = node if isinstance(node, str) else node.id
         self.__on_prop_close(node_id)
 
+    def multi_selection(self):
+        """
+        Returns true if the selected nodes are loaded into the bin.
+
+        Returns:
+            bool: true if multi selection is enabled.
+        """
+        return self._multi
+
+    def set_multi_selection(self, enabled=True):
+        """
+        Load the common properties of the selected nodes into the bin when
+        the node selection changes.
+
+        Args:
+            enabled (bool): true to enable multi selection.
+        """
+        self._multi = bool(enabled)
+        if self.btn_multi.isChecked() != self._multi:
+            self.btn_multi.setChecked(self._multi)
+        if self._multi:
+            self.__on_selection_changed([], [])
+
     def lock_bin(self):
         """
         Lock/UnLock the properties bin.
@@ -256,7 +544,8 @@ class PropertiesBinWidget(QtWidgets.QWidget):
         """
         Clear the properties bin.
         """
-        self._prop_list.setRowCount(0)
+        for row in reversed(range(self._prop_list.rowCount())):
+            self._remove_row(row)
 
     def prop_widget(self, node):
         """
@@ -269,10 +558,19 @@ class PropertiesBinWidget(QtWidgets.QWidget):
             NodePropWidget: node property widget.
         """
         node_id = node if isinstance(node, str) else node.id
-        itm_find = self._prop_list.findItems(node_id, QtCore.Qt.MatchExactly)
-        if itm_find:
-            item = itm_find[0]
-            return self._prop_list.cellWidget(item.row(), 0)
+        if node_id in self._items:
+            return self._prop_widgets.get(node_id)
+
+    def nodes_prop_widget(self):
+        """
+        Returns the multiple nodes property widget.
+
+        Returns:
+            NodesPropWidget: property widget or None.
+        """
+        item = self._items.get(self.SELECTION_ID)
+        if item:
+            return self._prop_list.cellWidget(item.row(), 0).property_widget
 
 
 if __name__ == '__main__':
@@ -20,4 +20,6 @@ class PortPropertyError(Exception): pass
 
 class PortRegistrationError(Exception): pass
 
-class GraphPropertyError(Exception): pass
\ No newline at end of file
+class GraphPropertyError(Exception): pass
+
+class GraphExecutionError(Exception): pass
@@ -66,21 +66,24 @@ class BackdropNode(NodeObject):
         self.set_pos(*size['pos'])
         self.graph.end_undo()
 
-    def wrap_nodes(self, nodes):
+    def wrap_nodes(self, nodes, push_undo=True):
         """
         Set the backdrop size to fit around specified nodes.
 
         Args:
             nodes (list[NodeGraphQt.NodeObject]): list of nodes.
+            push_undo (bool): register the command to the undo stack. (default: True)
         """
         if not nodes:
             return
-        self.graph.begin_undo('"{}" wrap nodes'.format(self.name()))
+        if push_undo:
+            self.graph.begin_undo('"{}" wrap nodes'.format(self.name()))
         size = self.view.calc_backdrop_size([n.view for n in nodes])
-        self.set_property('width', size['width'])
-        self.set_property('height', size['height'])
-        self.set_pos(*size['pos'])
-        self.graph.end_undo()
+        self.set_property('width', size['width'], push_undo)
+        self.set_property('height', size['height'], push_undo)
+        self.set_property('pos', [float(v) for v in size['pos']], push_undo)
+        if push_undo:
+            self.graph.end_undo()
 
     def nodes(self):
         """
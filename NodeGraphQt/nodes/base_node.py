@@ -83,7 +83,7 @@ class BaseNode(NodeObject):
             self.model.set_property(name, val)
 
         for name, widget in self.view.widgets.items():
-            self.model.set_property(name, widget.value)
+            self.model.set_property(name, widget.get_value())
 
     def set_icon(self, icon=None):
         """
@@ -271,6 +271,7 @@ class BaseNode(NodeObject):
             port.model.painter_func_name = painter_func.__name__
         self._inputs.append(port)
         self.model.inputs[port.name()] = port.model
+        port.model._touch()
         return port
 
     def add_output(self, name='output', multi_output=True, display_name=True,
@@ -315,6 +316,7 @@ class BaseNode(NodeObject):
             port.model.painter_func_name = painter_func.__name__
         self._outputs.append(port)
         self.model.outputs[port.name()] = port.model
+        port.model._touch()
         return port
 
     def get_input(self, port):
@@ -375,6 +377,7 @@ class BaseNode(NodeObject):
             raise PortError('Error: Can\'t delete a port that is locked!')
         self._inputs.remove(port)
         self._model.inputs.pop(port.name())
+        port.model._touch()
         self._view.delete_input(port.view)
         port.model.node = None
         self.draw()
@@ -405,6 +408,7 @@ class BaseNode(NodeObject):
             raise PortError('Error: Can\'t delete a port that is locked!')
         self._outputs.remove(port)
         self._model.outputs.pop(port.name())
+        port.model._touch()
         self._view.delete_output(port.view)
         port.model.node = None
         self.draw()
@@ -634,6 +638,30 @@ class BaseNode(NodeObject):
             nodes[p] = [cp.node() for cp in p.connected_ports()]
         return nodes
 
+    def run(self, inputs):
+        """
+        Compute the node outputs, called by the
+        :class:`NodeGraphQt.GraphExecutor` in topological order.
+
+        *The default of this function does nothing re-implement to compute
+        the node.*
+
+        Note:
+            This function is called from a worker thread so it should not
+            change the node view. With a process pool ``self`` is a snapshot
+            of the node that only provides :meth:`NodeObject.get_property`,
+            :meth:`NodeObject.name` and :attr:`NodeObject.id`.
+
+        Args:
+            inputs (dict): {input port name: value} the value is a list of
+                values for multi input ports and None if not connected.
+
+        Returns:
+            dict: {output port name: value} (a single value is also accepted
+                for nodes with one output port).
+        """
+        return {}
+
     def on_input_connected(self, in_port, out_port):
         """
         Callback triggered when a new pipe connection is made.
@@ -1,7 +1,11 @@
 #!/usr/bin/python
+import json
+
+from NodeGraphQt.base.session_store import (SessionBlob,
+                                            get_blob,
+                                            intern_session)
 from NodeGraphQt.constants import (NODE_LAYOUT_VERTICAL,
                                    NODE_LAYOUT_HORIZONTAL)
-
 from NodeGraphQt.nodes.base_node import BaseNode
 from NodeGraphQt.nodes.port_node import PortInputNode, PortOutputNode
 from NodeGraphQt.qgraphics.node_group import (GroupNodeItem,
@@ -59,20 +63,57 @@ class GroupNode(BaseNode):
         """
         Returns the serialized sub graph session.
 
+        Note:
+            The session is stored as JSON text and decoded into a new copy on
+            every call, use :meth:`GroupNode.get_sub_graph_session_blob` to
+            get the session without decoding it.
+
         Returns:
             dict: serialized sub graph session.
         """
-        return self.model.subgraph_session
+        session = self.get_sub_graph_session_blob()
+        if isinstance(session, SessionBlob):
+            return session.data()
+        return session or {}
+
+    def get_sub_graph_session_blob(self):
+        """
+        Returns the shared sub graph session blob.
+
+        Group nodes with identical sub graph sessions share the same blob.
+
+        Returns:
+            SessionBlob: session blob (or None if no session).
+        """
+        session = self.model.subgraph_session
+        if isinstance(session, SessionBlob) or not session:
+            return session or None
+        # sessions not resolved by the node graph.
+        self.set_sub_graph_session(session)
+        return self.model.subgraph_session or None
 
     def set_sub_graph_session(self, serialized_session):
         """
         Sets the sub graph session data to the group node.
 
+        The session is stored as a shared content addressed blob so it's not
+        walked again when the parent graph is serialized and only decoded
+        when the group node is expanded.
+
         Args:
-            serialized_session (dict): serialized session.
+            serialized_session (dict or SessionBlob or str): serialized
+                session, session blob or session content hash.
         """
-        serialized_session = serialized_session or {}
-        self.model.subgraph_session = serialized_session
+        session = serialized_session or ''
+        if isinstance(session, str):
+            # content hash or JSON text from older sessions.
+            blob = get_blob(session)
+            if blob is None and session.startswith('{'):
+                blob = intern_session(json.loads(session))
+            session = blob or ''
+        elif isinstance(session, dict):
+            session = intern_session(session)
+        self.model.subgraph_session = session
 
     def expand(self):
         """
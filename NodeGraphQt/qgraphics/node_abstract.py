@@ -49,6 +49,13 @@ class AbstractNodeItem(QtWidgets.QGraphicsItem):
         self._properties['selected'] = selected
         super(AbstractNodeItem, self).setSelected(selected)
 
+    def itemChange(self, change, value):
+        if change == self.ItemSceneHasChanged:
+            viewer = self.viewer()
+            if viewer:
+                viewer.update_item_cache_mode(self)
+        return super(AbstractNodeItem, self).itemChange(change, value)
+
     def pre_init(self, viewer, pos=None):
         """
         Called before node has been added into the scene.
@@ -5,6 +5,7 @@ from NodeGraphQt.constants import Z_VAL_PIPE, NodeEnum
 from NodeGraphQt.qgraphics.node_abstract import AbstractNodeItem
 from NodeGraphQt.qgraphics.pipe import PipeItem
 from NodeGraphQt.qgraphics.port import PortItem
+from NodeGraphQt.widgets.viewer_diagnostics import record_paint
 
 
 class BackdropSizer(QtWidgets.QGraphicsItem):
@@ -121,10 +122,14 @@ class BackdropNodeItem(AbstractNodeItem):
         self._nodes = [self]
 
     def _combined_rect(self, nodes):
-        group = self.scene().createItemGroup(nodes)
-        rect = group.boundingRect()
-        self.scene().destroyItemGroup(group)
-        return rect
+        if not nodes:
+            return QtCore.QRectF()
+        lefts, tops, rights, bottoms = zip(*[
+            (r.left(), r.top(), r.right(), r.bottom())
+            for r in (n.sceneBoundingRect() for n in nodes)
+        ])
+        return QtCore.QRectF(QtCore.QPointF(min(lefts), min(tops)),
+                             QtCore.QPointF(max(rights), max(bottoms)))
 
     def mouseDoubleClickEvent(self, event):
         viewer = self.viewer()
@@ -173,6 +178,7 @@ class BackdropNodeItem(AbstractNodeItem):
         self.viewer().node_backdrop_updated.emit(
             self.id, 'sizer_double_clicked', size)
 
+    @record_paint('backdrop')
     def paint(self, painter, option, widget):
         """
         Draws the backdrop rect.
@@ -16,6 +16,8 @@ from NodeGraphQt.qgraphics.node_abstract import AbstractNodeItem
 from NodeGraphQt.qgraphics.node_overlay_disabled import XDisabledItem
 from NodeGraphQt.qgraphics.node_text_item import NodeTextItem
 from NodeGraphQt.qgraphics.port import PortItem, CustomPortItem
+from NodeGraphQt.qgraphics.theme import NODE_THEME, ItemTheme, SharedTheme
+from NodeGraphQt.widgets.viewer_diagnostics import record_paint
 
 
 class NodeItem(AbstractNodeItem):
@@ -45,25 +47,10 @@ class NodeItem(AbstractNodeItem):
         self._widgets = OrderedDict()
         self._proxy_mode = False
         self._proxy_mode_threshold = 70
-        self._theme = {'node_border_width': 0.8,
-                        'node_selected_color': NodeEnum.SELECTED_COLOR.value,
-                        'node_selected_border_color': NodeEnum.SELECTED_BORDER_COLOR.value,
-                        'node_selected_title_color': NodeEnum.SELECTED_COLOR.value,
-                        'node_selected_border_width': 1.2,                        
-                        'node_name_background_padding': [3.0, 2.0],
-                        'node_base_background_margin': 1.0,
-                        'node_name_background_margin': 1.0,
-                        'node_name_background_radius': 3.0,
-                        'node_progress_bar_background_color': NodeEnum.PROGRESS_BAR_BACKGROUND_COLOR.value,
-                        'node_progress_bar_color': NodeEnum.PROGRESS_BAR_COLOR.value,
-                        'node_progress_bar_height': NodeEnum.PROGRESS_BAR_HEIGHT.value,
-                        'node_progress_bar_mode': NodeEnum.PROGRESS_BAR_MODE_NONE.value,
-                        'node_progress_bar_percent': 100,
-                        'node_progress_bar_block_count': 1,
-                        'node_progress_bar_block_colors': []
-                        }
-        self._default_theme = {}
+        self._theme = ItemTheme(NODE_THEME)
+        self._blocks_image_cache = None
 
+    @record_paint('node')
     def paint(self, painter, option, widget):
         """
         Draws the node base not the ports or text.
@@ -132,23 +119,25 @@ class NodeItem(AbstractNodeItem):
                 painter.drawRect(status_rect)
 
             elif self._theme['node_progress_bar_mode'] == NodeEnum.PROGRESS_BAR_MODE_BLOCKS.value:
-                width_per_block = int((rect.width() - (margin * 2)) / max(self._theme['node_progress_bar_block_count'], len(self._theme['node_progress_bar_block_colors'])))
-                start_x = 0
-                for block_item in self._theme['node_progress_bar_block_colors']:
-                    status_rect = QtCore.QRectF(margin + start_x,
-                                              text_rect.y() + text_rect.height(),
-                                              width_per_block,
-                                              progress_bar_height)
-                    painter.setBrush(QtGui.QColor(*block_item))
-                    painter.drawRect(status_rect)
-                    start_x = start_x + width_per_block
-                    status_rect = QtCore.QRectF(margin + start_x - 1,
-                                              text_rect.y() + text_rect.height(),
-                                              1,
-                                              progress_bar_height)
-                    qt_black = (0, 0, 0, 255)
-                    painter.setBrush(QtGui.QColor(*qt_black))
-                    painter.drawRect(status_rect)
+                block_colors = self._theme['node_progress_bar_block_colors']
+                block_slots = max(self._theme['node_progress_bar_block_count'],
+                                  len(block_colors))
+                bar_width = rect.width() - (margin * 2)
+                width_per_block = int(bar_width / block_slots)
+                if block_colors:
+                    if width_per_block:
+                        blocks_width = width_per_block * len(block_colors)
+                    else:
+                        blocks_width = bar_width * len(block_colors) / block_slots
+                    status_rect = QtCore.QRectF(margin,
+                                                text_rect.y() + text_rect.height(),
+                                                blocks_width,
+                                                progress_bar_height)
+                    painter.setRenderHint(
+                        QtGui.QPainter.SmoothPixmapTransform, False)
+                    painter.drawImage(
+                        status_rect,
+                        self._progress_bar_blocks_image(width_per_block))
 
         # node border
         if self.selected:
@@ -232,9 +221,11 @@ class NodeItem(AbstractNodeItem):
             value:
         """
         if change == self.ItemSelectedChange and self.scene():
-            self.reset_pipes()
-            if value:
-                self.highlight_pipes()
+            viewer = self.viewer()
+            if not (viewer and viewer.defer_pipe_update(self)):
+                self.reset_pipes()
+                if value:
+                    self.highlight_pipes()
             self.setZValue(Z_VAL_NODE)
             if not self.selected:
                 self.setZValue(Z_VAL_NODE + 1)
@@ -529,7 +520,7 @@ class NodeItem(AbstractNodeItem):
         Decide whether to draw the node with proxy mode.
         (this is called at the start in the "self.paint()" function.)
         """
-        if ITEM_CACHE_MODE is QtWidgets.QGraphicsItem.ItemCoordinateCache:
+        if self.cacheMode() == QtWidgets.QGraphicsItem.ItemCoordinateCache:
             return
 
         rect = self.sceneBoundingRect()
@@ -693,7 +684,7 @@ class NodeItem(AbstractNodeItem):
             self._output_items[port] = text
         if self.scene():
             self.post_init()
-        port.set_theme_items(self._default_theme)
+        port.set_shared_theme(self._theme.shared)
         return port
 
     def add_input(self, name='input', multi_port=False, display_name=True,
@@ -824,7 +815,7 @@ class NodeItem(AbstractNodeItem):
         widgets = node_dict.pop('widgets', {})
         for name, value in widgets.items():
             if self._widgets.get(name):
-                self._widgets[name].value = value
+                self._widgets[name].set_value(value)
 
     def set_theme_item(self, item, value):
         if item in self._theme:
@@ -839,15 +830,58 @@ class NodeItem(AbstractNodeItem):
             self.set_theme_item(item, value)
 
     def set_default_theme(self, theme, update_current=True):
-        self._default_theme = theme
-        if update_current:
-            self.set_theme_items(theme)
-            for port in self._input_items:
-                port.set_theme_items(theme)
-            for port in self._output_items:
-                port.set_theme_items(theme)
-
-    def get_theme_specifics(self, compare_theme):
+        """
+        Set the shared theme the node and its ports inherit from.
+
+        Args:
+            theme (SharedTheme or dict): shared graph theme.
+            update_current (bool): false to keep the current theme values.
+        """
+        if not isinstance(theme, SharedTheme):
+            theme = SharedTheme(theme)
+        ports = list(self._input_items) + list(self._output_items)
+        if not update_current:
+            self.pin_theme()
+        self._theme.set_shared(theme)
+        for port in ports:
+            port.set_shared_theme(theme)
+        # the node colors are node properties and can't be shared.
+        for item in ('node_color', 'node_border_color'):
+            if update_current and item in theme:
+                self.set_theme_item(item, theme.values()[item])
+
+    def pin_theme(self):
+        """
+        Keep the current shared theme values on the node and its ports
+        when the shared theme changes.
+        """
+        self._theme.pin()
+        for port in list(self._input_items) + list(self._output_items):
+            port.pin_theme()
+
+    def has_theme_overrides(self):
+        """
+        Returns true if the node has theme values that differ from the
+        shared graph theme.
+
+        Returns:
+            bool: true if overridden.
+        """
+        return self._theme.has_overrides()
+
+    def get_theme_specifics(self, compare_theme=None):
+        """
+        Returns the node theme values that differ from the shared theme.
+
+        Args:
+            compare_theme (dict): theme to compare against
+                (defaults to the shared graph theme).
+
+        Returns:
+            dict: theme items.
+        """
+        if compare_theme is None or compare_theme is self._theme.shared:
+            return self._theme.overrides()
         theme_specifics = {}
         for key, value in self._theme.items():
             if key not in compare_theme:
@@ -856,72 +890,140 @@ class NodeItem(AbstractNodeItem):
                 theme_specifics[key] = value
         return theme_specifics
 
+    def _progress_bar_rect(self):
+        """
+        Returns the area of the progress bar drawn under the node name.
+
+        Returns:
+            QtCore.QRectF: progress bar rect in item coordinates.
+        """
+        margin = self._theme['node_base_background_margin']
+        rect = self.boundingRect()
+        padding = self._theme['node_name_background_padding']
+        name_margin = self._theme['node_name_background_margin']
+        text_height = self._text_item.boundingRect().height()
+        return QtCore.QRectF(
+            rect.left() + margin + name_margin,
+            rect.top() + margin + text_height - padding[1],
+            rect.width() - (margin * 2) - (name_margin * 2),
+            self._theme['node_progress_bar_height']
+        )
+
+    def _update_progress_bar(self):
+        """
+        Repaint only the progress bar area, the node size doesn't depend on
+        the progress bar so no relayout is needed.
+        """
+        if self._theme['node_progress_bar_mode'] == \
+                NodeEnum.PROGRESS_BAR_MODE_NONE.value:
+            return
+        # (the block separators can be drawn a pixel outside the bar rect)
+        self.update(self._progress_bar_rect().adjusted(-2.0, -1.0, 2.0, 1.0))
+
+    def _set_progress_bar_items(self, items):
+        """
+        Set progress bar theme items and repaint the bar if they changed.
+
+        Args:
+            items (dict): {theme item: value}
+        """
+        changed = {k: v for k, v in items.items() if self._theme.get(k) != v}
+        if not changed:
+            return
+        mode_changed = 'node_progress_bar_mode' in changed
+        height_changed = 'node_progress_bar_height' in changed
+        if mode_changed or height_changed:
+            # repaint the old bar area before it changes.
+            self._update_progress_bar()
+        self._theme.update(changed)
+        self._update_progress_bar()
+
+    def _progress_bar_blocks_image(self, block_width):
+        """
+        Returns the block mode progress bar strip rendered into a single
+        scanline image that is scaled into the bar rect at paint time.
+
+        The image is only rebuilt when the block colors or the block width
+        change.
+
+        Args:
+            block_width (int): width of a block in pixels
+                (0 draws one pixel per block without separators).
+
+        Returns:
+            QtGui.QImage: progress bar blocks image.
+        """
+        block_colors = self._theme['node_progress_bar_block_colors']
+        cache = self._blocks_image_cache
+        # (the block colors list is replaced on every change)
+        if cache and cache[0] is block_colors and cache[1] == block_width:
+            return cache[2]
+
+        pixels = max(1, block_width)
+        image = QtGui.QImage(pixels * len(block_colors), 1,
+                             QtGui.QImage.Format_ARGB32)
+        separator = QtGui.QColor(0, 0, 0, 255).rgba()
+        for i, color in enumerate(block_colors):
+            rgba = QtGui.QColor(*color).rgba()
+            x = i * pixels
+            for px in range(x, x + pixels):
+                image.setPixel(px, 0, rgba)
+            if block_width:
+                image.setPixel(x + pixels - 1, 0, separator)
+        self._blocks_image_cache = (block_colors, block_width, image)
+        return image
+
     def set_progress_bar_background_color(self, background_color):
-        self._theme['node_progress_bar_background_color'] = background_color
-        if self.scene():
-            self.post_init()
-        self.update()
+        self._set_progress_bar_items(
+            {'node_progress_bar_background_color': background_color})
 
     def get_progress_bar_background_color(self):
         return self._theme['node_progress_bar_background_color']
 
     def set_progress_bar_color(self, color):
-        self._theme['node_progress_bar_color'] = color
-        if self.scene():
-            self.post_init()
-        self.update()
-
-    def get_progress_bar_height(self):
-        return self._theme['node_progress_bar_height']
+        self._set_progress_bar_items({'node_progress_bar_color': color})
 
     def set_progress_bar_height(self, height):
-        self._theme['node_progress_bar_height'] = height
-        if self.scene():
-            self.post_init()
-        self.update()
+        self._set_progress_bar_items({'node_progress_bar_height': height})
 
     def get_progress_bar_height(self):
         return self._theme['node_progress_bar_height']
 
     def set_progress_bar_mode(self, mode):
-        self._theme['node_progress_bar_mode'] = mode
-        if self.scene():
-            self.post_init()
-        self.update()
+        self._set_progress_bar_items({'node_progress_bar_mode': mode})
 
     def get_progress_bar_mode(self):
         return self._theme['node_progress_bar_mode']
 
     def set_progress_bar_percent(self, percent=100, background_color=None, color=None):
-        self._theme['node_progress_bar_mode'] = NodeEnum.PROGRESS_BAR_MODE_PERCENT.value
-        self._theme['node_progress_bar_percent'] = percent
+        items = {
+            'node_progress_bar_mode': NodeEnum.PROGRESS_BAR_MODE_PERCENT.value,
+            'node_progress_bar_percent': percent
+        }
         if background_color:
-            self._theme['node_progress_bar_background_color'] = background_color
+            items['node_progress_bar_background_color'] = background_color
         if color:
-            self._theme['node_progress_bar_color'] = color
-        if self.scene():
-            self.post_init()
-        self.update()
+            items['node_progress_bar_color'] = color
+        self._set_progress_bar_items(items)
 
     def get_progress_bar_percent(self):
         return self._theme['node_progress_bar_percent']
 
     def set_progress_bar_block_count(self, block_count):
-        self._theme['node_progress_bar_block_count'] = block_count
-        if self.scene():
-            self.post_init()
-        self.update()
+        self._set_progress_bar_items(
+            {'node_progress_bar_block_count': block_count})
 
     def set_progress_bar_block_colors(self, block_colors=[], block_count=None, background_color=None):
-        self._theme['node_progress_bar_mode'] = NodeEnum.PROGRESS_BAR_MODE_BLOCKS.value
-        self._theme['node_progress_bar_block_colors'] = block_colors
+        items = {
+            'node_progress_bar_mode': NodeEnum.PROGRESS_BAR_MODE_BLOCKS.value,
+            # copied so changes to the callers list are detected.
+            'node_progress_bar_block_colors': list(block_colors)
+        }
         if block_count:
-            self._theme['node_progress_bar_block_count'] = block_count
+            items['node_progress_bar_block_count'] = block_count
         if background_color:
-            self._theme['node_progress_bar_background_color'] = background_color
-        if self.scene():
-            self.post_init()
-        self.update()
+            items['node_progress_bar_background_color'] = background_color
+        self._set_progress_bar_items(items)
 
     def get_progress_bar_block_colors(self):
         return self._theme['node_progress_bar_block_colors']
@@ -941,6 +1043,7 @@ class NodeItemVertical(NodeItem):
         font.setPointSize(15)
         self.text_item.setFont(font)
 
+    @record_paint('node')
     def paint(self, painter, option, widget):
         """
         Draws the node base not the ports.
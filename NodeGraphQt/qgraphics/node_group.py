@@ -3,6 +3,7 @@ from Qt import QtCore, QtGui, QtWidgets
 
 from NodeGraphQt.constants import NodeEnum, PortEnum
 from NodeGraphQt.qgraphics.node_base import NodeItem
+from NodeGraphQt.widgets.viewer_diagnostics import record_paint
 
 
 class GroupNodeItem(NodeItem):
@@ -17,6 +18,7 @@ class GroupNodeItem(NodeItem):
     def __init__(self, name='group', parent=None):
         super(GroupNodeItem, self).__init__(name, parent)
 
+    @record_paint('node')
     def paint(self, painter, option, widget):
         """
         Draws the node base not the ports or text.
@@ -197,6 +199,7 @@ class GroupNodeVerticalItem(NodeItem):
         font.setPointSize(15)
         self.text_item.setFont(font)
 
+    @record_paint('node')
     def paint(self, painter, option, widget):
         """
         Draws the node base not the ports or text.
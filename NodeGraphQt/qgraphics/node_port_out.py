@@ -3,6 +3,7 @@ from Qt import QtCore, QtGui, QtWidgets
 
 from NodeGraphQt.constants import NodeEnum
 from NodeGraphQt.qgraphics.node_base import NodeItem, NodeItemVertical
+from NodeGraphQt.widgets.viewer_diagnostics import record_paint
 
 
 class PortOutputNodeItem(NodeItem):
@@ -25,6 +26,7 @@ class PortOutputNodeItem(NodeItem):
         self._width = width + 60
         self._height = height if height >= 60 else 60
 
+    @record_paint('node')
     def paint(self, painter, option, widget):
         """
         Draws the node base not the ports or text.
@@ -182,6 +184,7 @@ class PortOutputNodeItem(NodeItem):
 
 class PortOutputNodeVerticalItem(PortOutputNodeItem):
     
+    @record_paint('node')
     def paint(self, painter, option, widget):
         """
         Draws the node base not the ports or text.
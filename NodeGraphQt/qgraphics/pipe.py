@@ -11,6 +11,7 @@ from NodeGraphQt.constants import (
     NODE_LAYOUT_DIRECTION
 )
 from NodeGraphQt.qgraphics.port import PortItem
+from NodeGraphQt.widgets.viewer_diagnostics import record_paint
 
 PIPE_STYLES = {
     PipeEnum.DRAW_TYPE_DEFAULT.value: QtCore.Qt.SolidLine,
@@ -61,6 +62,7 @@ class PipeItem(QtWidgets.QGraphicsPathItem):
         if self.isSelected():
             self.highlight()
 
+    @record_paint('pipe')
     def paint(self, painter, option, widget):
         """
         Draws the connection line between nodes.
@@ -271,6 +273,34 @@ class PipeItem(QtWidgets.QGraphicsPathItem):
         path = QtGui.QPainterPath(QtCore.QPointF(0.0, 0.0))
         self.setPath(path)
 
+    def setPath(self, path):
+        """
+        Re-implemented to keep the scene pipe index in sync with the path.
+
+        Args:
+            path (QtGui.QPainterPath): pipe path.
+        """
+        super(PipeItem, self).setPath(path)
+        self._update_pipe_index()
+
+    def pipe_index(self):
+        """
+        Returns the spatial index from the scene this pipe is registered to.
+
+        Returns:
+            NodeGraphQt.widgets.spatial_index.SpatialGridIndex: pipe index.
+        """
+        if self.scene():
+            return getattr(self.scene(), 'pipe_index', None)
+
+    def _update_pipe_index(self):
+        """
+        Update the pipe bounding rect in the scene pipe index.
+        """
+        index = self.pipe_index()
+        if index is not None:
+            index.update(self, self.sceneBoundingRect())
+
     @staticmethod
     def calc_distance(p1, p2):
         x = math.pow((p2.x() - p1.x()), 2)
@@ -341,9 +371,20 @@ class PipeItem(QtWidgets.QGraphicsPathItem):
 
     def itemChange(self, change, value):
         if change == self.ItemSelectedChange and self.scene():
-            self.reset()
-            if value:
-                self.highlight()
+            viewer = self.scene().viewer()
+            if not (viewer and viewer.defer_pipe_update(self)):
+                self.reset()
+                if value:
+                    self.highlight()
+        elif change == self.ItemSceneChange:
+            index = self.pipe_index()
+            if index is not None:
+                index.remove(self)
+        elif change == self.ItemSceneHasChanged:
+            self._update_pipe_index()
+            viewer = self.scene().viewer() if self.scene() else None
+            if viewer:
+                viewer.update_item_cache_mode(self)
         return super(PipeItem, self).itemChange(change, value)
 
     @property
@@ -400,6 +441,16 @@ class LivePipeItem(PipeItem):
         self.setZValue(Z_VAL_NODE_WIDGET + 1)
         self.shift_selected = False
 
+    def pipe_index(self):
+        """
+        The live pipe is never registered in the scene pipe index.
+
+        Returns:
+            None: no index.
+        """
+        return None
+
+    @record_paint('pipe')
     def paint(self, painter, option, widget):
         """
         Draws the connection line.
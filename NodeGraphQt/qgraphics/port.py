@@ -5,6 +5,8 @@ from NodeGraphQt.constants import (
     PortTypeEnum, PortEnum,
     Z_VAL_PORT,
     ITEM_CACHE_MODE)
+from NodeGraphQt.qgraphics.theme import PORT_THEME, ItemTheme
+from NodeGraphQt.widgets.viewer_diagnostics import record_paint
 
 
 class PortItem(QtWidgets.QGraphicsItem):
@@ -25,14 +27,7 @@ class PortItem(QtWidgets.QGraphicsItem):
         self._hovered = False
         self._name = 'port'
         self._display_name = True
-        self._theme = {'port_color': PortEnum.COLOR.value,
-                       'port_border_color': PortEnum.BORDER_COLOR.value,
-                       'port_border_size': 1.0,
-                       'port_active_color': PortEnum.ACTIVE_COLOR.value,
-                       'port_active_border_color': PortEnum.ACTIVE_BORDER_COLOR.value,
-                       'port_hover_color': PortEnum.ACTIVE_COLOR.value,
-                       'port_hover_border_color': PortEnum.HOVER_BORDER_COLOR.value                       
-                       }
+        self._theme = ItemTheme(PORT_THEME)
         self._port_type = None
         self._multi_connection = False
         self._locked = False
@@ -48,6 +43,7 @@ class PortItem(QtWidgets.QGraphicsItem):
                              self._width + PortEnum.CLICK_FALLOFF.value,
                              self._height)
 
+    @record_paint('port')
     def paint(self, painter, option, widget):
         """
         Draws the circular port.
@@ -290,6 +286,21 @@ class PortItem(QtWidgets.QGraphicsItem):
             if item in self._theme:
                 self._theme[item] = value
 
+    def set_shared_theme(self, theme):
+        """
+        Set the shared theme the port inherits from.
+
+        Args:
+            theme (NodeGraphQt.qgraphics.theme.SharedTheme): graph theme.
+        """
+        self._theme.set_shared(theme)
+
+    def pin_theme(self):
+        """
+        Keep the current shared theme values when the shared theme changes.
+        """
+        self._theme.pin()
+
 class CustomPortItem(PortItem):
     """
     Custom port item for drawing custom shape port.
@@ -308,6 +319,7 @@ class CustomPortItem(PortItem):
         """
         self._port_painter = func
 
+    @record_paint('port')
     def paint(self, painter, option, widget):
         """
         Draws the port item.
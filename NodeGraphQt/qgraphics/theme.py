@@ -0,0 +1,195 @@
+#!/usr/bin/python
+from NodeGraphQt.constants import NodeEnum, PortEnum
+
+#: default theme values for node items.
+NODE_THEME = {
+    'node_border_width': 0.8,
+    'node_selected_color': NodeEnum.SELECTED_COLOR.value,
+    'node_selected_border_color': NodeEnum.SELECTED_BORDER_COLOR.value,
+    'node_selected_title_color': NodeEnum.SELECTED_COLOR.value,
+    'node_selected_border_width': 1.2,
+    'node_name_background_padding': [3.0, 2.0],
+    'node_base_background_margin': 1.0,
+    'node_name_background_margin': 1.0,
+    'node_name_background_radius': 3.0,
+    'node_progress_bar_background_color':
+        NodeEnum.PROGRESS_BAR_BACKGROUND_COLOR.value,
+    'node_progress_bar_color': NodeEnum.PROGRESS_BAR_COLOR.value,
+    'node_progress_bar_height': NodeEnum.PROGRESS_BAR_HEIGHT.value,
+    'node_progress_bar_mode': NodeEnum.PROGRESS_BAR_MODE_NONE.value,
+    'node_progress_bar_percent': 100,
+    'node_progress_bar_block_count': 1,
+    'node_progress_bar_block_colors': []
+}
+
+#: default theme values for port items.
+PORT_THEME = {
+    'port_color': PortEnum.COLOR.value,
+    'port_border_color': PortEnum.BORDER_COLOR.value,
+    'port_border_size': 1.0,
+    'port_active_color': PortEnum.ACTIVE_COLOR.value,
+    'port_active_border_color': PortEnum.ACTIVE_BORDER_COLOR.value,
+    'port_hover_color': PortEnum.ACTIVE_COLOR.value,
+    'port_hover_border_color': PortEnum.HOVER_BORDER_COLOR.value
+}
+
+
+class SharedTheme(object):
+    """
+    Theme values shared by all the node and port items of a node graph.
+
+    The items only keep a reference to the shared theme so replacing the
+    values with :meth:`SharedTheme.set_values` changes the theme of every
+    item at once.
+
+    Args:
+        values (dict): theme items. eg. ``{'node_border_width': 0.8}``
+    """
+
+    def __init__(self, values=None):
+        self._values = dict(values or {})
+
+    def __repr__(self):
+        return '<{}(items={}) object at {}>'.format(
+            self.__class__.__name__, len(self._values), hex(id(self)))
+
+    def __contains__(self, item):
+        return item in self._values
+
+    def values(self):
+        """
+        Returns the shared theme items.
+
+        Returns:
+            dict: theme items.
+        """
+        return dict(self._values)
+
+    def set_values(self, values):
+        """
+        Replace the shared theme items.
+
+        Args:
+            values (dict): theme items.
+        """
+        self._values = dict(values or {})
+
+
+class ItemTheme(object):
+    """
+    Theme of a single node or port item.
+
+    Theme items are looked up from the item overrides, then the shared theme
+    and then the item defaults. The overrides dict is only created when an
+    item is set to a value different from the inherited one so items without
+    overrides only hold two references.
+
+    Args:
+        defaults (dict): default theme items (not modified).
+        shared (SharedTheme): shared graph theme.
+    """
+
+    __slots__ = ('_defaults', '_shared', '_overrides')
+
+    def __init__(self, defaults, shared=None):
+        self._defaults = defaults
+        self._shared = shared
+        self._overrides = None
+
+    def __contains__(self, item):
+        return item in self._defaults
+
+    def __getitem__(self, item):
+        overrides = self._overrides
+        if overrides and item in overrides:
+            return overrides[item]
+        return self.inherited(item)
+
+    def __setitem__(self, item, value):
+        if value == self.inherited(item):
+            if self._overrides:
+                self._overrides.pop(item, None)
+            return
+        if self._overrides is None:
+            self._overrides = {}
+        self._overrides[item] = value
+
+    @property
+    def shared(self):
+        return self._shared
+
+    def set_shared(self, shared):
+        """
+        Set the shared theme the item inherits from.
+
+        Args:
+            shared (SharedTheme): shared graph theme.
+        """
+        self._shared = shared
+
+    def inherited(self, item):
+        """
+        Returns the theme item value without the item override.
+
+        Args:
+            item (str): theme item name.
+
+        Returns:
+            object: theme item value.
+        """
+        shared = self._shared
+        if shared is not None and item in shared._values:
+            return shared._values[item]
+        return self._defaults[item]
+
+    def get(self, item, default=None):
+        if item in self._defaults or \
+                (self._overrides and item in self._overrides):
+            return self[item]
+        return default
+
+    def update(self, items):
+        for item, value in items.items():
+            self[item] = value
+
+    def items(self):
+        """
+        Returns the resolved theme items.
+
+        Returns:
+            list[tuple]: theme item names and values.
+        """
+        return [(item, self[item]) for item in self._defaults]
+
+    def has_overrides(self):
+        """
+        Returns true if the item overrides any of the inherited values.
+
+        Returns:
+            bool: true if overridden.
+        """
+        return bool(self._overrides)
+
+    def overrides(self):
+        """
+        Returns the item values that differ from the inherited values.
+
+        Returns:
+            dict: theme items.
+        """
+        return dict(self._overrides or {})
+
+    def pin(self):
+        """
+        Copy the current shared theme values into the item overrides so the
+        item keeps its current look when the shared theme changes.
+        """
+        shared = self._shared
+        if shared is None:
+            return
+        for item in self._defaults:
+            if item in shared._values and \
+                    not (self._overrides and item in self._overrides):
+                if self._overrides is None:
+                    self._overrides = {}
+                self._overrides[item] = shared._values[item]
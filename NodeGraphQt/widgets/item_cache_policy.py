@@ -0,0 +1,150 @@
+#!/usr/bin/python
+from NodeGraphQt.constants import ITEM_CACHE_MODE
+
+
+class ItemCachePolicy(object):
+    """
+    Runtime item cache strategy used by the ``NodeViewer``.
+
+    Cache modes are registered per item class and optionally limited to a
+    zoom range and the interaction state (while dragging nodes or a live
+    connection). Rules are looked up through the item class hierarchy and the
+    most recently added matching rule wins.
+
+    The policy is only applied to the node, port and connection pipe items,
+    the other items keep their own cache mode.
+
+    Example:
+
+    .. code-block:: python
+        :linenos:
+
+        from Qt import QtWidgets
+        from NodeGraphQt.qgraphics.node_base import NodeItem
+        from NodeGraphQt.qgraphics.pipe import PipeItem
+        from NodeGraphQt.widgets.item_cache_policy import ItemCachePolicy
+
+        Cache = QtWidgets.QGraphicsItem
+
+        policy = ItemCachePolicy()
+        policy.set_mode(NodeItem, Cache.ItemCoordinateCache)
+        policy.set_mode(PipeItem, Cache.DeviceCoordinateCache)
+        policy.set_mode(PipeItem, Cache.NoCache, interactive=True)
+
+        graph.viewer().set_item_cache_policy(policy)
+
+    Args:
+        default_mode (QtWidgets.QGraphicsItem.CacheMode): cache mode for
+            items without a matching rule.
+    """
+
+    def __init__(self, default_mode=ITEM_CACHE_MODE):
+        self._default_mode = default_mode
+        self._rules = {}
+        self._type_rules = {}
+
+    def __repr__(self):
+        return '<{}(rules={}) object at {}>'.format(
+            self.__class__.__name__,
+            sum(len(r) for r in self._rules.values()),
+            hex(id(self))
+        )
+
+    @property
+    def default_mode(self):
+        return self._default_mode
+
+    def set_mode(self, item_type, mode, zoom_range=None, interactive=None):
+        """
+        Add a cache mode rule for an item class and its sub classes.
+
+        Args:
+            item_type (type): qgraphics item class.
+            mode (QtWidgets.QGraphicsItem.CacheMode): cache mode.
+            zoom_range (tuple(float, float)): (min, max) viewer zoom levels
+                the rule applies to (``None`` for all zoom levels).
+            interactive (bool): ``True`` only while dragging, ``False`` only
+                when idle or ``None`` for both.
+        """
+        zoom_min, zoom_max = zoom_range or (float('-inf'), float('inf'))
+        rule = (float(zoom_min), float(zoom_max), interactive, mode)
+        self._rules.setdefault(item_type, []).append(rule)
+        self._type_rules.clear()
+
+    def clear(self, item_type=None):
+        """
+        Remove the cache mode rules.
+
+        Args:
+            item_type (type): only clear the rules for this class.
+        """
+        if item_type is None:
+            self._rules.clear()
+        else:
+            self._rules.pop(item_type, None)
+        self._type_rules.clear()
+
+    def rules(self):
+        """
+        Returns the registered cache mode rules.
+
+        Returns:
+            dict: {item class: [(zoom min, zoom max, interactive, mode)]}
+        """
+        return {t: list(r) for t, r in self._rules.items()}
+
+    def zoom_boundaries(self):
+        """
+        Returns the zoom levels where the resolved cache modes can change.
+
+        Returns:
+            list[float]: sorted zoom levels.
+        """
+        bounds = set()
+        for rules in self._rules.values():
+            for zoom_min, zoom_max, _, _ in rules:
+                bounds.update(b for b in (zoom_min, zoom_max)
+                              if b not in (float('-inf'), float('inf')))
+        return sorted(bounds)
+
+    def _rules_for_type(self, item_type):
+        """
+        Returns the rules for the first class in the item class hierarchy
+        with registered rules.
+
+        Args:
+            item_type (type): qgraphics item class.
+
+        Returns:
+            list[tuple]: cache mode rules.
+        """
+        rules = self._type_rules.get(item_type)
+        if rules is None:
+            rules = []
+            for cls in item_type.__mro__:
+                if cls in self._rules:
+                    rules = self._rules[cls]
+                    break
+            self._type_rules[item_type] = rules
+        return rules
+
+    def mode(self, item, zoom=0.0, interactive=False):
+        """
+        Returns the cache mode for the item.
+
+        Args:
+            item (QtWidgets.QGraphicsItem): qgraphics item.
+            zoom (float): current viewer zoom level.
+            interactive (bool): true while dragging.
+
+        Returns:
+            QtWidgets.QGraphicsItem.CacheMode: cache mode.
+        """
+        for zoom_min, zoom_max, state, mode in \
+                reversed(self._rules_for_type(type(item))):
+            if not zoom_min <= zoom <= zoom_max:
+                continue
+            if state is not None and state != interactive:
+                continue
+            return mode
+        return self._default_mode
@@ -2,6 +2,7 @@
 from Qt import QtGui, QtCore, QtWidgets
 
 from NodeGraphQt.constants import ViewerEnum
+from NodeGraphQt.widgets.spatial_index import SpatialGridIndex
 
 
 class NodeScene(QtWidgets.QGraphicsScene):
@@ -12,6 +13,7 @@ class NodeScene(QtWidgets.QGraphicsScene):
         self._grid_color = ViewerEnum.GRID_COLOR.value
         self._bg_color = ViewerEnum.BACKGROUND_COLOR.value
         self.setBackgroundBrush(QtGui.QColor(*self._bg_color))
+        self._pipe_index = SpatialGridIndex()
 
     def __repr__(self):
         cls_name = str(self.__class__.__name__)
@@ -143,6 +145,17 @@ class NodeScene(QtWidgets.QGraphicsScene):
     def viewer(self):
         return self.views()[0] if self.views() else None
 
+    @property
+    def pipe_index(self):
+        """
+        Spatial index of the pipe items bounding rects in the scene.
+        (kept up to date by the pipe items when their path changes)
+
+        Returns:
+            NodeGraphQt.widgets.spatial_index.SpatialGridIndex: pipe index.
+        """
+        return self._pipe_index
+
     @property
     def grid_mode(self):
         return self._grid_mode
@@ -0,0 +1,168 @@
+#!/usr/bin/python
+
+
+class SpatialGridIndex(object):
+    """
+    Uniform grid spatial index used for fast rect lookups of scene items.
+
+    Items are bucketed into square cells by their scene bounding rect so a
+    query only has to test the items registered in the cells it overlaps.
+
+    Args:
+        cell_size (float): width and height of a grid cell in scene units.
+    """
+
+    def __init__(self, cell_size=250.0):
+        self._cell_size = float(cell_size)
+        self._cells = {}
+        self._items = {}
+
+    def __repr__(self):
+        return '<{}(items={}) object at {}>'.format(
+            self.__class__.__name__, len(self._items), hex(id(self)))
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item):
+        return item in self._items
+
+    @staticmethod
+    def _rect_bounds(rect):
+        """
+        Convert a rect into a (left, top, right, bottom) tuple.
+
+        Args:
+            rect (QtCore.QRectF or tuple): rect or (l, t, r, b) tuple.
+
+        Returns:
+            tuple(float, float, float, float): left, top, right, bottom.
+        """
+        if isinstance(rect, tuple):
+            return rect
+        return rect.left(), rect.top(), rect.right(), rect.bottom()
+
+    def _cell_keys(self, bounds):
+        """
+        Returns the grid cell keys overlapped by the bounds.
+
+        Args:
+            bounds (tuple): (left, top, right, bottom).
+
+        Returns:
+            tuple[tuple(int, int)]: cell keys.
+        """
+        size = self._cell_size
+        x1, y1 = int(bounds[0] // size), int(bounds[1] // size)
+        x2, y2 = int(bounds[2] // size), int(bounds[3] // size)
+        return tuple((x, y) for x in range(x1, x2 + 1)
+                     for y in range(y1, y2 + 1))
+
+    @property
+    def cell_size(self):
+        return self._cell_size
+
+    def items(self):
+        """
+        Returns all the items in the index.
+
+        Returns:
+            list: indexed items.
+        """
+        return list(self._items.keys())
+
+    def bounds(self, item):
+        """
+        Returns the indexed bounds for the item.
+
+        Args:
+            item (object): indexed item.
+
+        Returns:
+            tuple(float, float, float, float): left, top, right, bottom.
+        """
+        entry = self._items.get(item)
+        if entry:
+            return entry[0]
+
+    def insert(self, item, rect):
+        """
+        Add or update an item in the index.
+
+        Args:
+            item (object): item to index.
+            rect (QtCore.QRectF or tuple): item scene bounding rect.
+        """
+        bounds = self._rect_bounds(rect)
+        keys = self._cell_keys(bounds)
+        entry = self._items.get(item)
+        if entry:
+            if entry[1] == keys:
+                self._items[item] = (bounds, keys)
+                return
+            self.remove(item)
+        self._items[item] = (bounds, keys)
+        for key in keys:
+            cell = self._cells.get(key)
+            if cell is None:
+                cell = self._cells[key] = set()
+            cell.add(item)
+
+    # an update is just a re-insert.
+    update = insert
+
+    def remove(self, item):
+        """
+        Remove the item from the index.
+
+        Args:
+            item (object): indexed item.
+        """
+        entry = self._items.pop(item, None)
+        if not entry:
+            return
+        for key in entry[1]:
+            cell = self._cells.get(key)
+            if cell is None:
+                continue
+            cell.discard(item)
+            if not cell:
+                del self._cells[key]
+
+    def clear(self):
+        """
+        Remove all items from the index.
+        """
+        self._cells.clear()
+        self._items.clear()
+
+    def query(self, rect):
+        """
+        Returns the items who's bounds intersect with the rect.
+
+        Args:
+            rect (QtCore.QRectF or tuple): scene rect to test.
+
+        Returns:
+            list: intersecting items.
+        """
+        l, t, r, b = self._rect_bounds(rect)
+        # query large rects by scanning the items instead of the cells.
+        size = self._cell_size
+        cell_count = (int(r // size) - int(l // size) + 1) * \
+                     (int(b // size) - int(t // size) + 1)
+        if cell_count > len(self._cells):
+            candidates = self._items.keys()
+        else:
+            candidates = set()
+            for key in self._cell_keys((l, t, r, b)):
+                cell = self._cells.get(key)
+                if cell:
+                    candidates.update(cell)
+
+        items = []
+        for item in candidates:
+            il, it, ir, ib = self._items[item][0]
+            if il <= r and ir >= l and it <= b and ib >= t:
+                items.append(item)
+        return items
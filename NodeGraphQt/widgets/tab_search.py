@@ -1,6 +1,5 @@
 #!/usr/bin/python
-import re
-from collections import OrderedDict
+from collections import defaultdict
 
 from Qt import QtCore, QtWidgets, QtGui
 
@@ -49,6 +48,133 @@ class TabSearchCompleter(QtWidgets.QCompleter):
         self._using_orig_model = True
 
 
+class TabSearchIndex(object):
+    """
+    Search index over the node names and node type identifiers used by the
+    :class:`TabSearchMenuWidget`.
+
+    Entries are pre-filtered with a character index and ranked by how close
+    the query matches (prefix, substring then fuzzy subsequence). The matches
+    of the last query are kept so typing more characters only refines the
+    previous results.
+
+    Args:
+        node_dict (dict): {display name: node type}
+    """
+
+    def __init__(self, node_dict=None):
+        self._names = []
+        self._keys = []
+        self._char_index = {}
+        self._last_query = None
+        self._last_matches = None
+        if node_dict:
+            self.build(node_dict)
+
+    def __repr__(self):
+        return '<{}(entries={}) object at {}>'.format(
+            self.__class__.__name__, len(self._names), hex(id(self)))
+
+    def __len__(self):
+        return len(self._names)
+
+    def build(self, node_dict):
+        """
+        (Re)build the index.
+
+        Args:
+            node_dict (dict): {display name: node type}
+        """
+        self._names = sorted(node_dict.keys())
+        self._keys = [(name.lower(), node_dict[name].lower())
+                      for name in self._names]
+        char_index = defaultdict(set)
+        for i, keys in enumerate(self._keys):
+            for char in set(''.join(keys)):
+                char_index[char].add(i)
+        self._char_index = dict(char_index)
+        self._last_query = None
+        self._last_matches = None
+
+    @staticmethod
+    def score(query, text):
+        """
+        Returns the match score of the query in the text (lower is better).
+
+        Args:
+            query (str): lower case search query.
+            text (str): lower case text.
+
+        Returns:
+            tuple(int, int, int): (match kind, match length, match start)
+                or None if the query doesn't match.
+        """
+        pos = text.find(query)
+        if pos == 0:
+            return 0, len(query), pos
+        if pos > 0:
+            return 1, len(query), pos
+        start = text.find(query[0])
+        if start < 0:
+            return
+        end = start
+        for char in query[1:]:
+            end = text.find(char, end + 1)
+            if end < 0:
+                return
+        return 2, end - start + 1, start
+
+    def _candidates(self, query):
+        """
+        Returns the entries that could match the query.
+
+        Args:
+            query (str): lower case search query.
+
+        Returns:
+            iterable[int]: entry indexes.
+        """
+        # a longer query can only match a sub set of the previous matches.
+        if self._last_query and query.startswith(self._last_query):
+            return self._last_matches
+        postings = sorted((self._char_index.get(c, set()) for c in set(query)),
+                          key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+        return candidates
+
+    def search(self, query):
+        """
+        Returns the node names matching the query ranked by score.
+
+        Args:
+            query (str): search query.
+
+        Returns:
+            list[str]: node names.
+        """
+        query = query.lower()
+        if not query:
+            return []
+        scored = []
+        for i in self._candidates(query):
+            name_key, type_key = self._keys[i]
+            scores = []
+            name_score = self.score(query, name_key)
+            if name_score:
+                scores.append(name_score + (0,))
+            type_score = self.score(query, type_key)
+            if type_score:
+                scores.append(type_score + (1,))
+            if scores:
+                scored.append((min(scores), self._names[i], i))
+        scored.sort()
+        self._last_query = query
+        self._last_matches = [i for _, _, i in scored]
+        return [name for _, name, _ in scored]
+
+
 class TabSearchLineEditWidget(QtWidgets.QLineEdit):
 
     tab_pressed = QtCore.Signal()
@@ -94,6 +220,9 @@ class TabSearchMenuWidget(QtWidgets.QMenu):
 
     search_submitted = QtCore.Signal(str)
 
+    #: maximum number of search results displayed without scrolling.
+    MAX_VISIBLE_RESULTS = 12
+
     def __init__(self, node_dict=None):
         super(TabSearchMenuWidget, self).__init__()
 
@@ -143,9 +272,34 @@ class TabSearchMenuWidget(QtWidgets.QMenu):
             self._menu_stylesheet += style
         self.setStyleSheet(self._menu_stylesheet)
 
+        # search results are displayed in a single list view.
+        self._index = TabSearchIndex()
+        self._results_model = QtCore.QStringListModel(self)
+        self.results_view = QtWidgets.QListView()
+        self.results_view.setModel(self._results_model)
+        self.results_view.setEditTriggers(
+            QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.results_view.setFocusPolicy(QtCore.Qt.NoFocus)
+        self.results_view.setUniformItemSizes(True)
+        self.results_view.setStyleSheet(
+            'QListView {{border: none; background: transparent; '
+            'color: rgb({0},{1},{2});}}'
+            'QListView::item {{padding: 3px 14px;}}'
+            'QListView::item:selected {{'
+            'background-color: rgba({3},{4},{5},200);}}'
+            .format(*(text_color[:3] + selected_color[:3]))
+        )
+        self._results_action = QtWidgets.QWidgetAction(self)
+        self._results_action.setDefaultWidget(self.results_view)
+        self._results_action.setVisible(False)
+        self.addAction(self._results_action)
+
+        # menus and actions are created from the menu tree data when a
+        # menu is first shown.
+        self._menu_tree = {}
         self._actions = {}
         self._menus = {}
-        self._searched_actions = []
+        self._populated_menus = set()
 
         self._block_submit = False
 
@@ -157,47 +311,65 @@ class TabSearchMenuWidget(QtWidgets.QMenu):
         return '<{} at {}>'.format(self.__class__.__name__, hex(id(self)))
 
     def keyPressEvent(self, event):
+        if self._results_model.rowCount() and \
+                event.key() in (QtCore.Qt.Key_Up, QtCore.Qt.Key_Down):
+            step = -1 if event.key() == QtCore.Qt.Key_Up else 1
+            self._select_result(self.results_view.currentIndex().row() + step)
+            return
         super(TabSearchMenuWidget, self).keyPressEvent(event)
         self.line_edit.keyPressEvent(event)
 
-    @staticmethod
-    def _fuzzy_finder(key, collection):
-        suggestions = []
-        pattern = '.*?'.join(key.lower())
-        regex = re.compile(pattern)
-        for item in collection:
-            match = regex.search(item.lower())
-            if match:
-                suggestions.append((len(match.group()), match.start(), item))
-
-        return [x for _, _, x in sorted(suggestions)]
-
     def _wire_signals(self):
         self.line_edit.returnPressed.connect(self._on_search_submitted)
         self.line_edit.textChanged.connect(self._on_text_changed)
+        self.results_view.clicked.connect(self._on_result_clicked)
 
     def _on_text_changed(self, text):
-        self._clear_actions()
-
         if not text:
+            self._set_results([])
             self._set_menu_visible(True)
             return
 
         self._set_menu_visible(False)
-
-        action_names = self._fuzzy_finder(text, self._actions.keys())
-
-        self._searched_actions = [self._actions[name] for name in action_names]
-        self.addActions(self._searched_actions)
-
-        if self._searched_actions:
-            self.setActiveAction(self._searched_actions[0])
-
-    def _clear_actions(self):
-        for action in self._searched_actions:
-            self.removeAction(action)
-            action.triggered.connect(self._on_search_submitted)
-        del self._searched_actions[:]
+        self._set_results(self._index.search(text))
+
+    def _set_results(self, names):
+        """
+        Display the search results in the results list view.
+
+        Args:
+            names (list[str]): node names.
+        """
+        self._results_model.setStringList(names)
+        if names:
+            row_height = max(self.results_view.sizeHintForRow(0), 1)
+            rows = min(len(names), self.MAX_VISIBLE_RESULTS)
+            self.results_view.setFixedHeight(
+                rows * row_height + self.results_view.frameWidth() * 2)
+            self._select_result(0)
+        self._results_action.setVisible(bool(names))
+
+    def _select_result(self, row):
+        """
+        Set the current search result.
+
+        Args:
+            row (int): result row.
+        """
+        row = max(0, min(row, self._results_model.rowCount() - 1))
+        index = self._results_model.index(row, 0)
+        self.results_view.setCurrentIndex(index)
+        self.results_view.scrollTo(index)
+
+    def _on_result_clicked(self, index):
+        """
+        Slot function triggered when a search result is clicked.
+
+        Args:
+            index (QtCore.QModelIndex): result index.
+        """
+        self.results_view.setCurrentIndex(index)
+        self._on_search_submitted()
 
     def _set_menu_visible(self, visible):
         for menu in self._menus.values():
@@ -219,14 +391,17 @@ class TabSearchMenuWidget(QtWidgets.QMenu):
     def _on_search_submitted(self):
         if not self._block_submit:
             action = self.sender()
-            if type(action) is not QtWidgets.QAction:
-                if len(self._searched_actions) > 0:
-                    action = self._searched_actions[0]
-                else:
-                    self._close()
-                    return
-
-            text = action.text()
+            if type(action) is QtWidgets.QAction:
+                text = action.text()
+            elif self._results_model.rowCount() > 0:
+                index = self.results_view.currentIndex()
+                if not index.isValid():
+                    index = self._results_model.index(0, 0)
+                text = index.data()
+            else:
+                self._close()
+                return
+
             node_type = self._node_dict.get(text)
             if node_type:
                 self.search_submitted.emit(node_type)
@@ -234,70 +409,88 @@ class TabSearchMenuWidget(QtWidgets.QMenu):
         self._close()
 
     def build_menu_tree(self):
-        node_types = sorted(self._node_dict.values())
-        node_names = sorted(self._node_dict.keys())
-        menu_tree = OrderedDict()
-
-        max_depth = 0
-        for node_type in node_types:
+        """
+        Build the menu tree data and only create the top level menus, the
+        sub menus and node actions are created when a menu is first shown.
+        """
+        menu_tree = {'': {'menus': [], 'nodes': []}}
+        for name in sorted(self._node_dict.keys()):
+            node_type = self._node_dict[name]
             trees = '.'.join(node_type.split('.')[:-1]).split('::')
-            for depth, menu_name in enumerate(trees):
-                new_menu = None
+            parent_path = ''
+            for depth in range(len(trees)):
                 menu_path = '::'.join(trees[:depth + 1])
-                if depth in menu_tree.keys():
-                    if menu_name not in menu_tree[depth].keys():
-                        new_menu = QtWidgets.QMenu(menu_name)
-                        new_menu.keyPressEvent = self.keyPressEvent
-                        new_menu.setStyleSheet(self._menu_stylesheet)
-                        menu_tree[depth][menu_path] = new_menu
-                else:
-                    new_menu = QtWidgets.QMenu(menu_name)
-                    new_menu.setStyleSheet(self._menu_stylesheet)
-                    menu_tree[depth] = {menu_path: new_menu}
-                if depth > 0 and new_menu:
-                    new_menu.parentPath = '::'.join(trees[:depth])
-
-                max_depth = max(max_depth, depth)
-
-        for i in range(max_depth+1):
-            menus = menu_tree[i]
-            for menu_path, menu in menus.items():
-                self._menus[menu_path] = menu
-                if i == 0:
-                    self.addMenu(menu)
-                else:
-                    parent_menu = self._menus[menu.parentPath]
-                    parent_menu.addMenu(menu)
-
-        for name in node_names:
+                if menu_path not in menu_tree:
+                    menu_tree[menu_path] = {'menus': [], 'nodes': []}
+                    menu_tree[parent_path]['menus'].append(menu_path)
+                parent_path = menu_path
+            # (nodes without a category go in the top level menu.)
+            menu_tree[parent_path]['nodes'].append(name)
+        self._menu_tree = menu_tree
+        self._populate_menu('')
+
+    def _create_menu(self, menu_path):
+        """
+        Create a empty menu that is populated when it's first shown.
+
+        Args:
+            menu_path (str): menu path.
+
+        Returns:
+            QtWidgets.QMenu: new menu.
+        """
+        menu = QtWidgets.QMenu(menu_path.split('::')[-1])
+        menu.keyPressEvent = self.keyPressEvent
+        menu.setStyleSheet(self._menu_stylesheet)
+        menu.aboutToShow.connect(lambda p=menu_path: self._populate_menu(p))
+        self._menus[menu_path] = menu
+        return menu
+
+    def _populate_menu(self, menu_path):
+        """
+        Create the sub menus and node actions of a menu.
+
+        Args:
+            menu_path (str): menu path ("" for the top level menu).
+        """
+        if menu_path in self._populated_menus:
+            return
+        self._populated_menus.add(menu_path)
+        data = self._menu_tree.get(menu_path)
+        if not data:
+            return
+        menu = self._menus[menu_path] if menu_path else self
+        for sub_menu_path in sorted(data['menus']):
+            menu.addMenu(self._create_menu(sub_menu_path))
+        for name in data['nodes']:
             action = QtWidgets.QAction(name, self)
             action.setText(name)
             action.triggered.connect(self._on_search_submitted)
             self._actions[name] = action
-
-            menu_name = self._node_dict[name]
-            menu_path = '.'.join(menu_name.split('.')[:-1])
-
-            if menu_path in self._menus.keys():
-                self._menus[menu_path].addAction(action)
-            else:
-                self.addAction(action)
+            menu.addAction(action)
 
     def set_nodes(self, node_dict=None):
         if not self._node_dict or self.rebuild:
             self._node_dict.clear()
-            self._clear_actions()
+            self._set_results([])
             self._set_menu_visible(False)
             for menu in self._menus.values():
                 self.removeAction(menu.menuAction())
+                menu.deleteLater()
+            for action in self._actions.values():
+                self.removeAction(action)
+                action.deleteLater()
             self._actions.clear()
             self._menus.clear()
+            self._menu_tree.clear()
+            self._populated_menus.clear()
             for name, node_types in node_dict.items():
                 if len(node_types) == 1:
                     self._node_dict[name] = node_types[0]
                     continue
                 for node_id in node_types:
                     self._node_dict['{} ({})'.format(name, node_id)] = node_id
+            self._index.build(self._node_dict)
             self.build_menu_tree()
             self.rebuild = False
 
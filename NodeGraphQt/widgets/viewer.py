@@ -1,6 +1,7 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 import math
+import time
 from distutils.version import LooseVersion
 
 from Qt import QtGui, QtCore, QtWidgets
@@ -14,7 +15,11 @@ from NodeGraphQt.qgraphics.port import PortItem
 from NodeGraphQt.qgraphics.slicer import SlicerPipeItem
 from NodeGraphQt.widgets.dialogs import BaseDialog, FileDialog
 from NodeGraphQt.widgets.scene import NodeScene
+from NodeGraphQt.widgets.spatial_index import SpatialGridIndex
 from NodeGraphQt.widgets.tab_search import TabSearchMenuWidget
+from NodeGraphQt.widgets.viewer_diagnostics import (
+    ViewerDiagnostics, record_event
+)
 
 ZOOM_MIN = -0.95
 ZOOM_MAX = 2.0
@@ -66,6 +71,12 @@ class NodeViewer(QtWidgets.QGraphicsView):
         self.setAcceptDrops(True)
         self.resize(850, 800)
 
+        self._item_cache_policy = None
+        self._item_cache_state = None
+        self._item_cache_interactive = False
+        # {item class: cache mode} before the policy was applied.
+        self._item_cache_originals = {}
+
         self._scene_range = QtCore.QRectF(
             0, 0, self.size().width(), self.size().height())
         self._update_scene()
@@ -84,6 +95,10 @@ class NodeViewer(QtWidgets.QGraphicsView):
             QtWidgets.QRubberBand.Rectangle, self
         )
         self._rubber_band.isActive = False
+        self._rubber_band_index = None
+        self._rubber_band_nodes = set()
+        self._rubber_band_pipes = set()
+        self._pending_pipe_updates = None
 
         self._LIVE_PIPE = LivePipeItem()
         self._LIVE_PIPE.setVisible(False)
@@ -128,6 +143,14 @@ class NodeViewer(QtWidgets.QGraphicsView):
         self.SHIFT_state = False
         self.COLLIDING_state = False
 
+        self._collision_timer = QtCore.QElapsedTimer()
+        self._collision_pending = False
+
+        self._diagnostics = None
+        self._diagnostics_overlay = False
+        self._diagnostics_items_total = 0
+        self._diagnostics_timer = QtCore.QElapsedTimer()
+
     def __repr__(self):
         return '<{}() object at {}>'.format(
             self.__class__.__name__, hex(id(self)))
@@ -209,6 +232,81 @@ class NodeViewer(QtWidgets.QGraphicsView):
         """
         self.setSceneRect(self._scene_range)
         self.fitInView(self._scene_range, QtCore.Qt.KeepAspectRatio)
+        self._update_item_cache_modes()
+
+    def _item_cache_key(self):
+        """
+        Returns the state the item cache policy modes are resolved from.
+
+        Returns:
+            tuple(int, bool): zoom range index, interactive state.
+        """
+        zoom = self.get_zoom()
+        bounds = self._item_cache_policy.zoom_boundaries()
+        return sum(1 for b in bounds if zoom >= b), self._item_cache_interactive
+
+    def _update_item_cache_modes(self, force=False):
+        """
+        Re-apply the item cache policy to the scene items when the zoom
+        level crossed a zoom range or the interactive state changed.
+
+        Args:
+            force (bool): re-apply even if the state didn't change.
+        """
+        if self._item_cache_policy is None:
+            return
+        key = self._item_cache_key()
+        if key == self._item_cache_state and not force:
+            return
+        self._item_cache_state = key
+        zoom = self.get_zoom()
+        for item in self.scene().items():
+            if self._is_item_cache_managed(item):
+                self._apply_item_cache_mode(item, zoom)
+
+    @staticmethod
+    def _is_item_cache_managed(item):
+        """
+        Returns true if the item cache policy applies to the item.
+        (node, port and connection pipe items, the live pipe is redrawn on
+        every mouse move so it's left out)
+
+        Args:
+            item (QtWidgets.QGraphicsItem): qgraphics item.
+
+        Returns:
+            bool: true if managed.
+        """
+        return isinstance(item, (AbstractNodeItem, PortItem, PipeItem)) \
+            and not isinstance(item, LivePipeItem)
+
+    def _apply_item_cache_mode(self, item, zoom):
+        """
+        Set the item cache mode resolved from the item cache policy.
+
+        Args:
+            item (QtWidgets.QGraphicsItem): qgraphics item.
+            zoom (float): current zoom level.
+        """
+        item_type = type(item)
+        if item_type not in self._item_cache_originals:
+            self._item_cache_originals[item_type] = item.cacheMode()
+        mode = self._item_cache_policy.mode(
+            item, zoom, self._item_cache_interactive)
+        if item.cacheMode() != mode:
+            item.setCacheMode(mode)
+
+    def _set_item_cache_interactive(self, interactive):
+        """
+        Set the interactive state used by the item cache policy.
+
+        Args:
+            interactive (bool): true while dragging nodes or a connection.
+        """
+        if self._item_cache_interactive == interactive:
+            return
+        self._item_cache_interactive = interactive
+        self._update_item_cache_modes()
 
     def _combined_rect(self, nodes):
         """
@@ -220,10 +318,16 @@ class NodeViewer(QtWidgets.QGraphicsView):
         Returns:
             QtCore.QRectF: combined rect
         """
-        group = self.scene().createItemGroup(nodes)
-        rect = group.boundingRect()
-        self.scene().destroyItemGroup(group)
-        return rect
+        if not nodes:
+            return QtCore.QRectF()
+        # union the scene rects in a single pass instead of creating a
+        # temporary "QGraphicsItemGroup" which re-parents every node item.
+        lefts, tops, rights, bottoms = zip(*[
+            (r.left(), r.top(), r.right(), r.bottom())
+            for r in (n.sceneBoundingRect() for n in nodes)
+        ])
+        return QtCore.QRectF(QtCore.QPointF(min(lefts), min(tops)),
+                             QtCore.QPointF(max(rights), max(bottoms)))
 
     def _items_near(self, pos, item_type=None, width=20, height=20):
         """
@@ -250,6 +354,143 @@ class NodeViewer(QtWidgets.QGraphicsView):
                 items.append(item)
         return items
 
+    def _frame_interval(self):
+        """
+        Returns the display frame interval used for throttling the checks
+        done while dragging nodes.
+
+        Returns:
+            int: frame interval in milliseconds.
+        """
+        screen = QtGui.QGuiApplication.primaryScreen()
+        refresh_rate = screen.refreshRate() if screen else 0.0
+        if refresh_rate <= 0.0:
+            refresh_rate = 60.0
+        return int(1000.0 / refresh_rate)
+
+    def _colliding_pipes(self, node):
+        """
+        Returns the visible pipes colliding with the node item.
+
+        Pipe candidates are pre-filtered from the scene pipe index by their
+        bounding rect before doing the exact shape intersection test.
+
+        Args:
+            node (AbstractNodeItem): node item.
+
+        Returns:
+            list[PipeItem]: colliding pipe items.
+        """
+        pipes = []
+        for pipe in self.scene().pipe_index.query(node.sceneBoundingRect()):
+            if not pipe.isVisible():
+                continue
+            if node.collidesWithItem(pipe):
+                pipes.append(pipe)
+        return pipes
+
+    def _update_pipe_collision(self):
+        """
+        Update the "COLLIDING_state" and selects the pipe the selected node
+        is currently dragged over.
+        """
+        self._collision_timer.start()
+        self._collision_pending = False
+        self.COLLIDING_state = False
+        nodes, pipes = self.selected_items()
+        if len(nodes) != 1:
+            return
+        node = nodes[0]
+        [p.setSelected(False) for p in pipes]
+
+        if not self.pipe_collision:
+            return
+        for pipe in self._colliding_pipes(node):
+            if not pipe.input_port:
+                continue
+            port_node_check = all([
+                not pipe.input_port.node is node,
+                not pipe.output_port.node is node
+            ])
+            if port_node_check:
+                pipe.setSelected(True)
+                self.COLLIDING_state = True
+                break
+
+    def _pipes_in_rect(self, rect):
+        """
+        Returns the visible pipes intersecting with the scene rect.
+
+        Pipes fully inside the rect are accepted from the pipe index bounds
+        and only the pipes crossing the rect edge are shape tested.
+
+        Args:
+            rect (QtCore.QRectF): scene rect.
+
+        Returns:
+            set[PipeItem]: pipe items.
+        """
+        index = self.scene().pipe_index
+        path = QtGui.QPainterPath()
+        path.addRect(rect)
+        l, t, r, b = rect.left(), rect.top(), rect.right(), rect.bottom()
+        pipes = set()
+        for pipe in index.query(rect):
+            if not pipe.isVisible():
+                continue
+            pl, pt, pr, pb = index.bounds(pipe)
+            if l <= pl and pr <= r and t <= pt and pb <= b:
+                pipes.add(pipe)
+            elif pipe.collidesWithPath(path, QtCore.Qt.IntersectsItemShape):
+                pipes.add(pipe)
+        return pipes
+
+    def _update_rubber_band_selection(self, rect):
+        """
+        Incrementally update the item selection from the rubber band rect.
+
+        Only the nodes and pipes that entered or left the rubber band since
+        the last update have their selection state changed.
+
+        Args:
+            rect (QtCore.QRectF): rubber band scene rect.
+        """
+        if self._rubber_band_index is None:
+            # nodes can't be moved while the rubber band is active so the
+            # node index is only built once per rubber band selection.
+            self._rubber_band_index = SpatialGridIndex()
+            for node in self.all_nodes():
+                self._rubber_band_index.insert(node, node.sceneBoundingRect())
+
+        nodes = set(self._rubber_band_index.query(rect))
+        pipes = set() if self.CTRL_state else self._pipes_in_rect(rect)
+        prev_nodes = set(self._prev_selection_nodes)
+
+        self.begin_pipe_updates()
+        for node in nodes - self._rubber_band_nodes:
+            node.setSelected(not self.CTRL_state)
+        for node in self._rubber_band_nodes - nodes:
+            if self.SHIFT_state or self.CTRL_state:
+                node.setSelected(node in prev_nodes)
+            else:
+                node.setSelected(False)
+        for pipe in pipes - self._rubber_band_pipes:
+            pipe.setSelected(True)
+        for pipe in self._rubber_band_pipes - pipes:
+            pipe.setSelected(False)
+        self.end_pipe_updates()
+
+        self._rubber_band_nodes = nodes
+        self._rubber_band_pipes = pipes
+
+    def _reset_rubber_band_selection(self):
+        """
+        Clear the cached rubber band selection states.
+        """
+        self._rubber_band_index = None
+        self._rubber_band_nodes = set()
+        self._rubber_band_pipes = set()
+
     def _on_search_submitted(self, node_type):
         """
         Slot function triggered when the ``TabSearchMenuWidget`` has
@@ -279,8 +520,59 @@ class NodeViewer(QtWidgets.QGraphicsView):
                 ports.append([i.input_port, i.output_port])
         self.connection_sliced.emit(ports)
 
+    def _diagnostics_item_counts(self):
+        """
+        Returns the number of node, port and pipe items in the visible scene
+        rect and in the whole scene (re-counted once a second).
+
+        Returns:
+            tuple(int, int): items drawn, items total.
+        """
+        item_types = (AbstractNodeItem, PortItem, PipeItem)
+        visible_rect = self.mapToScene(self.viewport().rect()).boundingRect()
+        drawn = sum(1 for item in self.scene().items(visible_rect)
+                    if isinstance(item, item_types))
+        timer = self._diagnostics_timer
+        if not timer.isValid() or timer.elapsed() > 1000:
+            self._diagnostics_items_total = sum(
+                1 for item in self.scene().items()
+                if isinstance(item, item_types)
+            )
+            timer.start()
+        return drawn, max(drawn, self._diagnostics_items_total)
+
     # --- reimplemented events ---
 
+    def paintEvent(self, event):
+        diagnostics = self._diagnostics
+        if diagnostics is None:
+            super(NodeViewer, self).paintEvent(event)
+            return
+        diagnostics.begin_frame()
+        try:
+            super(NodeViewer, self).paintEvent(event)
+        finally:
+            diagnostics.stop_frame()
+        diagnostics.end_frame(*self._diagnostics_item_counts())
+
+    def drawBackground(self, painter, rect):
+        diagnostics = self._diagnostics
+        if diagnostics is None:
+            super(NodeViewer, self).drawBackground(painter, rect)
+            return
+        start = time.perf_counter()
+        super(NodeViewer, self).drawBackground(painter, rect)
+        diagnostics.add_background(time.perf_counter() - start)
+
+    def drawForeground(self, painter, rect):
+        super(NodeViewer, self).drawForeground(painter, rect)
+        if self._diagnostics is None or not self._diagnostics_overlay:
+            return
+        painter.save()
+        painter.resetTransform()
+        self._diagnostics.draw_overlay(painter, self.viewport().rect())
+        painter.restore()
+
     def resizeEvent(self, event):
         w, h = self.size().width(), self.size().height()
         if 0 in [w, h]:
@@ -408,13 +700,14 @@ class NodeViewer(QtWidgets.QGraphicsView):
                 self._rubber_band.hide()
 
                 rect = QtCore.QRect(self._origin_pos, event.pos()).normalized()
-                rect_items = self.scene().items(
-                    self.mapToScene(rect).boundingRect()
-                )
-                node_ids = []
-                for item in rect_items:
-                    if isinstance(item, AbstractNodeItem):
-                        node_ids.append(item.id)
+                rect = self.mapToScene(rect).boundingRect()
+                if self._rubber_band_index is not None:
+                    rect_nodes = self._rubber_band_index.query(rect)
+                else:
+                    rect_nodes = [i for i in self.scene().items(rect)
+                                  if isinstance(i, AbstractNodeItem)]
+                node_ids = [n.id for n in rect_nodes]
+                self._reset_rubber_band_selection()
 
                 # emit the node selection signals.
                 if node_ids:
@@ -428,6 +721,12 @@ class NodeViewer(QtWidgets.QGraphicsView):
                 self.scene().update(map_rect)
                 return
 
+        # apply the last throttled pipe collision check.
+        if self._collision_pending:
+            self._update_pipe_collision()
+        self._collision_timer.invalidate()
+        self._set_item_cache_interactive(False)
+
         # find position changed nodes and emit signal.
         moved_nodes = {
             n: xy_pos for n, xy_pos in self._node_positions.items()
@@ -453,6 +752,7 @@ class NodeViewer(QtWidgets.QGraphicsView):
 
         super(NodeViewer, self).mouseReleaseEvent(event)
 
+    @record_event('mouseMoveEvent')
     def mouseMoveEvent(self, event):
         if self.ALT_state and self.SHIFT_state:
             if self.LMB_state and self._SLICER_PIPE.isVisible():
@@ -481,49 +781,19 @@ class NodeViewer(QtWidgets.QGraphicsView):
                 if not self._rubber_band.isVisible():
                     self._rubber_band.show()
                 map_rect = self.mapToScene(rect).boundingRect()
-                path = QtGui.QPainterPath()
-                path.addRect(map_rect)
                 self._rubber_band.setGeometry(rect)
-                self.scene().setSelectionArea(
-                    path, QtCore.Qt.IntersectsItemShape
-                )
+                self._update_rubber_band_selection(map_rect)
                 self.scene().update(map_rect)
 
-                if self.SHIFT_state or self.CTRL_state:
-                    nodes, pipes = self.selected_items()
-
-                    for node in self._prev_selection_nodes:
-                        node.selected = True
-
-                    if self.CTRL_state:
-                        for pipe in pipes:
-                            pipe.setSelected(False)
-                        for node in nodes:
-                            node.selected = False
-
         elif self.LMB_state:
-            self.COLLIDING_state = False
-            nodes, pipes = self.selected_items()
-            if len(nodes) == 1:
-                node = nodes[0]
-                [p.setSelected(False) for p in pipes]
-
-                if self.pipe_collision:
-                    colliding_pipes = [
-                        i for i in node.collidingItems()
-                        if isinstance(i, PipeItem) and i.isVisible()
-                    ]
-                    for pipe in colliding_pipes:
-                        if not pipe.input_port:
-                            continue
-                        port_node_check = all([
-                            not pipe.input_port.node is node,
-                            not pipe.output_port.node is node
-                        ])
-                        if port_node_check:
-                            pipe.setSelected(True)
-                            self.COLLIDING_state = True
-                            break
+            if self._node_positions:
+                self._set_item_cache_interactive(True)
+            # throttle the pipe collision check to the display frame rate.
+            if self._collision_timer.isValid() and \
+                    self._collision_timer.elapsed() < self._frame_interval():
+                self._collision_pending = True
+            else:
+                self._update_pipe_collision()
 
         self._previous_pos = event.pos()
         super(NodeViewer, self).mouseMoveEvent(event)
@@ -597,6 +867,7 @@ class NodeViewer(QtWidgets.QGraphicsView):
 
     # --- scene events ---
 
+    @record_event('sceneMouseMoveEvent')
     def sceneMouseMoveEvent(self, event):
         """
         triggered mouse move event for the scene.
@@ -837,6 +1108,7 @@ class NodeViewer(QtWidgets.QGraphicsView):
         elif self._start_port == PortTypeEnum.OUT.value:
             self._LIVE_PIPE.output_port = self._start_port
         self._LIVE_PIPE.setVisible(True)
+        self._set_item_cache_interactive(True)
 
     def end_live_connection(self):
         """
@@ -847,6 +1119,7 @@ class NodeViewer(QtWidgets.QGraphicsView):
         self._LIVE_PIPE.setVisible(False)
         self._LIVE_PIPE.shift_selected = False
         self._start_port = None
+        self._set_item_cache_interactive(False)
 
     def establish_connection(self, start_port, end_port):
         """
@@ -891,6 +1164,180 @@ class NodeViewer(QtWidgets.QGraphicsView):
                             return False
         return True
 
+    # --- pipe updates ---
+
+    def begin_pipe_updates(self):
+        """
+        Start batching the pipe highlight updates triggered by the node
+        and pipe selection changes followed by a
+        :meth:`NodeViewer.end_pipe_updates`.
+        """
+        if self._pending_pipe_updates is None:
+            self._pending_pipe_updates = set()
+
+    def end_pipe_updates(self):
+        """
+        End the batched pipe updates started by
+        :meth:`NodeViewer.begin_pipe_updates` and update the highlight
+        state once for every affected pipe.
+        """
+        pipes = self._pending_pipe_updates
+        self._pending_pipe_updates = None
+        if not pipes:
+            return
+        for pipe in pipes:
+            if not (pipe.input_port and pipe.output_port):
+                continue
+            highlight = any([pipe.isSelected(),
+                             pipe.input_port.node.selected,
+                             pipe.output_port.node.selected])
+            if highlight:
+                if pipe.active() or not pipe.highlighted():
+                    pipe.reset()
+                    pipe.highlight()
+            elif pipe.active() or pipe.highlighted():
+                pipe.reset()
+
+    def defer_pipe_update(self, item):
+        """
+        Queue the pipe highlight update for the item if pipe updates are
+        currently being batched.
+
+        Args:
+            item (AbstractNodeItem or PipeItem): node or pipe item.
+
+        Returns:
+            bool: true if the update was queued.
+        """
+        if self._pending_pipe_updates is None:
+            return False
+        if isinstance(item, PipeItem):
+            self._pending_pipe_updates.add(item)
+            return True
+        ports = getattr(item, 'inputs', []) + getattr(item, 'outputs', [])
+        for port in ports:
+            self._pending_pipe_updates.update(port.connected_pipes)
+        return True
+
+    # --- item cache ---
+
+    def set_item_cache_policy(self, policy):
+        """
+        Set the item cache strategy applied to the scene items.
+
+        Args:
+            policy (NodeGraphQt.widgets.item_cache_policy.ItemCachePolicy):
+                cache policy or None to restore the original cache modes.
+        """
+        self._item_cache_policy = policy
+        self._item_cache_state = None
+        if policy is None:
+            originals = self._item_cache_originals
+            for item in self.scene().items():
+                mode = originals.get(type(item))
+                if mode is not None and item.cacheMode() != mode and \
+                        self._is_item_cache_managed(item):
+                    item.setCacheMode(mode)
+        else:
+            self._update_item_cache_modes(force=True)
+        self.viewport().update()
+
+    def item_cache_policy(self):
+        """
+        Returns the item cache strategy applied to the scene items.
+
+        Returns:
+            NodeGraphQt.widgets.item_cache_policy.ItemCachePolicy: policy.
+        """
+        return self._item_cache_policy
+
+    def update_item_cache_mode(self, item):
+        """
+        Apply the item cache policy to a item and its child items.
+        (called when a item is added to the scene)
+
+        Args:
+            item (QtWidgets.QGraphicsItem): qgraphics item.
+        """
+        if self._item_cache_policy is None:
+            return
+        zoom = self.get_zoom()
+        items = [item]
+        while items:
+            item = items.pop()
+            if self._is_item_cache_managed(item):
+                self._apply_item_cache_mode(item, zoom)
+            items.extend(item.childItems())
+
+    # --- diagnostics ---
+
+    def set_diagnostics_enabled(self, enabled=True, history=300):
+        """
+        Enable or disable the frame time diagnostics.
+
+        Args:
+            enabled (bool): true to start recording.
+            history (int): number of frames kept in the rolling window.
+        """
+        if not enabled:
+            self._diagnostics = None
+        elif self._diagnostics is None or \
+                self._diagnostics.history != history:
+            self._diagnostics = ViewerDiagnostics(history)
+        self._diagnostics_timer.invalidate()
+        self.viewport().update()
+
+    def diagnostics_enabled(self):
+        """
+        Returns true if the frame time diagnostics are being recorded.
+
+        Returns:
+            bool: true if enabled.
+        """
+        return self._diagnostics is not None
+
+    def diagnostics(self):
+        """
+        Returns the frame time diagnostics recorder.
+
+        Returns:
+            ViewerDiagnostics: diagnostics or None if not enabled.
+        """
+        return self._diagnostics
+
+    def set_diagnostics_overlay(self, visible=True):
+        """
+        Show the frame time diagnostics overlay in the viewer.
+
+        Note:
+            the overlay is only drawn while diagnostics are enabled.
+
+        Args:
+            visible (bool): true to show the overlay.
+        """
+        self._diagnostics_overlay = visible
+        self.viewport().update()
+
+    def diagnostics_overlay(self):
+        """
+        Returns true if the diagnostics overlay is visible.
+
+        Returns:
+            bool: true if visible.
+        """
+        return self._diagnostics_overlay
+
+    def export_diagnostics(self, file_path):
+        """
+        Export the recorded frame time diagnostics to a `JSON` file.
+
+        Args:
+            file_path (str): path to the exported file.
+        """
+        if self._diagnostics is None:
+            raise RuntimeError('viewer diagnostics are not enabled.')
+        self._diagnostics.export_json(file_path)
+
     # --- viewer ---
 
     def tab_search_set_nodes(self, nodes):
@@ -1086,19 +1533,20 @@ class NodeViewer(QtWidgets.QGraphicsView):
             pos (tuple or list): custom x, y position.
             offset (tuple or list): x, y position offset.
         """
-        group = self.scene().createItemGroup(nodes)
-        group_rect = group.boundingRect()
+        if not nodes:
+            return
         if pos:
             x, y = pos
         else:
+            group_rect = self._combined_rect(nodes)
             pos = self.mapToScene(self._previous_pos)
             x = pos.x() - group_rect.center().x()
             y = pos.y() - group_rect.center().y()
         if offset:
             x += offset[0]
             y += offset[1]
-        group.setPos(x, y)
-        self.scene().destroyItemGroup(group)
+        for node in nodes:
+            node.moveBy(x, y)
 
     def get_pipes_from_nodes(self, nodes=None):
         nodes = nodes or self.selected_nodes()
@@ -0,0 +1,379 @@
+#!/usr/bin/python
+import functools
+import json
+import time
+from collections import deque
+
+from Qt import QtCore, QtGui
+
+#: paint item categories recorded by the diagnostics.
+PAINT_CATEGORIES = ('node', 'pipe', 'port', 'backdrop')
+
+#: upper bounds (in milliseconds) of the histogram buckets.
+HISTOGRAM_BUCKETS = (1.0, 2.0, 4.0, 8.0, 16.7, 33.3, 50.0, 100.0, 250.0)
+
+# diagnostics recorder of the viewer currently being painted.
+_ACTIVE_RECORDER = None
+# paint call depth used to avoid recording "super().paint()" calls twice.
+_PAINT_DEPTH = 0
+
+
+def record_paint(category):
+    """
+    Decorator for recording the paint time of a qgraphics item.
+
+    When no viewer is recording diagnostics the decorated paint function is
+    called directly.
+
+    Args:
+        category (str): paint category. (see: ``PAINT_CATEGORIES``)
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, painter, option, widget):
+            global _PAINT_DEPTH
+            recorder = _ACTIVE_RECORDER
+            if recorder is None or _PAINT_DEPTH:
+                return func(self, painter, option, widget)
+            _PAINT_DEPTH += 1
+            start = time.perf_counter()
+            try:
+                return func(self, painter, option, widget)
+            finally:
+                _PAINT_DEPTH -= 1
+                recorder.add_paint(category, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def record_event(name):
+    """
+    Decorator for recording the time spent in a ``NodeViewer`` event handler.
+
+    Args:
+        name (str): event name.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            recorder = self.diagnostics()
+            if recorder is None:
+                return func(self, *args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                recorder.add_event(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+class ViewerDiagnostics(object):
+    """
+    Records per frame timings from a ``NodeViewer``.
+
+    The last ``history`` frames are kept in a rolling window which can be
+    summarized as histograms or exported to JSON.
+
+    Args:
+        history (int): number of frames to keep.
+    """
+
+    def __init__(self, history=300):
+        self._frames = deque(maxlen=history)
+        self._frame = None
+        self._frame_start = 0.0
+        self._pending_events = {}
+
+    def __repr__(self):
+        return '<{}(frames={}) object at {}>'.format(
+            self.__class__.__name__, len(self._frames), hex(id(self)))
+
+    @property
+    def history(self):
+        return self._frames.maxlen
+
+    def reset(self):
+        """
+        Clear all the recorded frames.
+        """
+        self._frames.clear()
+        self._frame = None
+        self._pending_events = {}
+
+    def begin_frame(self):
+        """
+        Start recording a new frame and set it as the active recorder for the
+        item paint functions.
+        """
+        global _ACTIVE_RECORDER
+        self._frame = {
+            'paint': {c: 0.0 for c in PAINT_CATEGORIES},
+            'paint_count': {c: 0 for c in PAINT_CATEGORIES},
+            'background': 0.0,
+        }
+        self._frame_start = time.perf_counter()
+        _ACTIVE_RECORDER = self
+
+    def stop_frame(self):
+        """
+        Stop the frame timer and clear the active recorder.
+        """
+        global _ACTIVE_RECORDER
+        _ACTIVE_RECORDER = None
+        if self._frame is not None and 'frame' not in self._frame:
+            self._frame['frame'] = time.perf_counter() - self._frame_start
+
+    def end_frame(self, items_drawn=0, items_total=0):
+        """
+        Finish recording the current frame.
+
+        Args:
+            items_drawn (int): number of items in the visible scene rect.
+            items_total (int): number of items in the scene.
+        """
+        self.stop_frame()
+        frame = self._frame
+        if frame is None:
+            return
+        self._frame = None
+        frame['events'] = self._pending_events
+        self._pending_events = {}
+        frame['items_drawn'] = items_drawn
+        frame['items_total'] = items_total
+        # cached items are composited without calling their paint function.
+        painted = sum(frame['paint_count'].values())
+        if items_drawn:
+            frame['cache_hit_rate'] = max(0.0, 1.0 - painted / items_drawn)
+        else:
+            frame['cache_hit_rate'] = 0.0
+        frame['time'] = time.time()
+        self._frames.append(frame)
+
+    def add_paint(self, category, seconds):
+        """
+        Add the paint time for an item to the current frame.
+
+        Args:
+            category (str): paint category.
+            seconds (float): paint time.
+        """
+        if self._frame is None:
+            return
+        paint = self._frame['paint']
+        paint[category] = paint.get(category, 0.0) + seconds
+        count = self._frame['paint_count']
+        count[category] = count.get(category, 0) + 1
+
+    def add_background(self, seconds):
+        """
+        Add the background draw time to the current frame.
+
+        Args:
+            seconds (float): draw time.
+        """
+        if self._frame is not None:
+            self._frame['background'] += seconds
+
+    def add_event(self, name, seconds):
+        """
+        Add event handling time, recorded with the next painted frame.
+
+        Args:
+            name (str): event name.
+            seconds (float): event handling time.
+        """
+        events = self._pending_events
+        total, count = events.get(name, (0.0, 0))
+        events[name] = (total + seconds, count + 1)
+
+    def frames(self):
+        """
+        Returns the recorded frames in the rolling window.
+
+        Returns:
+            list[dict]: frame timings (in seconds).
+        """
+        return list(self._frames)
+
+    def _values(self, key):
+        """
+        Returns the recorded values in milliseconds for the key.
+
+        Keys:
+            - ``"frame"`` total frame time.
+            - ``"background"`` background draw time.
+            - ``"paint.<category>"`` item paint time.
+            - ``"event.<name>"`` event handling time.
+
+        Args:
+            key (str): value key.
+
+        Returns:
+            list[float]: values in milliseconds.
+        """
+        group, _, name = key.partition('.')
+        values = []
+        for frame in self._frames:
+            if group in ('frame', 'background'):
+                value = frame[group]
+            elif group == 'paint':
+                value = frame['paint'].get(name, 0.0)
+            elif group == 'event':
+                value = frame['events'].get(name, (0.0, 0))[0]
+            else:
+                raise KeyError('invalid diagnostics key "{}"'.format(key))
+            values.append(value * 1000.0)
+        return values
+
+    def histogram(self, key='frame', buckets=HISTOGRAM_BUCKETS):
+        """
+        Returns a histogram of the recorded values in the rolling window.
+
+        Args:
+            key (str): value key. (see: ``ViewerDiagnostics._values``)
+            buckets (tuple[float]): bucket upper bounds in milliseconds.
+
+        Returns:
+            list[tuple(float, int)]: (bucket upper bound, count) the last
+                bucket upper bound is ``inf``.
+        """
+        bounds = list(buckets) + [float('inf')]
+        counts = [0] * len(bounds)
+        for value in self._values(key):
+            for idx, bound in enumerate(bounds):
+                if value <= bound:
+                    counts[idx] += 1
+                    break
+        return list(zip(bounds, counts))
+
+    def summary(self):
+        """
+        Returns the averaged timings from the rolling window.
+
+        Returns:
+            dict: summary in milliseconds.
+        """
+        frames = self._frames
+        count = len(frames)
+        if not count:
+            return {'frames': 0}
+
+        frame_ms = sorted(self._values('frame'))
+        events = {}
+        for frame in frames:
+            for name, (total, calls) in frame['events'].items():
+                e_total, e_calls = events.get(name, (0.0, 0))
+                events[name] = (e_total + total, e_calls + calls)
+
+        return {
+            'frames': count,
+            'frame_avg': sum(frame_ms) / count,
+            'frame_p50': frame_ms[int(count * 0.5)],
+            'frame_p95': frame_ms[min(count - 1, int(count * 0.95))],
+            'frame_max': frame_ms[-1],
+            'background_avg': sum(self._values('background')) / count,
+            'paint_avg': {
+                c: sum(self._values('paint.' + c)) / count
+                for c in PAINT_CATEGORIES
+            },
+            'event_avg': {
+                name: (total * 1000.0) / calls
+                for name, (total, calls) in events.items() if calls
+            },
+            'items_drawn_avg': sum(f['items_drawn'] for f in frames) / count,
+            'items_total': frames[-1]['items_total'],
+            'cache_hit_rate': sum(f['cache_hit_rate'] for f in frames) / count,
+        }
+
+    def to_dict(self):
+        """
+        Serialize the diagnostics to a dictionary.
+
+        Returns:
+            dict: summary, histograms and frames.
+        """
+        histograms = {'frame': self.histogram('frame'),
+                      'background': self.histogram('background')}
+        for category in PAINT_CATEGORIES:
+            key = 'paint.' + category
+            histograms[key] = self.histogram(key)
+        for histogram in histograms.values():
+            # json doesn't support "inf".
+            histogram[-1] = (None, histogram[-1][1])
+
+        frames = []
+        for frame in self._frames:
+            frame = dict(frame)
+            frame['events'] = {n: {'time': t, 'count': c}
+                               for n, (t, c) in frame['events'].items()}
+            frames.append(frame)
+
+        return {
+            'summary': self.summary(),
+            'histograms': histograms,
+            'frames': frames
+        }
+
+    def export_json(self, file_path):
+        """
+        Export the diagnostics to a `JSON` formatted file.
+
+        Args:
+            file_path (str): path to the exported file.
+        """
+        file_path = file_path.strip()
+        with open(file_path, 'w') as file_out:
+            json.dump(
+                self.to_dict(),
+                file_out,
+                indent=2,
+                separators=(',', ':')
+            )
+
+    def draw_overlay(self, painter, rect):
+        """
+        Draws the diagnostics summary overlay.
+
+        Args:
+            painter (QtGui.QPainter): painter in viewport coordinates.
+            rect (QtCore.QRect): viewport rect.
+        """
+        summary = self.summary()
+        if not summary['frames']:
+            return
+
+        fps = 1000.0 / summary['frame_avg'] if summary['frame_avg'] else 0.0
+        lines = [
+            'frame: {:.2f}ms (p95 {:.2f}ms) {:.0f} fps'.format(
+                summary['frame_avg'], summary['frame_p95'], fps),
+            'background: {:.2f}ms'.format(summary['background_avg']),
+        ]
+        for category in PAINT_CATEGORIES:
+            lines.append('paint {}: {:.2f}ms'.format(
+                category, summary['paint_avg'][category]))
+        for name, value in sorted(summary['event_avg'].items()):
+            lines.append('{}: {:.2f}ms'.format(name, value))
+        lines.append('items: {:.0f} / {}'.format(
+            summary['items_drawn_avg'], summary['items_total']))
+        lines.append('cache hit rate: {:.0%}'.format(
+            summary['cache_hit_rate']))
+
+        painter.save()
+        font = painter.font()
+        font.setPointSize(8)
+        painter.setFont(font)
+        metrics = painter.fontMetrics()
+        line_height = metrics.height()
+        width = max(metrics.boundingRect(l).width() for l in lines) + 16
+        height = line_height * len(lines) + 10
+        box = QtCore.QRect(rect.left() + 10, rect.top() + 10, width, height)
+        painter.setPen(QtCore.Qt.NoPen)
+        painter.setBrush(QtGui.QColor(0, 0, 0, 160))
+        painter.drawRoundedRect(box, 3.0, 3.0)
+        painter.setPen(QtGui.QColor(220, 220, 220))
+        y = box.top() + 5 + metrics.ascent()
+        for line in lines:
+            painter.drawText(box.left() + 8, y, line)
+            y += line_height
+        painter.restore()
@@ -0,0 +1,157 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Benchmark comparing item cache policies on a large node graph.
+
+usage:
+    python -m examples.benchmark_item_cache [node count] [output.json]
+"""
+import json
+import sys
+import time
+
+from Qt import QtCore, QtWidgets
+
+from NodeGraphQt import NodeGraph
+from NodeGraphQt.qgraphics.node_abstract import AbstractNodeItem
+from NodeGraphQt.qgraphics.pipe import PipeItem
+from NodeGraphQt.qgraphics.port import PortItem
+from NodeGraphQt.widgets.item_cache_policy import ItemCachePolicy
+
+from examples.custom_nodes import basic_nodes
+
+Cache = QtWidgets.QGraphicsItem
+
+
+def build_policies():
+    """
+    Returns the cache policies to compare.
+
+    Returns:
+        dict: {policy name: ItemCachePolicy or None}
+    """
+    no_cache = ItemCachePolicy(Cache.NoCache)
+
+    item_nodes = ItemCachePolicy()
+    item_nodes.set_mode(AbstractNodeItem, Cache.ItemCoordinateCache)
+
+    pipes_no_cache = ItemCachePolicy()
+    pipes_no_cache.set_mode(PipeItem, Cache.NoCache)
+
+    zoomed = ItemCachePolicy()
+    zoomed.set_mode(AbstractNodeItem, Cache.ItemCoordinateCache,
+                    zoom_range=(-1.0, -0.5))
+    zoomed.set_mode(PortItem, Cache.NoCache, zoom_range=(-1.0, -0.5))
+    zoomed.set_mode(PipeItem, Cache.NoCache, interactive=True)
+
+    return {
+        'default (device)': None,
+        'no cache': no_cache,
+        'item cache nodes': item_nodes,
+        'no cache pipes': pipes_no_cache,
+        'zoom ranged': zoomed,
+    }
+
+
+def build_graph(graph, count):
+    """
+    Create a grid of nodes connected in chains.
+
+    Args:
+        graph (NodeGraph): node graph.
+        count (int): number of nodes.
+    """
+    columns = max(1, int(count ** 0.5))
+    prev = None
+    for i in range(count):
+        node = graph.create_node('nodes.basic.BasicNodeA',
+                                 pos=[(i % columns) * 220,
+                                      (i // columns) * 120],
+                                 selected=False, push_undo=False)
+        if prev and i % columns:
+            prev.set_output(0, node.input(0))
+        prev = node
+
+
+def run_phase(app, viewer, name, frames, step):
+    """
+    Repaint the viewer for a number of frames.
+
+    Args:
+        app (QtWidgets.QApplication): application.
+        viewer (NodeViewer): node viewer.
+        name (str): phase name.
+        frames (int): number of frames.
+        step (function): called with the frame index before each repaint.
+
+    Returns:
+        dict: diagnostics summary.
+    """
+    viewer.set_diagnostics_enabled(False)
+    viewer.set_diagnostics_enabled(True, history=frames)
+    for i in range(frames):
+        step(i)
+        viewer.viewport().repaint()
+        app.processEvents()
+    summary = viewer.diagnostics().summary()
+    summary['phase'] = name
+    return summary
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    output = sys.argv[2] if len(sys.argv) > 2 else None
+
+    app = QtWidgets.QApplication([])
+
+    graph = NodeGraph()
+    graph.register_node(basic_nodes.BasicNodeA)
+    graph.widget.resize(1280, 800)
+    graph.widget.show()
+    viewer = graph.viewer()
+
+    start = time.perf_counter()
+    build_graph(graph, count)
+    print('built {} nodes in {:.2f}s'.format(
+        count, time.perf_counter() - start))
+
+    nodes = graph.all_nodes()[:50]
+    node_items = [n.view for n in nodes]
+
+    def zoom_step(i):
+        viewer.set_zoom(-0.9 + (i % 30) * 0.1)
+
+    def pan_step(i):
+        viewer.set_zoom(0.0)
+        viewer.centerOn(QtCore.QPointF((i % 60) * 40.0, 0.0))
+
+    def move_step(i):
+        viewer.move_nodes(node_items, offset=[2.0 if i % 2 else -2.0, 0.0])
+
+    results = {}
+    for name, policy in build_policies().items():
+        viewer.set_item_cache_policy(policy)
+        viewer.reset_zoom()
+        results[name] = [
+            run_phase(app, viewer, 'zoom', 120, zoom_step),
+            run_phase(app, viewer, 'pan', 120, pan_step),
+            run_phase(app, viewer, 'move', 120, move_step),
+        ]
+    viewer.set_item_cache_policy(None)
+    viewer.set_diagnostics_enabled(False)
+
+    print('{:<20}{:<8}{:>10}{:>10}{:>12}'.format(
+        'policy', 'phase', 'avg ms', 'p95 ms', 'cache hit'))
+    for name, phases in results.items():
+        for summary in phases:
+            print('{:<20}{:<8}{:>10.2f}{:>10.2f}{:>12.0%}'.format(
+                name, summary['phase'], summary['frame_avg'],
+                summary['frame_p95'], summary['cache_hit_rate']))
+
+    if output:
+        with open(output, 'w') as file_out:
+            json.dump(results, file_out, indent=2)
+
+
+if __name__ == '__main__':
+    main()